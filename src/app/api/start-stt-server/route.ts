@@ -6,6 +6,27 @@ let sttProcess: ChildProcess | null = null;
 
 export async function POST(_request: NextRequest) {
   try {
+    // First, check if an STT server is already listening (it may still be loading its model)
+    try {
+      const healthCheck = await fetch('http://localhost:8765/health', {
+        method: 'GET',
+        signal: AbortSignal.timeout(2000)
+      });
+
+      if (healthCheck.ok) {
+        const health = await healthCheck.json();
+        console.log(`✅ STT Server already running (${health.status})`);
+        return NextResponse.json({
+          success: true,
+          message: 'STT Server already running',
+          status: health.status,
+          alreadyRunning: true
+        });
+      }
+    } catch (_healthError) {
+      // Server not running, continue with startup
+    }
+
     // Check if STT server is already running
     if (sttProcess && !sttProcess.killed) {
       return NextResponse.json({ 
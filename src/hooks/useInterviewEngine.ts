@@ -56,6 +56,15 @@ export const useInterviewEngine = ({ company, role, mediaStream, onInterviewComp
           interviewPhase: 'speaking'
         }));
         
+        // Pre-render the remaining questions so they are cached before we ask them
+        fetch('http://localhost:8001/tts/batch', {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({ texts: data.questions.slice(1).map((question: Question) => question.text) })
+        }).catch(error => console.warn('⚠️ TTS prefetch failed:', error));
+
         // Start with the first question - call directly to avoid circular dependency
         const firstQuestionText = data.questions[0].text;
         setState(prev => ({ ...prev, isAISpeaking: true, interviewPhase: 'speaking' }));
@@ -443,16 +452,8 @@ export const useInterviewEngine = ({ company, role, mediaStream, onInterviewComp
       
       mediaRecorder.ondataavailable = (event) => {
         if (event.data.size > 0 && websocketRef.current?.readyState === WebSocket.OPEN) {
-          // Convert audio blob to base64 and send to STT server
-          const reader = new FileReader();
-          reader.onload = () => {
-            const base64Audio = (reader.result as string).split(',')[1];
-            websocketRef.current?.send(JSON.stringify({
-              type: 'audio',
-              data: base64Audio
-            }));
-          };
-          reader.readAsDataURL(event.data);
+          // Send the WebM chunk as a binary frame - no base64/JSON overhead
+          websocketRef.current.send(event.data);
         }
       };
       
@@ -523,6 +524,19 @@ export const useInterviewEngine = ({ company, role, mediaStream, onInterviewComp
               }));
               // Start silence timer after receiving final result
               startSilenceTimer();
+            } else if (data.type === 'speech_start') {
+              // Server-side VAD detected the candidate speaking
+              setState(prev => ({ ...prev, isUserSpeaking: true }));
+              resetSilenceTimer();
+            } else if (data.type === 'speech_end') {
+              // Server-side VAD detected the end of a turn - same handling as a silent partial
+              setState(prev => {
+                if (prev.finalTranscription.trim() || prev.currentTranscription.trim()) {
+                  startSilenceTimer();
+                  return { ...prev, isUserSpeaking: false };
+                }
+                return prev;
+              });
             } else if (data.type === 'partial' && !data.text) {
               // Empty partial result indicates silence - start timer if we have some transcription
               setState(prev => {
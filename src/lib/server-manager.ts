@@ -39,7 +39,8 @@ export class ServerManager {
       console.log('🚀 Starting STT Server...');
       
       // Check if STT server is already running
-      const isRunning = await this.checkServerHealth('ws://localhost:8765');
+      // The STT server answers plain HTTP health probes on its WebSocket port
+      const isRunning = await this.checkServerHealth('http://localhost:8765/health');
       if (isRunning) {
         console.log('✅ STT Server already running');
         this.sttServerStarted = true;
@@ -0,0 +1,23 @@
+"""
+Consolidated Vosk STT engine.
+
+One configurable WebSocket server replaces the former stt_server_*.py
+variants; see config.PRESETS for how each of them maps onto STTConfig.
+Run it with ``python -m stt_engine`` and compare configurations with
+``python -m stt_engine.benchmark``.
+"""
+
+from .backends import create_backend
+from .config import INPUT_FORMATS, PRESETS, STTConfig, env_overrides
+from .session import Session
+from .server import STTServer
+
+__all__ = [
+    "INPUT_FORMATS",
+    "PRESETS",
+    "STTConfig",
+    "STTServer",
+    "Session",
+    "create_backend",
+    "env_overrides",
+]
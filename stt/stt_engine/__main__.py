@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Command line entry point: python -m stt_engine [--preset NAME] [options]
+"""
+
+import argparse
+import logging
+
+from .backends import BACKENDS
+from .config import INPUT_FORMATS, PRESETS, env_overrides
+from .ingest import POLICIES
+from .server import STTServer
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Vosk STT WebSocket server")
+    parser.add_argument(
+        "--preset", choices=sorted(PRESETS), default="default",
+        help="starting configuration (one per former stt_server_*.py variant)")
+    parser.add_argument("--host", help="interface to bind")
+    parser.add_argument("--port", type=int, help="port to listen on")
+    parser.add_argument("--model", dest="model_path", help="model directory to load")
+    parser.add_argument(
+        "--backend", choices=sorted(BACKENDS),
+        help="vosk, or dualpass: fast model partials with main model finals")
+    parser.add_argument("--fast-model", help="partials model for the dualpass backend")
+    parser.add_argument(
+        "--input-format", choices=INPUT_FORMATS,
+        help="audio format clients send unless their start message says otherwise")
+    parser.add_argument("--words", action="store_true", default=None, help="word timings in final results")
+    parser.add_argument(
+        "--partial-words", action="store_true", default=None, help="word timings in partial results")
+    parser.add_argument("--vad", action="store_true", default=None, help="skip silence before decoding")
+    parser.add_argument("--no-vad", dest="vad", action="store_false", help="decode all audio")
+    parser.add_argument(
+        "--workers", type=int,
+        help="pre-forked worker processes sharing one loaded model (Linux/macOS)")
+    parser.add_argument("--decode-threads", type=int, help="decode threads per process")
+    parser.add_argument(
+        "--eager-load", dest="lazy_load", action="store_false", default=None,
+        help="load the model before accepting connections")
+    parser.add_argument(
+        "--fallback-model", help="small model served while the main model loads")
+    parser.add_argument(
+        "--no-fallback", dest="fallback_model", action="store_const", const="",
+        help="make early clients wait for the main model")
+    parser.add_argument(
+        "--metrics-port", type=int,
+        help="serve /metrics (Prometheus) and /metrics.json on this HTTP port")
+    parser.add_argument(
+        "--metrics-interval", type=float, help="log a JSON metrics summary every N seconds")
+    parser.add_argument(
+        "--ingest-policy", choices=POLICIES,
+        help="what a session does once it falls more than --max-lag behind the client")
+    parser.add_argument("--max-lag", type=float, help="seconds of queued audio before the ingest policy applies")
+    parser.add_argument("--frame-ms", type=int, help="audio per decode call; smaller frames are coalesced")
+    parser.add_argument(
+        "--partial-interval", type=float, help="minimum seconds between partial results (0 = every change)")
+    return parser
+
+def config_from_args(args):
+    config = env_overrides(PRESETS[args.preset])
+    changes = {
+        name: getattr(args, name)
+        for name in (
+            "host", "port", "model_path", "backend", "fast_model", "input_format", "words",
+            "partial_words", "vad", "workers", "decode_threads",
+            "metrics_port", "metrics_interval", "lazy_load", "fallback_model",
+            "ingest_policy", "max_lag", "frame_ms", "partial_interval"
+        )
+        if getattr(args, name) is not None
+    }
+    return config.with_options(**changes)
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    args = build_parser().parse_args(argv)
+    config = config_from_args(args)
+    logging.getLogger(__name__).info(f"🎤 Starting STT server (preset: {args.preset})...")
+    STTServer(config).run()
+
+if __name__ == "__main__":
+    main()
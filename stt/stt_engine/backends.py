@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Recognizer backends.
+
+A backend owns the loaded model and opens one recognizer session per
+client. Sessions take 16-bit mono PCM and return ready-to-send messages:
+
+- ``accept(pcm)`` -> ``{'type': 'final' | 'partial', 'text': ...}``
+  (callers must not modify it: an unchanged partial may be returned again)
+- ``final(defer=False)`` -> the final message for whatever audio is
+  pending; with ``defer`` a backend may hand the expensive part off (see
+  ``take_deferred``) and return a partial instead
+- ``reset()`` starts a new utterance, ``close()`` gives resources back
+- ``take_deferred()`` (optional) -> callables producing final messages,
+  run by the server off the live decode path
+
+All session methods block and are called from the decode executor.
+"""
+
+import json
+import time
+from functools import partial
+
+class VoskSession:
+    def __init__(self, backend):
+        self.backend = backend
+        self.recognizer = backend.recognizers.acquire()
+        # (raw JSON, message) of the last partial
+        self._partial = None
+
+    def _message(self, msg_type, result):
+        key = 'partial' if msg_type == 'partial' else 'text'
+        message = {'type': msg_type, 'text': result.get(key, '').strip()}
+        words = result.get('partial_result' if msg_type == 'partial' else 'result')
+        if words:
+            message['result'] = words
+        return message
+
+    def accept(self, pcm):
+        if self.recognizer.AcceptWaveform(pcm):
+            self._partial = None
+            return self._message('final', json.loads(self.recognizer.Result()))
+        raw = self.recognizer.PartialResult()
+        # Partials repeat for many chunks; identical JSON is not parsed again
+        if self._partial is None or self._partial[0] != raw:
+            self._partial = (raw, self._message('partial', json.loads(raw)))
+        return self._partial[1]
+
+    def final(self, defer=False):
+        self._partial = None
+        return self._message('final', json.loads(self.recognizer.FinalResult()))
+
+    def reset(self):
+        self._partial = None
+        self.recognizer.Reset()
+
+    def close(self):
+        self.backend.recognizers.release(self.recognizer)
+
+class VoskBackend:
+    name = 'vosk'
+
+    def __init__(self, model_path, sample_rate=16000, words=False, partial_words=False, max_recognizers=None):
+        self.model_path = model_path
+        self.sample_rate = sample_rate
+        self.words = words
+        self.partial_words = partial_words
+        self.max_recognizers = max_recognizers
+        self.model = None
+        self.recognizers = None
+
+    def _configure(self, recognizer):
+        if self.words:
+            recognizer.SetWords(True)
+        if self.partial_words:
+            recognizer.SetPartialWords(True)
+
+    def load(self):
+        """Load the model (blocking)"""
+        from vosk import Model, SetLogLevel
+        from .recognizer_pool import RecognizerPool
+
+        SetLogLevel(-1)
+        self.model = Model(self.model_path)
+        self.recognizers = RecognizerPool(
+            self.model, self.sample_rate, max_size=self.max_recognizers, configure=self._configure
+        )
+        # A couple are built now, while nothing is connected, so the first
+        # sessions only pop one; the pool grows on demand after that
+        self.recognizers.prewarm()
+
+    @property
+    def loaded(self):
+        return self.model is not None
+
+    def open_session(self):
+        return VoskSession(self)
+
+class DualPassSession:
+    def __init__(self, backend):
+        self.backend = backend
+        self.fast = backend.fast.open_session()
+        self.utterance = bytearray()
+        self.utterances = 0
+        self._deferred = []
+
+    def _end_utterance(self, fast_message, defer):
+        """Hand the buffered utterance to the accurate model"""
+        pcm = bytes(self.utterance)
+        self.utterance.clear()
+        self.utterances += 1
+        if not fast_message['text']:
+            # The fast model heard nothing; not worth a large-model pass
+            return fast_message
+        job = partial(self.backend.rescore, pcm, fast_message['text'], self.utterances)
+        if not defer:
+            return job()
+        self._deferred.append(job)
+        # Keep the fast transcript on screen until the rescored final arrives
+        return {'type': 'partial', 'text': fast_message['text'], 'utterance': self.utterances}
+
+    def accept(self, pcm):
+        self.utterance.extend(pcm)
+        message = self.fast.accept(pcm)
+        if message['type'] == 'final':
+            return self._end_utterance(message, defer=True)
+        if len(self.utterance) >= self.backend.max_utterance_bytes:
+            return self._end_utterance(self.fast.final(), defer=True)
+        return message
+
+    def final(self, defer=False):
+        return self._end_utterance(self.fast.final(), defer=defer)
+
+    def take_deferred(self):
+        jobs, self._deferred = self._deferred, []
+        return jobs
+
+    def reset(self):
+        self.fast.reset()
+        self.utterance.clear()
+        self._deferred = []
+
+    def close(self):
+        self.fast.close()
+
+class DualPassBackend:
+    """Small model for real-time partials, large model for each utterance's final.
+
+    The fast model decodes the live stream and detects utterance ends; the
+    audio of every completed utterance is then decoded again by the
+    accurate model, and that result is the final sent to the client.
+    """
+
+    name = 'dualpass'
+
+    def __init__(self, fast, accurate, max_utterance_seconds=30.0):
+        self.fast = fast
+        self.accurate = accurate
+        self.model_path = accurate.model_path
+        # Long monologues are cut so rescoring latency stays bounded
+        self.max_utterance_bytes = int(max_utterance_seconds * accurate.sample_rate) * 2
+
+    def fallback_backend(self):
+        """The fast model doubles as the fallback while the accurate one loads"""
+        return self.fast
+
+    def load(self):
+        if not self.fast.loaded:
+            self.fast.load()
+        self.accurate.load()
+
+    @property
+    def loaded(self):
+        return self.fast.loaded and self.accurate.loaded
+
+    def open_session(self):
+        return DualPassSession(self)
+
+    def rescore(self, pcm, fast_text, utterance):
+        """Decode one complete utterance with the accurate model (blocking)"""
+        started = time.perf_counter()
+        session = self.accurate.open_session()
+        try:
+            first = session.accept(pcm)
+            message = session.final()
+        finally:
+            session.close()
+        if first['type'] == 'final':
+            # The utterance ends in the silence that ended it for the fast model,
+            # so the accurate one usually endpoints inside accept() and has
+            # little or nothing left for final()
+            message = self._join(first, message)
+        message['utterance'] = utterance
+        message['fast_text'] = fast_text
+        message['rescore_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return message
+
+    @staticmethod
+    def _join(first, last):
+        """One final message from two consecutive finals of the same utterance"""
+        message = {'type': 'final', 'text': ' '.join(m['text'] for m in (first, last) if m['text'])}
+        words = first.get('result', []) + last.get('result', [])
+        if words:
+            message['result'] = words
+        return message
+
+def _vosk_backend(config, model_path):
+    return VoskBackend(
+        model_path,
+        sample_rate=config.sample_rate,
+        words=config.words,
+        partial_words=config.partial_words,
+        max_recognizers=config.max_recognizers,
+    )
+
+# Backend name -> factory taking (config, model_path)
+BACKENDS = {
+    'vosk': _vosk_backend,
+    'dualpass': lambda config, model_path: DualPassBackend(
+        _vosk_backend(config, config.resolve_fast_model_path()),
+        _vosk_backend(config, model_path),
+    ),
+}
+
+def create_backend(config, model_path=None):
+    try:
+        factory = BACKENDS[config.backend]
+    except KeyError:
+        raise ValueError(f"Unknown recognizer backend: {config.backend}")
+    return factory(config, model_path or config.resolve_model_path())
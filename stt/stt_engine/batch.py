@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Offline batch transcription of recorded answers.
+
+The test_ffmpeg.py pipeline (ffmpeg -> 16 kHz mono s16le -> recognizer)
+fanned out over a process pool, for re-transcribing whole directories:
+
+    python -m stt_engine.batch answers/ --output transcripts.jsonl
+    python -m stt_engine.batch --manifest nightly.txt --jobs 8 --output transcripts.jsonl --resume
+
+The model is loaded once before the pool starts; where processes are
+forked (Linux/macOS) every worker shares its pages, elsewhere each worker
+loads its own copy. Each worker keeps one warm recognizer and reads
+ffmpeg's output in large blocks (``--read-kb``), which costs far fewer
+AcceptWaveform calls than streaming-sized chunks.
+
+A manifest lists one recording per line, either a plain path or a JSON
+object with a ``path`` field whose other fields are copied to the output.
+The output has one JSON line per file, written as files complete:
+``path``, ``text``, ``audio_seconds``, ``decode_seconds`` (ffmpeg plus
+recognizer), ``rtf`` (decode time / audio time) and ``error``. A file that
+is not done within ``--timeout`` seconds is killed and recorded as failed.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from .backends import create_backend
+from .config import PRESETS
+from .prefork import can_fork
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = (".wav", ".webm", ".ogg", ".opus", ".mp3", ".m4a", ".flac")
+
+# Set in the parent before forking, or per worker by _init_worker
+_backend = None
+_options = None
+
+def find_recordings(paths):
+    """Yield one job dict per audio file under ``paths``"""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.lower().endswith(AUDIO_EXTENSIONS):
+                        yield {"path": os.path.join(root, name)}
+        else:
+            yield {"path": path}
+
+def read_manifest(path):
+    """Yield one job dict per manifest line (a path or a JSON object with "path")"""
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            job = json.loads(line) if line.startswith("{") else {"path": line}
+            # Relative paths are relative to the manifest
+            job["path"] = os.path.join(base, job["path"])
+            yield job
+
+def completed_paths(output):
+    """Paths already transcribed without error in an existing output file"""
+    done = set()
+    if not os.path.exists(output):
+        return done
+    with open(output, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Truncated last line of an interrupted run
+            if not record.get("error"):
+                done.add(record["path"])
+    return done
+
+def _init_worker(config, options):
+    global _backend, _options
+    _options = options
+    if _backend is None:
+        _backend = create_backend(config)
+        _backend.load()
+
+def transcribe(job):
+    """Decode one file with ffmpeg and run it through a recognizer session"""
+    record = dict(job)
+    sample_rate = _options["sample_rate"]
+    texts = []
+    audio_bytes = 0
+    started = time.perf_counter()
+    session = _backend.open_session()
+    try:
+        command = [
+            _options["ffmpeg"], "-loglevel", "error", "-nostdin",
+            "-i", job["path"],
+            "-ar", str(sample_rate), "-ac", "1", "-f", "s16le", "-",
+        ]
+        read_size = _options["read_bytes"]
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            process.kill()
+
+        # stderr goes to a file: a pipe nobody reads until EOF fills up on a
+        # noisy input and blocks ffmpeg (and this worker) for good
+        with tempfile.TemporaryFile() as errors, subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=errors, bufsize=read_size
+        ) as process:
+            timer = threading.Timer(_options["timeout"], kill)
+            timer.start()
+            try:
+                while True:
+                    pcm = process.stdout.read(read_size)
+                    if not pcm:
+                        break
+                    audio_bytes += len(pcm)
+                    message = session.accept(pcm)
+                    if message["type"] == "final" and message["text"]:
+                        texts.append(message["text"])
+                process.wait()
+            finally:
+                timer.cancel()
+            errors.seek(0)
+            stderr = errors.read(4096)
+        if timed_out.is_set():
+            raise TimeoutError(f"Not transcribed within {_options['timeout']}s")
+        if process.returncode != 0:
+            raise RuntimeError(stderr.decode("utf-8", "replace").strip() or f"ffmpeg exited with {process.returncode}")
+        message = session.final()
+        if message["text"]:
+            texts.append(message["text"])
+        record["error"] = None
+    except Exception as e:
+        record["error"] = str(e)
+    finally:
+        session.close()
+
+    elapsed = time.perf_counter() - started
+    audio_seconds = audio_bytes / (2.0 * sample_rate)
+    record.update(
+        text=" ".join(texts),
+        audio_seconds=round(audio_seconds, 3),
+        decode_seconds=round(elapsed, 3),
+        rtf=round(elapsed / audio_seconds, 4) if audio_seconds else None,
+    )
+    return record
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Transcribe recordings offline in parallel")
+    parser.add_argument("inputs", nargs="*", help="audio files or directories (searched recursively)")
+    parser.add_argument("--manifest", help="file listing recordings, one path or JSON object per line")
+    parser.add_argument("--output", "-o", required=True, help="JSONL file to write transcripts to")
+    parser.add_argument("--resume", action="store_true", help="append, skipping files already transcribed")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="default", help="base configuration")
+    parser.add_argument("--model", dest="model_path", help="model directory to load")
+    parser.add_argument("--words", action="store_true", help="word timings in the recognizer results")
+    parser.add_argument("--read-kb", type=int, default=256, help="ffmpeg read size in KB")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg binary")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds allowed per file before it is failed")
+    args = parser.parse_args(argv)
+
+    jobs = list(find_recordings(args.inputs))
+    if args.manifest:
+        jobs.extend(read_manifest(args.manifest))
+    done = completed_paths(args.output) if args.resume else set()
+    unique = []
+    for job in jobs:
+        # A file listed twice (directory and manifest) is transcribed once
+        if job["path"] not in done:
+            done.add(job["path"])
+            unique.append(job)
+    jobs = unique
+    if not jobs:
+        logger.info("Nothing to transcribe")
+        return
+
+    # One session at a time per worker, so one recognizer each
+    config = PRESETS[args.preset].with_options(max_recognizers=1)
+    if args.words:
+        config = config.with_options(words=True)
+    if args.model_path:
+        config = config.with_options(model_path=args.model_path)
+    options = {
+        "sample_rate": config.sample_rate,
+        "ffmpeg": args.ffmpeg,
+        "timeout": args.timeout,
+        # Whole samples
+        "read_bytes": args.read_kb * 1024 // 2 * 2,
+    }
+    workers = max(1, min(args.jobs, len(jobs)))
+
+    if can_fork():
+        # Loaded once here; forked workers share the model's pages
+        context = multiprocessing.get_context("fork")
+        _init_worker(config, options)
+    else:
+        context = multiprocessing.get_context()
+    logger.info(f"🎧 Transcribing {len(jobs)} files with {workers} workers")
+
+    started = time.perf_counter()
+    audio = 0.0
+    failed = 0
+    with open(args.output, "a" if args.resume else "w", encoding="utf-8") as out:
+        with context.Pool(workers, initializer=_init_worker, initargs=(config, options)) as pool:
+            for index, record in enumerate(pool.imap_unordered(transcribe, jobs), 1):
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                audio += record["audio_seconds"]
+                if record["error"]:
+                    failed += 1
+                    logger.error(f"❌ {record['path']}: {record['error']}")
+                if index % 100 == 0:
+                    logger.info(f"📝 {index}/{len(jobs)} files")
+    wall = time.perf_counter() - started
+
+    logger.info(
+        f"✅ {len(jobs)} files ({failed} failed), {audio:.1f}s of audio in {wall:.1f}s "
+        f"({audio / wall if wall else 0:.1f}x real time)"
+    )
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for STT engine configurations.
+
+Replays recordings through the same Session pipeline the server runs
+(decoder -> VAD -> recognizer), without a WebSocket in between, so
+configurations can be compared on decode cost alone:
+
+    python -m stt_engine.benchmark recording.wav --config pcm_s16le --config pcm_s16le+vad
+    python -m stt_engine.benchmark answer.webm --config webm --config webm+vad
+
+A config spec is an input format followed by ``+option`` flags
+(``vad``, ``words``, ``partial_words``, ``dualpass``). WAV input must be 16-bit mono at
+the engine sample rate; WebM files are fed as-is in MediaRecorder-sized
+chunks.
+"""
+
+import argparse
+import json
+import statistics
+import time
+import wave
+
+import numpy as np
+
+from .backends import create_backend
+from .config import INPUT_FORMATS, PRESETS
+from .session import Session
+
+SPEC_OPTIONS = ("vad", "words", "partial_words", "dualpass")
+
+def parse_spec(spec, base):
+    """'webm+vad' -> base config with input_format='webm', vad=True"""
+    input_format, *options = spec.split("+")
+    if input_format not in INPUT_FORMATS:
+        raise ValueError(f"Unknown input format in {spec!r}")
+    changes = {"input_format": input_format}
+    for option in options:
+        if option not in SPEC_OPTIONS:
+            raise ValueError(f"Unknown option {option!r} in {spec!r}")
+        if option == "dualpass":
+            changes["backend"] = "dualpass"
+        else:
+            changes[option] = True
+    return base.with_options(**changes)
+
+def load_recording(path, sample_rate):
+    """Return (kind, payload): ('pcm', s16le bytes) or ('webm', file bytes)"""
+    if path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as wav:
+            if wav.getnchannels() != 1 or wav.getsampwidth() != 2 or wav.getframerate() != sample_rate:
+                raise ValueError(f"{path}: expected 16-bit mono {sample_rate} Hz WAV")
+            return "pcm", wav.readframes(wav.getnframes())
+    with open(path, "rb") as f:
+        return "webm", f.read()
+
+def chunks_for(config, kind, payload, chunk_ms):
+    """Split a recording into the frames a client would send for this config"""
+    if config.input_format == "webm":
+        if kind != "webm":
+            raise ValueError("webm configs need a .webm recording")
+        # MediaRecorder timeslices are around 4 KB at voice bitrates
+        size = 4096
+    else:
+        if kind != "pcm":
+            raise ValueError(f"{config.input_format} configs need a .wav recording")
+        if config.input_format == "pcm_f32le":
+            samples = np.frombuffer(payload, dtype=np.int16).astype(np.float32) / 32768.0
+            payload = samples.tobytes()
+            size = config.sample_rate * 4 * chunk_ms // 1000
+        else:
+            size = config.sample_rate * 2 * chunk_ms // 1000
+    return [payload[i:i + size] for i in range(0, len(payload), size)]
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+def run_config(spec, config, backend, kind, payload, chunk_ms):
+    chunks = chunks_for(config, kind, payload, chunk_ms)
+    session = Session(spec, config, backend)
+    chunk_times = []
+    texts = []
+    rescore_seconds = 0.0
+
+    def run_deferred():
+        # Dual-pass finals; the server runs these on separate threads
+        nonlocal rescore_seconds
+        t0 = time.perf_counter()
+        messages = [job() for job in session.take_deferred()]
+        rescore_seconds += time.perf_counter() - t0
+        return messages
+
+    started = time.perf_counter()
+    for chunk in chunks:
+        t0 = time.perf_counter()
+        messages = session.process(chunk)
+        chunk_times.append(time.perf_counter() - t0)
+        messages += run_deferred()
+        texts.extend(m["text"] for m in messages if m["type"] == "final" and m.get("text"))
+    t0 = time.perf_counter()
+    messages = session.finish()
+    messages = messages[:-1] + run_deferred() + messages[-1:]
+    final_latency = time.perf_counter() - t0
+    elapsed = time.perf_counter() - started
+    texts.extend(m["text"] for m in messages if m["type"] == "final" and m.get("text"))
+    session.close()
+
+    # Decoded PCM, so the duration is right for any input format
+    audio_seconds = session.audio_bytes / (2.0 * config.sample_rate)
+    return {
+        "config": spec,
+        "audio_seconds": round(audio_seconds, 3),
+        "processing_seconds": round(elapsed, 3),
+        "rtf": round(elapsed / audio_seconds, 4) if audio_seconds else None,
+        "chunks": len(chunks),
+        "chunk_ms_mean": round(statistics.mean(chunk_times) * 1000, 2) if chunk_times else 0.0,
+        "chunk_ms_p50": round(percentile(chunk_times, 50) * 1000, 2),
+        "chunk_ms_p95": round(percentile(chunk_times, 95) * 1000, 2),
+        "final_latency_ms": round(final_latency * 1000, 2),
+        "rescore_seconds": round(rescore_seconds, 3),
+        "text": " ".join(texts),
+    }
+
+def print_table(results):
+    header = f"{'config':<28}{'audio s':>9}{'RTF':>8}{'p50 ms':>9}{'p95 ms':>9}{'final ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        rtf = f"{r['rtf']:.3f}" if r["rtf"] is not None else "-"
+        print(
+            f"{r['config']:<28}{r['audio_seconds']:>9.2f}{rtf:>8}"
+            f"{r['chunk_ms_p50']:>9.2f}{r['chunk_ms_p95']:>9.2f}{r['final_latency_ms']:>10.2f}"
+        )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark STT engine configurations")
+    parser.add_argument("recording", help=".wav (16-bit mono) or .webm recording")
+    parser.add_argument(
+        "--config", action="append", dest="specs",
+        help="input format plus +options, e.g. pcm_s16le+vad (repeatable)")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="default", help="base configuration")
+    parser.add_argument("--model", dest="model_path", help="model directory to load")
+    parser.add_argument("--fast-model", help="partials model for +dualpass configs")
+    parser.add_argument("--chunk-ms", type=int, default=100, help="PCM chunk size in milliseconds")
+    parser.add_argument("--json", dest="json_path", help="also write results to this file")
+    args = parser.parse_args(argv)
+
+    base = PRESETS[args.preset]
+    if args.model_path:
+        base = base.with_options(model_path=args.model_path)
+    if args.fast_model:
+        base = base.with_options(fast_model=args.fast_model)
+    specs = args.specs or [base.input_format]
+    configs = [(spec, parse_spec(spec, base)) for spec in specs]
+
+    kind, payload = load_recording(args.recording, base.sample_rate)
+
+    # Backend type and word output are fixed per loaded backend, so only
+    # configs that differ in them load a separate one
+    backends = {}
+    results = []
+    for spec, config in configs:
+        key = (config.backend, config.words, config.partial_words)
+        if key not in backends:
+            backends[key] = create_backend(config)
+            backends[key].load()
+        results.append(run_config(spec, config, backends[key], kind, payload, args.chunk_ms))
+
+    print_table(results)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
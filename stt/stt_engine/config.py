@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Configuration for the consolidated STT engine.
+
+Every option that used to distinguish the separate stt_server_*.py
+variants (model choice, input audio format, word-level output, VAD, ...)
+is an explicit field here. ``PRESETS`` reproduces each former variant so
+the old entry points keep their behaviour.
+"""
+
+import os
+from dataclasses import dataclass, replace
+from typing import Optional, Tuple
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "model")
+
+DEFAULT_MODEL = "vosk-model-en-us-0.22"
+
+# Loads in about a second; serves early connections while a large model loads
+FALLBACK_MODEL = "vosk-model-small-en-us-0.15"
+
+# Input formats understood by stt_engine.decoders
+INPUT_FORMATS = ("pcm_s16le", "pcm_f32le", "webm")
+
+@dataclass
+class STTConfig:
+    host: str = "localhost"
+    port: int = 8765
+    # Explicit model directory; when unset the first of ``model_candidates``
+    # found under MODEL_DIR is used
+    model_path: Optional[str] = None
+    model_candidates: Tuple[str, ...] = (DEFAULT_MODEL,)
+    # "vosk", or "dualpass": fast_model for partials, the main model for finals
+    backend: str = "vosk"
+    fast_model: str = FALLBACK_MODEL
+    # Threads for dual-pass rescoring, separate from live decoding (default: half the CPUs)
+    rescore_threads: Optional[int] = None
+    sample_rate: int = 16000
+    # Format of the audio clients send unless their start message says otherwise
+    input_format: str = "pcm_s16le"
+    # Word-level timing in final / partial results
+    words: bool = False
+    partial_words: bool = False
+    vad: bool = False
+    # Pre-forked worker processes sharing one loaded model (1 = single process)
+    workers: int = 1
+    # Decode threads per process (defaults to the CPU count)
+    decode_threads: Optional[int] = None
+    # Idle recognizers kept for reuse (defaults to twice the decode threads)
+    max_recognizers: Optional[int] = None
+    ffmpeg: str = "ffmpeg"
+    # Bind immediately and load models in the background (single process only:
+    # pre-forked workers need the model loaded before the fork to share it)
+    lazy_load: bool = True
+    # Model used for connections that arrive while the main model loads
+    # (name under MODEL_DIR or a path; None disables the fallback)
+    fallback_model: Optional[str] = FALLBACK_MODEL
+    # Seconds an early client waits for any model before it is disconnected
+    load_timeout: float = 120.0
+    # HTTP port for /metrics (worker N of a pre-fork server uses port + N)
+    metrics_port: Optional[int] = None
+    # Seconds between JSON metric summaries in the log (0 = off)
+    metrics_interval: float = 0.0
+    # What a session does once its queued audio is older than max_lag
+    # seconds: skip_partials, drop_oldest or slow_down (see stt_engine.ingest)
+    ingest_policy: str = "skip_partials"
+    max_lag: float = 1.0
+    # Audio per decode call; smaller client frames are coalesced up to this
+    frame_ms: int = 100
+    # Queued audio per session before the server stops reading from the client
+    max_buffer_seconds: float = 10.0
+    # Minimum seconds between partial results (unchanged partials are never sent)
+    partial_interval: float = 0.2
+
+    def resolve_model_path(self):
+        """Return the model directory to load"""
+        if self.model_path:
+            return self.model_path
+        for name in self.model_candidates:
+            path = os.path.join(MODEL_DIR, name)
+            if os.path.exists(path):
+                return path
+        return os.path.join(MODEL_DIR, self.model_candidates[-1])
+
+    def resolve_fast_model_path(self):
+        """Return the fast (partials) model directory for the dual-pass backend"""
+        if os.path.exists(self.fast_model):
+            return self.fast_model
+        return os.path.join(MODEL_DIR, self.fast_model)
+
+    def resolve_fallback_path(self):
+        """Return the fallback model directory, or None if there is no distinct one"""
+        if not self.fallback_model:
+            return None
+        path = self.fallback_model
+        if not os.path.exists(path):
+            path = os.path.join(MODEL_DIR, self.fallback_model)
+        if not os.path.exists(path):
+            return None
+        if os.path.abspath(path) == os.path.abspath(self.resolve_model_path()):
+            return None
+        return path
+
+    def with_options(self, **changes):
+        return replace(self, **changes)
+
+PRESETS = {
+    # stt_server.py
+    "default": STTConfig(),
+    # stt_server_basic.py: smallest available model first, VAD on
+    "basic": STTConfig(
+        model_candidates=(
+            "vosk-model-small-en-us-0.15",
+            "vosk-model-en-us-0.22-lgraph",
+            DEFAULT_MODEL,
+        ),
+        vad=True,
+    ),
+    # stt_server_improved.py
+    "improved": STTConfig(),
+    # stt_server_simple.py
+    "simple": STTConfig(),
+    # stt_server_fixed.py: MediaRecorder WebM/Opus from the interview UI
+    "fixed": STTConfig(input_format="webm", vad=True),
+    # The interview UI's input with small-model partials and 0.22 finals
+    "dualpass": STTConfig(backend="dualpass", input_format="webm", vad=True),
+    # stt_server_python39.py: word-level results
+    "python39": STTConfig(words=True, partial_words=True),
+}
+
+def env_overrides(config):
+    """Apply STT_* environment variables on top of a config"""
+    changes = {}
+    if "STT_WORKERS" in os.environ:
+        changes["workers"] = int(os.environ["STT_WORKERS"])
+    if "STT_VAD" in os.environ:
+        changes["vad"] = os.environ["STT_VAD"] != "0"
+    if "STT_MODEL_PATH" in os.environ:
+        changes["model_path"] = os.environ["STT_MODEL_PATH"]
+    if "STT_LAZY_LOAD" in os.environ:
+        changes["lazy_load"] = os.environ["STT_LAZY_LOAD"] != "0"
+    if "STT_FALLBACK_MODEL" in os.environ:
+        changes["fallback_model"] = os.environ["STT_FALLBACK_MODEL"] or None
+    if "STT_METRICS_PORT" in os.environ:
+        changes["metrics_port"] = int(os.environ["STT_METRICS_PORT"])
+    if "STT_INGEST_POLICY" in os.environ:
+        changes["ingest_policy"] = os.environ["STT_INGEST_POLICY"]
+    if "STT_MAX_LAG" in os.environ:
+        changes["max_lag"] = float(os.environ["STT_MAX_LAG"])
+    if "STT_PARTIAL_INTERVAL" in os.environ:
+        changes["partial_interval"] = float(os.environ["STT_PARTIAL_INTERVAL"])
+    return replace(config, **changes) if changes else config
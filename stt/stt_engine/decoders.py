@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Input decoders: turn whatever a client sends into 16-bit mono PCM.
+
+Every decoder has the same two methods, so the server does not care which
+one a session uses:
+
+- ``decode(chunk)`` returns the PCM available after this chunk (may be empty)
+- ``close()`` flushes and returns any PCM still buffered
+"""
+
+import numpy as np
+
+from .webm_decoder import StreamingWebMDecoder
+
+# Sample formats a client may declare for raw PCM, and their numpy types
+SAMPLE_FORMATS = {"s16le": np.dtype("<i2"), "f32le": np.dtype("<f4")}
+
+# Anti-aliasing filter length for downsampling (odd, so the delay is whole samples)
+LOWPASS_TAPS = 63
+
+def lowpass_taps(input_rate, output_rate, taps=LOWPASS_TAPS):
+    """Windowed-sinc low-pass just below the output Nyquist frequency"""
+    cutoff = 0.45 * output_rate / input_rate  # cycles per input sample
+    n = np.arange(taps) - (taps - 1) / 2.0
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    return (kernel / kernel.sum()).astype(np.float32)
+
+class PcmS16Decoder:
+    """Raw s16le mono at the engine rate: passed through untouched (zero-copy)"""
+
+    def decode(self, chunk):
+        return chunk
+
+    def close(self):
+        return b""
+
+class PcmDecoder:
+    """Raw PCM in any declared rate, channel count and sample format
+
+    Browsers capture at 44.1 or 48 kHz, often as float32 straight from an
+    AudioWorklet. Each chunk is downmixed, low-pass filtered, resampled
+    and quantized to int16 at the engine rate with vectorized numpy. The
+    filter history and the resampling phase carry over between chunks, so
+    chunk boundaries do not matter, and work buffers are reused (growing
+    only when a larger chunk arrives).
+    """
+
+    def __init__(self, sample_format="f32le", input_rate=16000, channels=1, sample_rate=16000):
+        self.dtype = SAMPLE_FORMATS[sample_format]
+        self.channels = channels
+        self.frame_bytes = self.dtype.itemsize * channels
+        # Input samples per output sample
+        self.step = input_rate / float(sample_rate)
+        # 48 kHz -> 16 kHz and the like: every Nth sample, no interpolation
+        self.decimate = int(self.step) if self.step == int(self.step) else None
+        self.kernel = lowpass_taps(input_rate, sample_rate) if input_rate > sample_rate else None
+        self._history = len(self.kernel) - 1 if self.kernel is not None else 0
+        self._remainder = b""
+        self._raw = np.zeros(self._history, dtype=np.float32)
+        self._signal = np.zeros(0, dtype=np.float32)
+        self._ramp = np.zeros(0)
+        self._out = np.zeros(0, dtype=np.int16)
+        # Last (filtered) sample of the previous chunk, and where the next
+        # output sample falls relative to it, in input samples
+        self._last = 0.0
+        self._position = 1.0
+
+    def _samples(self, chunk):
+        """Whole frames of the chunk as mono float32 in [-1, 1]"""
+        if self._remainder:
+            chunk = self._remainder + chunk
+        usable = len(chunk) - len(chunk) % self.frame_bytes
+        self._remainder = bytes(chunk[usable:])
+        samples = np.frombuffer(chunk, dtype=self.dtype, count=usable // self.dtype.itemsize)
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+        if self.dtype.kind == "i":
+            samples = samples * np.float32(1.0 / 32768.0)
+        return samples
+
+    def _filter(self, samples, out):
+        """Low-pass ``samples`` into ``out``, continuing from the previous chunk"""
+        history, count = self._history, len(samples)
+        if len(self._raw) < history + count:
+            grown = np.empty(max(history + count, 2 * len(self._raw)), dtype=np.float32)
+            grown[:history] = self._raw[:history]
+            self._raw = grown
+        raw = self._raw[:history + count]
+        raw[history:] = samples
+        out[:] = np.convolve(raw, self.kernel, mode="valid")
+        raw[:history] = raw[count:]
+
+    def decode(self, chunk):
+        samples = self._samples(chunk)
+        count = len(samples)
+        if not count:
+            return b""
+
+        # signal[0] is the previous chunk's last sample, so interpolation
+        # spans chunk boundaries
+        if len(self._signal) < count + 1:
+            self._signal = np.empty(max(count + 1, 2 * len(self._signal)), dtype=np.float32)
+        signal = self._signal[:count + 1]
+        signal[0] = self._last
+        if self.kernel is not None:
+            self._filter(samples, signal[1:])
+        else:
+            signal[1:] = samples
+        self._last = float(signal[count])
+
+        if self._position > count:
+            self._position -= count
+            return b""
+        if self.decimate is not None:
+            start = int(self._position)
+            picked = signal[start::self.decimate]
+            self._position = start + len(picked) * self.decimate - count
+        else:
+            n = int((count - self._position) // self.step) + 1
+            if len(self._ramp) < n:
+                self._ramp = np.arange(max(n, 2 * len(self._ramp)), dtype=np.float64)
+            positions = self._position + self._ramp[:n] * self.step
+            index = np.minimum(positions.astype(np.int64), count - 1)
+            fraction = (positions - index).astype(np.float32)
+            picked = signal[index]
+            picked += (signal[index + 1] - picked) * fraction
+            self._position += n * self.step - count
+
+        # Quantize in place (``picked`` is scratch either way)
+        picked *= 32767.0
+        np.clip(picked, -32768.0, 32767.0, out=picked)
+        np.rint(picked, out=picked)
+        n = len(picked)
+        if len(self._out) < n:
+            self._out = np.empty(max(n, 2 * len(self._out)), dtype=np.int16)
+        out = self._out[:n]
+        out[:] = picked
+        return out.tobytes()
+
+    def close(self):
+        self._remainder = b""
+        return b""
+
+class WebMDecoder:
+    """MediaRecorder WebM/Opus stream, decoded by one ffmpeg per session"""
+
+    def __init__(self, sample_rate=16000, ffmpeg="ffmpeg"):
+        self._decoder = StreamingWebMDecoder(sample_rate=sample_rate, ffmpeg=ffmpeg)
+
+    def decode(self, chunk):
+        self._decoder.feed(chunk)
+        return self._decoder.read()
+
+    def close(self):
+        return self._decoder.close()
+
+def create_decoder(input_format, sample_rate=16000, ffmpeg="ffmpeg", input_rate=None, channels=1):
+    """Build the decoder for an input format name (see config.INPUT_FORMATS)
+
+    ``input_rate`` and ``channels`` describe raw PCM input; WebM carries
+    its own and ffmpeg converts it.
+    """
+    input_rate = input_rate or sample_rate
+    if input_format == "pcm_s16le" and input_rate == sample_rate and channels == 1:
+        return PcmS16Decoder()
+    if input_format in ("pcm_s16le", "pcm_f32le"):
+        return PcmDecoder(input_format[4:], input_rate, channels, sample_rate)
+    if input_format == "webm":
+        return WebMDecoder(sample_rate=sample_rate, ffmpeg=ffmpeg)
+    raise ValueError(f"Unknown input format: {input_format}")
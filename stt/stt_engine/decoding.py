@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Decoding executor for the STT servers.
+
+KaldiRecognizer.AcceptWaveform is a blocking native call. Running it on the
+asyncio event loop stalls every other client's WebSocket I/O while one
+chunk decodes. Vosk releases the GIL inside the decoder, so a thread pool
+lets different sessions decode in parallel while the loop stays responsive.
+Calls for the same session are serialized in submission order, because a
+recognizer must see its audio sequentially.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+class DecodeExecutor:
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Threads are started lazily on first submit, so this is safe to
+        # create before the pre-fork workers are spawned
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="vosk-decode"
+        )
+        self._locks = {}
+
+    async def run(self, session_id, func, *args):
+        """Run ``func(*args)`` on the pool, after any earlier call for ``session_id``"""
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = self._locks[session_id] = asyncio.Lock()
+        # asyncio.Lock wakes waiters in FIFO order, which keeps chunks in sequence
+        async with lock:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+
+    def forget(self, session_id):
+        """Drop per-session state once a client disconnects"""
+        self._locks.pop(session_id, None)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
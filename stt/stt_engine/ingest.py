@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Bounded per-session ingest buffer between the WebSocket and the decoder.
+
+The receive loop only appends frames here; a per-session decode task
+takes them out. On the way out small frames are coalesced into
+decoder-sized batches (``frame_ms`` of audio), and the age of the oldest
+queued frame is the session's lag behind the speaker. Once the lag
+exceeds ``max_lag`` one policy applies:
+
+- ``skip_partials``: decode everything queued in one batch and send no
+  partial results until caught up (finals are never skipped)
+- ``drop_oldest``: discard the oldest queued audio down to half of
+  ``max_lag`` (raw PCM only: WebM bytes cannot be dropped without
+  breaking the container, so WebM sessions fall back to skip_partials)
+- ``slow_down``: send ``{"type": "slow_down", "lag_ms": N}`` and, once
+  caught up, ``{"type": "resume"}``
+
+Independently of the policy the buffer holds at most ``max_bytes``; past
+that the receive loop stops reading, so a client that keeps sending gets
+TCP back-pressure instead of growing server memory.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+POLICIES = ("skip_partials", "drop_oldest", "slow_down")
+
+# Bytes per sample of the raw input formats (WebM is compressed)
+BYTES_PER_SAMPLE = {"pcm_s16le": 2, "pcm_f32le": 4}
+
+class IngestBuffer:
+    def __init__(self, input_format, config, on_drop=None):
+        if config.ingest_policy not in POLICIES:
+            raise ValueError(f"Unknown ingest policy: {config.ingest_policy}")
+        self.config = config
+        self.policy = config.ingest_policy
+        self.max_lag = config.max_lag
+        self.frame_seconds = config.frame_ms / 1000.0
+        self.on_drop = on_drop
+        self._frames = deque()  # (arrival perf_counter, bytes)
+        self._size = 0
+        self._data = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.closed = False
+        self.behind = False
+        self.set_format(input_format)
+
+    def set_format(self, input_format, input_rate=None, channels=1):
+        """Size frames for a new input format (call while the buffer is drained)"""
+        width = BYTES_PER_SAMPLE.get(input_format)
+        if width is not None:
+            # One sample of every channel
+            width *= channels
+            bytes_per_second = (input_rate or self.config.sample_rate) * width
+            # Whole samples, so a batch never splits one
+            self.frame_bytes = int(bytes_per_second * self.frame_seconds) // width * width
+            self.max_bytes = int(bytes_per_second * self.config.max_buffer_seconds)
+        else:
+            self.frame_bytes = None
+            # Opus at voice bitrates is a few KB per second
+            self.max_bytes = int(16000 * self.config.max_buffer_seconds)
+        self.can_drop = width is not None
+
+    @property
+    def skip_partials(self):
+        """Whether partial results should be held back for the current batch"""
+        if not self.behind:
+            return False
+        return self.policy == "skip_partials" or (self.policy == "drop_oldest" and not self.can_drop)
+
+    def lag(self):
+        """Seconds the oldest queued frame has been waiting"""
+        if not self._frames:
+            return 0.0
+        return time.perf_counter() - self._frames[0][0]
+
+    async def put(self, chunk, received=None):
+        """Queue one client frame; waits while the buffer is full"""
+        while self._size >= self.max_bytes and not self.closed:
+            self._space.clear()
+            await self._space.wait()
+        if self.closed:
+            return
+        self._frames.append((received or time.perf_counter(), chunk))
+        self._size += len(chunk)
+        self._idle.clear()
+        self._data.set()
+
+    def _drop_oldest(self):
+        dropped = 0
+        target = self.max_lag / 2
+        # Always keep the newest frame
+        while len(self._frames) > 1 and self.lag() > target:
+            _, chunk = self._frames.popleft()
+            self._size -= len(chunk)
+            dropped += 1
+        if dropped and self.on_drop is not None:
+            self.on_drop(dropped)
+
+    async def _fill_frame(self):
+        """Give a short frame until it is one frame old to grow to full size"""
+        deadline = self._frames[0][0] + self.frame_seconds
+        while self._size < self.frame_bytes and not self.closed:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return
+            self._data.clear()
+            try:
+                await asyncio.wait_for(self._data.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
+
+    async def get(self):
+        """Next batch: (audio bytes, arrival of its first frame, lag), or None once closed"""
+        while not self._frames:
+            if self.closed:
+                return None
+            self._idle.set()
+            self._data.clear()
+            await self._data.wait()
+
+        if self.frame_bytes:
+            await self._fill_frame()
+            if not self._frames:
+                return None
+        lag = self.lag()
+        self.behind = lag > self.max_lag
+        if self.behind and self.policy == "drop_oldest" and self.can_drop:
+            self._drop_oldest()
+
+        # On schedule: one frame per decode call. Behind: everything queued,
+        # since per-call overhead is what we cannot afford then
+        limit = None if self.behind or not self.frame_bytes else self.frame_bytes
+        received = self._frames[0][0]
+        parts = []
+        taken = 0
+        while self._frames and (limit is None or taken < limit):
+            _, chunk = self._frames.popleft()
+            parts.append(chunk)
+            taken += len(chunk)
+        self._size -= taken
+        if self._size < self.max_bytes:
+            self._space.set()
+        return b"".join(parts), received, lag
+
+    def task_done(self):
+        """The last batch from get() has been decoded"""
+        if not self._frames:
+            self._idle.set()
+
+    async def drain(self):
+        """Wait until everything queued so far has been decoded"""
+        await self._idle.wait()
+
+    def close(self, discard=False):
+        """Stop accepting frames; with ``discard`` queued audio is thrown away"""
+        self.closed = True
+        if discard:
+            self._frames.clear()
+            self._size = 0
+        self._data.set()
+        self._space.set()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Load test for a running STT WebSocket server.
+
+Replays a corpus of recorded answers from N concurrent simulated clients,
+each behaving like the interview UI (start, audio frames, stop), and
+reports what a host can sustain:
+
+    python -m stt_engine.loadtest answers/ --clients 8 --speed 1
+    python -m stt_engine.loadtest answers/ --clients 32 --speed 4 --server-pid 1234 --json run.json
+
+- real-time factor per session: the server's decode time / audio
+  duration (from the answer to ``stop``), and separately the session's
+  wall time / audio duration, which pacing keeps near ``1 / speed``
+- partial latency: time from the oldest frame not yet answered to the
+  partial that answers it
+- final latency: time from the stop message (end of speech) to the final
+  that answers it (flagged ``stop``; finals of earlier utterances that
+  arrive in between do not count)
+- server CPU seconds and RSS growth per session (``--server-pid``; needs
+  psutil, and includes pre-forked worker children)
+
+``--speed 1`` sends audio at real-time pace, ``--speed 4`` four times
+faster, ``--speed 0`` as fast as the connection allows. WAV files must be
+16-bit mono 16 kHz and are sent as pcm_s16le; WebM files are sent as-is
+in MediaRecorder-sized chunks.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import time
+
+import websockets
+
+from .benchmark import load_recording, percentile
+
+try:
+    import psutil
+except ImportError:  # Server resource sampling is optional
+    psutil = None
+
+SAMPLE_RATE = 16000
+WEBM_CHUNK = 4096
+
+class Recording:
+    def __init__(self, path, chunk_ms, ffmpeg="ffmpeg"):
+        self.path = path
+        kind, payload = load_recording(path, SAMPLE_RATE)
+        if kind == "pcm":
+            self.input_format = "pcm_s16le"
+            self.duration = len(payload) / (2.0 * SAMPLE_RATE)
+            size = SAMPLE_RATE * 2 * chunk_ms // 1000
+        else:
+            self.input_format = "webm"
+            self.duration = webm_duration(path, ffmpeg)
+            size = WEBM_CHUNK
+        self.frames = [payload[i:i + size] for i in range(0, len(payload), size)]
+        # Audio time covered by each frame, used for pacing
+        self.frame_seconds = self.duration / len(self.frames) if self.frames else 0.0
+
+def webm_duration(path, ffmpeg):
+    """Decode once up front: WebM carries no reliable duration for live captures"""
+    pcm = subprocess.run(
+        [ffmpeg, "-loglevel", "quiet", "-i", path, "-ar", str(SAMPLE_RATE), "-ac", "1", "-f", "s16le", "-"],
+        stdout=subprocess.PIPE, check=True
+    ).stdout
+    return len(pcm) / (2.0 * SAMPLE_RATE)
+
+def find_recordings(paths):
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith((".wav", ".webm")):
+                    found.append(os.path.join(path, name))
+        else:
+            found.append(path)
+    return found
+
+async def run_session(url, recording, speed, final_timeout):
+    """Replay one recording over a fresh connection and time the answers"""
+    result = {
+        "file": os.path.basename(recording.path),
+        "audio_seconds": round(recording.duration, 3),
+        "partial_latencies": [],
+        "final_latency": None,
+        "rtf": None,
+        "wall_rtf": None,
+        "error": None,
+    }
+    unanswered = []  # send times of frames no message has answered yet
+    final_received = asyncio.Event()
+    stop_time = None
+
+    async def receive(ws):
+        async for raw in ws:
+            now = time.perf_counter()
+            message = json.loads(raw)
+            msg_type = message.get("type")
+            if msg_type == "partial":
+                if unanswered:
+                    result["partial_latencies"].append(now - unanswered[0])
+                    unanswered.clear()
+            elif msg_type == "final":
+                unanswered.clear()
+                if message.get("stop"):
+                    result["final_latency"] = now - stop_time
+                    if message.get("decode_ms") is not None and recording.duration:
+                        result["rtf"] = message["decode_ms"] / 1000.0 / recording.duration
+                    final_received.set()
+            elif msg_type == "error":
+                result["error"] = message.get("message")
+
+    try:
+        async with websockets.connect(url, max_size=None) as ws:
+            await ws.recv()  # ready
+            await ws.send(json.dumps({"type": "start", "format": recording.input_format}))
+            await ws.recv()  # started
+            receiver = asyncio.create_task(receive(ws))
+
+            started = time.perf_counter()
+            for index, frame in enumerate(recording.frames):
+                if speed > 0:
+                    # Pace against the schedule, not per frame, so send overhead does not accumulate
+                    due = started + index * recording.frame_seconds / speed
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                unanswered.append(time.perf_counter())
+                await ws.send(frame)
+
+            stop_time = time.perf_counter()
+            await ws.send(json.dumps({"type": "stop"}))
+            try:
+                # The server answers every stop with a final, even an empty one
+                await asyncio.wait_for(final_received.wait(), final_timeout)
+            except asyncio.TimeoutError:
+                result["error"] = "no final result after stop"
+            finished = time.perf_counter()
+            receiver.cancel()
+            if recording.duration:
+                result["wall_rtf"] = (finished - started) / recording.duration
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+async def run_client(url, recordings, offset, repeat, speed, final_timeout, results):
+    for i in range(repeat):
+        recording = recordings[(offset + i) % len(recordings)]
+        results.append(await run_session(url, recording, speed, final_timeout))
+
+class ServerSampler:
+    """Samples CPU time and RSS of the server process and its workers"""
+
+    def __init__(self, pid, interval=0.5):
+        self.root = psutil.Process(pid)
+        self.interval = interval
+        self.peak_rss = 0
+
+    def _processes(self):
+        return [self.root] + self.root.children(recursive=True)
+
+    def cpu_seconds(self):
+        total = 0.0
+        for proc in self._processes():
+            try:
+                times = proc.cpu_times()
+                total += times.user + times.system
+            except psutil.NoSuchProcess:
+                pass
+        return total
+
+    def rss(self):
+        total = 0
+        for proc in self._processes():
+            try:
+                total += proc.memory_info().rss
+            except psutil.NoSuchProcess:
+                pass
+        return total
+
+    async def sample(self):
+        while True:
+            self.peak_rss = max(self.peak_rss, self.rss())
+            await asyncio.sleep(self.interval)
+
+def summarize(results, wall, clients, server=None):
+    ok = [r for r in results if not r["error"]]
+    partials = [lat for r in ok for lat in r["partial_latencies"]]
+    finals = [r["final_latency"] for r in ok if r["final_latency"] is not None]
+    rtfs = [r["rtf"] for r in ok if r["rtf"] is not None]
+    wall_rtfs = [r["wall_rtf"] for r in ok if r["wall_rtf"] is not None]
+    audio = sum(r["audio_seconds"] for r in ok)
+
+    def ms(values, pct):
+        return round(percentile(values, pct) * 1000, 1)
+
+    summary = {
+        "clients": clients,
+        "sessions": len(results),
+        "errors": len(results) - len(ok),
+        "wall_seconds": round(wall, 3),
+        "audio_seconds": round(audio, 3),
+        # Audio seconds transcribed per wall second across all clients
+        "throughput": round(audio / wall, 3) if wall else None,
+        "rtf_p50": round(percentile(rtfs, 50), 3),
+        "rtf_p95": round(percentile(rtfs, 95), 3),
+        "wall_rtf_p50": round(percentile(wall_rtfs, 50), 3),
+        "partial_ms_p50": ms(partials, 50),
+        "partial_ms_p95": ms(partials, 95),
+        "partial_ms_p99": ms(partials, 99),
+        "final_ms_p50": ms(finals, 50),
+        "final_ms_p95": ms(finals, 95),
+        "final_ms_max": round(max(finals) * 1000, 1) if finals else 0.0,
+    }
+    if server is not None:
+        summary.update(server)
+    return summary
+
+def print_summary(summary):
+    for key, value in summary.items():
+        print(f"{key:<24}{value}")
+
+async def run(args):
+    recordings = [Recording(path, args.chunk_ms, args.ffmpeg) for path in find_recordings(args.corpus)]
+    if not recordings:
+        raise SystemExit("No .wav or .webm recordings found")
+
+    sampler = sampling = None
+    if args.server_pid:
+        if psutil is None:
+            raise SystemExit("--server-pid needs psutil (pip install psutil)")
+        sampler = ServerSampler(args.server_pid)
+        cpu_before = sampler.cpu_seconds()
+        rss_before = sampler.rss()
+        sampling = asyncio.create_task(sampler.sample())
+
+    results = []
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run_client(args.url, recordings, client, args.repeat, args.speed, args.final_timeout, results)
+        for client in range(args.clients)
+    ))
+    wall = time.perf_counter() - started
+
+    server = None
+    if sampler is not None:
+        sampling.cancel()
+        cpu = sampler.cpu_seconds() - cpu_before
+        audio = sum(r["audio_seconds"] for r in results if not r["error"])
+        server = {
+            "server_cpu_seconds": round(cpu, 2),
+            "server_cpu_per_session": round(cpu / len(results), 3),
+            "server_cpu_per_audio_second": round(cpu / audio, 4) if audio else None,
+            "server_rss_mb": round(sampler.peak_rss / 1e6, 1),
+            # Concurrent sessions, so growth is divided by the client count
+            "server_rss_mb_per_session": round(max(0, sampler.peak_rss - rss_before) / 1e6 / args.clients, 2),
+        }
+    return summarize(results, wall, args.clients, server), results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test a running STT WebSocket server")
+    parser.add_argument("corpus", nargs="+", help=".wav/.webm recordings or directories of them")
+    parser.add_argument("--url", default="ws://localhost:8765", help="server to test")
+    parser.add_argument("--clients", type=int, default=4, help="concurrent simulated clients")
+    parser.add_argument("--repeat", type=int, default=1, help="recordings replayed by each client")
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="playback speed; 1 = real time, 0 = unpaced")
+    parser.add_argument("--chunk-ms", type=int, default=100, help="PCM frame size in milliseconds")
+    parser.add_argument("--final-timeout", type=float, default=10.0, help="seconds to wait for a final")
+    parser.add_argument("--server-pid", type=int, help="sample CPU/RSS of this server process (psutil)")
+    parser.add_argument("--ffmpeg", default="ffmpeg", help="ffmpeg binary used to measure WebM duration")
+    parser.add_argument("--json", dest="json_path", help="write summary and per-session results here")
+    args = parser.parse_args(argv)
+
+    summary, results = asyncio.run(run(args))
+    print_summary(summary)
+    if args.json_path:
+        sessions = [
+            {
+                "file": r["file"],
+                "audio_seconds": r["audio_seconds"],
+                "rtf": round(r["rtf"], 4) if r["rtf"] is not None else None,
+                "wall_rtf": round(r["wall_rtf"], 4) if r["wall_rtf"] is not None else None,
+                "partial_ms": [round(lat * 1000, 1) for lat in r["partial_latencies"]],
+                "final_ms": round(r["final_latency"] * 1000, 1) if r["final_latency"] is not None else None,
+                "error": r["error"],
+            }
+            for r in results
+        ]
+        with open(args.json_path, "w") as f:
+            json.dump({"summary": summary, "sessions": sessions}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
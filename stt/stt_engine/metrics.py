@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Per-session and per-process STT metrics.
+
+Every session keeps a SessionStats (bytes and audio ingested, decode time,
+real-time factor, partial/final counts, late and dropped frames, ingest
+lag) that also
+feeds the process-wide STTMetrics. STTMetrics adds event-loop lag and can
+be exported two ways:
+
+- an HTTP side port (``--metrics-port``): ``/metrics`` in Prometheus text
+  format, ``/metrics.json`` with the same data plus every active session
+- a periodic one-line JSON summary in the log (``--metrics-interval``)
+
+A real-time factor above 1 means AcceptWaveform takes longer than the
+audio it is given, i.e. the session falls behind real time.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# A frame that waits longer than this for the decoder counts as late
+LATE_AFTER = 0.5
+
+CHUNK_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels=""):
+        cumulative = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            sep = "," if labels else ""
+            yield f'{name}_bucket{{{labels}{sep}le="{le}"}} {cumulative}'
+        suffix = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{suffix} {self.sum}"
+        yield f"{name}_count{suffix} {self.count}"
+
+class SessionStats:
+    def __init__(self, session_id, metrics=None, sample_rate=16000):
+        self.id = session_id
+        self.metrics = metrics
+        self.sample_rate = sample_rate
+        self.opened = time.time()
+        self.bytes_in = 0
+        self.audio_bytes = 0
+        self.chunks = 0
+        self.decode_seconds = 0.0
+        self.max_decode_seconds = 0.0
+        self.partials = 0
+        self.finals = 0
+        self.late_frames = 0
+        self.dropped_frames = 0
+        self.skipped_partials = 0
+        # Age of the oldest queued frame when the last batch was taken
+        self.lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+
+    @property
+    def audio_seconds(self):
+        return self.audio_bytes / (2.0 * self.sample_rate)
+
+    @property
+    def rtf(self):
+        """Decode time / audio time; above 1 the session cannot keep up"""
+        audio = self.audio_seconds
+        return self.decode_seconds / audio if audio else 0.0
+
+    def chunk(self, nbytes, pcm_bytes, waited, decode_seconds):
+        """Record one decoded frame (called from the decode thread)"""
+        late = waited > LATE_AFTER
+        self.bytes_in += nbytes
+        self.audio_bytes += pcm_bytes
+        self.chunks += 1
+        self.decode_seconds += decode_seconds
+        self.max_decode_seconds = max(self.max_decode_seconds, decode_seconds)
+        if late:
+            self.late_frames += 1
+        if self.metrics is not None:
+            self.metrics.chunk(nbytes, pcm_bytes, waited, decode_seconds, late)
+
+    def dropped(self, frames=1):
+        self.dropped_frames += frames
+        if self.metrics is not None:
+            self.metrics.dropped(frames)
+
+    def lagged(self, seconds):
+        self.lag_seconds = seconds
+        self.max_lag_seconds = max(self.max_lag_seconds, seconds)
+
+    def skipped(self, partials=1):
+        self.skipped_partials += partials
+        if self.metrics is not None:
+            self.metrics.skipped_partials += partials
+
+    def sent(self, msg_type):
+        if msg_type == "partial":
+            self.partials += 1
+        elif msg_type == "final":
+            self.finals += 1
+        else:
+            return
+        if self.metrics is not None:
+            self.metrics.sent(msg_type)
+
+    def snapshot(self):
+        elapsed = max(time.time() - self.opened, 1e-9)
+        return {
+            "session": str(self.id),
+            "seconds_open": round(elapsed, 1),
+            "bytes_in": self.bytes_in,
+            "audio_seconds": round(self.audio_seconds, 3),
+            "chunks": self.chunks,
+            "decode_seconds": round(self.decode_seconds, 3),
+            "max_decode_ms": round(self.max_decode_seconds * 1000, 1),
+            "rtf": round(self.rtf, 4),
+            "partials_per_second": round(self.partials / elapsed, 3),
+            "finals_per_second": round(self.finals / elapsed, 3),
+            "late_frames": self.late_frames,
+            "dropped_frames": self.dropped_frames,
+            "skipped_partials": self.skipped_partials,
+            "lag_ms": round(self.lag_seconds * 1000, 1),
+            "max_lag_ms": round(self.max_lag_seconds * 1000, 1),
+        }
+
+class STTMetrics:
+    def __init__(self, sample_rate=16000):
+        self.sample_rate = sample_rate
+        self.started = time.time()
+        self.sessions = {}
+        # Decode threads report here concurrently
+        self._lock = threading.Lock()
+        self.sessions_total = 0
+        self.bytes_in = 0
+        self.audio_bytes = 0
+        self.decode_seconds = 0.0
+        self.chunks = 0
+        self.partials = 0
+        self.finals = 0
+        self.late_frames = 0
+        self.dropped_frames = 0
+        self.skipped_partials = 0
+        self.chunk_seconds = Histogram(CHUNK_BUCKETS)
+        self.queue_seconds = Histogram(CHUNK_BUCKETS)
+        self.loop_lag = Histogram(LAG_BUCKETS)
+        self.loop_lag_last = 0.0
+        self.loop_lag_max = 0.0
+
+    def open_session(self, session_id):
+        stats = SessionStats(session_id, metrics=self, sample_rate=self.sample_rate)
+        self.sessions[session_id] = stats
+        self.sessions_total += 1
+        return stats
+
+    def close_session(self, stats):
+        self.sessions.pop(stats.id, None)
+
+    def chunk(self, nbytes, pcm_bytes, waited, decode_seconds, late):
+        with self._lock:
+            self.bytes_in += nbytes
+            self.audio_bytes += pcm_bytes
+            self.decode_seconds += decode_seconds
+            self.chunks += 1
+            if late:
+                self.late_frames += 1
+            self.chunk_seconds.observe(decode_seconds)
+            self.queue_seconds.observe(waited)
+
+    def dropped(self, frames):
+        with self._lock:
+            self.dropped_frames += frames
+
+    def sent(self, msg_type):
+        if msg_type == "partial":
+            self.partials += 1
+        else:
+            self.finals += 1
+
+    async def monitor_loop(self, interval=0.25):
+        """Measure how late the event loop wakes up from a sleep"""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - started - interval)
+            self.loop_lag_last = lag
+            self.loop_lag_max = max(self.loop_lag_max, lag)
+            self.loop_lag.observe(lag)
+
+    def summary(self):
+        audio_seconds = self.audio_bytes / (2.0 * self.sample_rate)
+        return {
+            "active_sessions": len(self.sessions),
+            "sessions_total": self.sessions_total,
+            "bytes_in": self.bytes_in,
+            "audio_seconds": round(audio_seconds, 3),
+            "decode_seconds": round(self.decode_seconds, 3),
+            "rtf": round(self.decode_seconds / audio_seconds, 4) if audio_seconds else 0.0,
+            "max_session_rtf": round(max((s.rtf for s in self.sessions.values()), default=0.0), 4),
+            "chunks": self.chunks,
+            "chunk_ms_avg": round(self.chunk_seconds.sum / self.chunk_seconds.count * 1000, 2)
+            if self.chunk_seconds.count else 0.0,
+            "partials": self.partials,
+            "finals": self.finals,
+            "late_frames": self.late_frames,
+            "dropped_frames": self.dropped_frames,
+            "skipped_partials": self.skipped_partials,
+            "max_session_lag_ms": round(max((s.lag_seconds for s in self.sessions.values()), default=0.0) * 1000, 1),
+            "loop_lag_ms": round(self.loop_lag_last * 1000, 2),
+            "loop_lag_max_ms": round(self.loop_lag_max * 1000, 2),
+        }
+
+    def snapshot(self):
+        summary = self.summary()
+        summary["sessions"] = [stats.snapshot() for stats in self.sessions.values()]
+        return summary
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = []
+
+        def metric(name, kind, help, value=None):
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            if value is not None:
+                lines.append(f"{name} {value}")
+
+        metric("stt_active_sessions", "gauge", "Connected sessions", len(self.sessions))
+        metric("stt_sessions_total", "counter", "Sessions opened", self.sessions_total)
+        metric("stt_bytes_ingested_total", "counter", "Audio bytes received from clients", self.bytes_in)
+        metric(
+            "stt_audio_seconds_ingested_total", "counter", "Seconds of decoded audio fed to the recognizer",
+            self.audio_bytes / (2.0 * self.sample_rate)
+        )
+        metric("stt_decode_seconds_total", "counter", "Time spent decoding", self.decode_seconds)
+        metric("stt_partials_total", "counter", "Partial results sent", self.partials)
+        metric("stt_finals_total", "counter", "Final results sent", self.finals)
+        metric(
+            "stt_late_frames_total", "counter",
+            f"Frames that waited more than {LATE_AFTER}s for the decoder", self.late_frames
+        )
+        metric("stt_dropped_frames_total", "counter", "Frames discarded without decoding", self.dropped_frames)
+        metric("stt_skipped_partials_total", "counter", "Partial results withheld while behind", self.skipped_partials)
+        metric("stt_chunk_decode_seconds", "histogram", "Decode time per chunk")
+        lines.extend(self.chunk_seconds.lines("stt_chunk_decode_seconds"))
+        metric("stt_chunk_queue_seconds", "histogram", "Time a chunk waited before decoding started")
+        lines.extend(self.queue_seconds.lines("stt_chunk_queue_seconds"))
+        metric("stt_event_loop_lag_seconds", "histogram", "Event loop wake-up delay")
+        lines.extend(self.loop_lag.lines("stt_event_loop_lag_seconds"))
+        metric("stt_session_rtf", "gauge", "Decode time / audio time per active session")
+        for stats in list(self.sessions.values()):
+            lines.append(f'stt_session_rtf{{session="{stats.id}"}} {stats.rtf}')
+        metric("stt_session_lag_seconds", "gauge", "Age of the oldest queued frame per active session")
+        for stats in list(self.sessions.values()):
+            lines.append(f'stt_session_lag_seconds{{session="{stats.id}"}} {stats.lag_seconds}')
+        return "\n".join(lines) + "\n"
+
+async def dump_loop(metrics, interval):
+    """Log a one-line JSON summary every ``interval`` seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        logger.info(f"📊 {json.dumps(metrics.summary())}")
+
+async def serve_metrics(metrics, host, port):
+    """Minimal HTTP server for /metrics and /metrics.json; returns the asyncio server"""
+
+    async def handle(reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # Headers are not needed
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?")[0] if len(parts) > 1 else "/"
+            if path == "/metrics":
+                status, ctype, body = "200 OK", "text/plain; version=0.0.4", metrics.render()
+            elif path == "/metrics.json":
+                status, ctype, body = "200 OK", "application/json", json.dumps(metrics.snapshot())
+            else:
+                status, ctype, body = "404 Not Found", "text/plain", "not found\n"
+            payload = body.encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {ctype}\r\n"
+                f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("latin-1") + payload
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info(f"📊 STT metrics on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Per-session filter for partial results.
+
+Vosk returns a partial for every chunk, and most of them repeat the
+previous one. The emitter sends a partial only when its text changed,
+at most once per ``interval`` seconds; finals and VAD events always pass.
+A partial held back by the rate limit is not lost: the next chunk
+compares against the last partial actually sent, so the newest text goes
+out as soon as the interval has passed.
+
+With ``delta`` (opt-in per recording via ``{"type": "start", "delta":
+true}``) a partial carries only what changed: ``{"type": "partial",
+"offset": N, "text": suffix}`` means keep the first N characters of the
+previous partial and append ``text``. Partials restart from empty after
+every final.
+"""
+
+import time
+
+class PartialEmitter:
+    def __init__(self, interval=0.0, delta=False):
+        self.interval = interval
+        self.delta = delta
+        # Text of the last partial sent in the current utterance
+        self._text = ""
+        self._sent_at = None
+
+    def _encode(self, message, text):
+        if not self.delta:
+            return message
+        common = 0
+        for old, new in zip(self._text, text):
+            if old != new:
+                break
+            common += 1
+        encoded = dict(message)
+        encoded["offset"] = common
+        encoded["text"] = text[common:]
+        return encoded
+
+    def filter(self, messages):
+        """Return the messages worth sending, in order"""
+        sent = []
+        for message in messages:
+            # Dual-pass placeholders (with 'utterance') end an utterance like finals
+            if message["type"] != "partial" or "utterance" in message:
+                if message["type"] == "final" or "utterance" in message:
+                    self._text = ""
+                sent.append(message)
+                continue
+            text = message["text"]
+            if text == self._text:
+                continue
+            now = time.perf_counter()
+            if text and self._sent_at is not None and now - self._sent_at < self.interval:
+                continue
+            sent.append(self._encode(message, text))
+            self._text = text
+            self._sent_at = now
+        return sent
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Pre-fork support for the STT servers.
+
+The Vosk model is loaded once in the parent process, then N workers are
+forked. Each worker inherits the model pages copy-on-write, runs its own
+asyncio loop, and accepts WebSocket connections from a listening socket.
+Where SO_REUSEPORT is available every worker binds its own socket and the
+kernel balances connections between them; otherwise all workers accept
+from one socket created before the fork.
+"""
+
+import logging
+import os
+import signal
+import socket
+import time
+
+logger = logging.getLogger(__name__)
+
+def can_fork():
+    """True when the platform supports the pre-fork mode (not Windows)"""
+    return hasattr(os, "fork")
+
+def create_listen_socket(host, port, reuse_port=False, backlog=128):
+    """Create a bound, listening TCP socket for a WebSocket server"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
+
+def serve_prefork(run_worker, host, port, workers):
+    """Fork ``workers`` processes that each call ``run_worker(sock, slot)``.
+
+    ``run_worker`` must block for the lifetime of the worker (typically
+    ``asyncio.run(...)`` around ``websockets.serve(..., sock=sock)``).
+    The parent supervises the workers, restarts any that die, and stops
+    them all on SIGINT/SIGTERM.
+    """
+    reuse_port = hasattr(socket, "SO_REUSEPORT")
+    shared_sock = None if reuse_port else create_listen_socket(host, port)
+
+    children = {}
+    stopping = False
+
+    def spawn(slot):
+        pid = os.fork()
+        if pid == 0:
+            # Child: let the parent handle shutdown
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                sock = shared_sock or create_listen_socket(host, port, reuse_port=True)
+                run_worker(sock, slot)
+            except Exception as e:
+                logger.error(f"❌ Worker {slot} crashed: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = slot
+        logger.info(f"👷 Worker {slot} started (pid {pid})")
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    mode = "SO_REUSEPORT" if reuse_port else "shared socket"
+    logger.info(f"🚀 Pre-forking {workers} STT workers on ws://{host}:{port} ({mode})")
+    for slot in range(workers):
+        spawn(slot)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        slot = children.pop(pid, None)
+        if slot is None or stopping:
+            continue
+        logger.warning(f"⚠️ Worker {slot} (pid {pid}) exited with status {status}, restarting")
+        # Avoid a tight crash loop if the worker fails at startup
+        time.sleep(1)
+        spawn(slot)
+
+    if shared_sock is not None:
+        shared_sock.close()
+    logger.info("🛑 All STT workers stopped")
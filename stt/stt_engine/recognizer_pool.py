@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Pool of reusable Vosk recognizers.
+
+Constructing a KaldiRecognizer allocates decoder state and graphs, which
+shows up in profiles when it happens on every session start (or worse,
+every chunk). Recognizers are instead handed out from a pool and
+``Reset()`` when they come back, so a new session reuses a warm decoder.
+"""
+
+import os
+import threading
+
+from vosk import KaldiRecognizer
+
+class RecognizerPool:
+    def __init__(self, model, sample_rate=16000, max_size=None, configure=None):
+        self.model = model
+        self.sample_rate = sample_rate
+        # Idle recognizers kept beyond this are dropped; sized to decode capacity
+        self.max_size = max_size or 2 * (os.cpu_count() or 1)
+        # Optional callback applied once to every new recognizer (SetWords etc.)
+        self.configure = configure
+        self._idle = []
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def _create(self):
+        recognizer = KaldiRecognizer(self.model, self.sample_rate)
+        if self.configure is not None:
+            self.configure(recognizer)
+        with self._lock:
+            self.created += 1
+        return recognizer
+
+    def prewarm(self, count=2):
+        """Construct a few recognizers ahead of the first connections; more are built on demand"""
+        count = min(count, self.max_size)
+        fresh = [self._create() for _ in range(count - len(self._idle))]
+        with self._lock:
+            self._idle.extend(fresh)
+
+    def acquire(self):
+        """Get a ready-to-use recognizer"""
+        with self._lock:
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+        return self._create()
+
+    def release(self, recognizer):
+        """Return a recognizer once its session no longer feeds it audio"""
+        recognizer.Reset()
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(recognizer)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'idle': len(self._idle),
+                'max_size': self.max_size,
+                'created': self.created,
+                'reused': self.reused
+            }
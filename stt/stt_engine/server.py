@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+WebSocket STT server built from an STTConfig.
+
+Protocol (compatible with all former stt_server_*.py variants):
+
+- binary frame: audio in the session's input format
+- ``{"type": "audio", "data": "<base64>"}``: the same, base64 encoded
+- ``{"type": "start", "format": "<input format>"}``: new recording;
+  raw PCM clients may declare ``"sample_rate"``, ``"channels"`` and
+  ``"sample_format"`` (``s16le`` / ``f32le``), e.g. 48 kHz float32 from
+  an AudioWorklet, and the server converts to 16 kHz mono int16;
+  ``"delta": true`` asks for partials as changed suffixes (see
+  stt_engine.partials). ``started`` echoes the format in effect.
+- ``{"type": "stop"}``: flush and send the final result (always sent,
+  possibly with empty text, so clients know the recording is complete);
+  it carries ``"stop": true`` and the session's decode time ``decode_ms``
+
+The server sends ``ready``, ``started``, ``partial``, ``final`` and, with
+VAD enabled, ``speech_start`` / ``speech_end`` messages. With the
+``slow_down`` ingest policy it also sends ``slow_down`` / ``resume``.
+
+Audio frames are queued in a per-session IngestBuffer and decoded by a
+per-session task, so a slow decode never stalls the receive loop; what
+happens when a session falls behind is the ingest policy's call.
+
+With lazy loading the socket is bound before any model is loaded. A small
+fallback model (if installed) loads first and serves early connections;
+those sessions move to the main model at their next ``start``, or at the
+next utterance boundary (a ``final`` or ``speech_end``), once it is
+available. Plain HTTP ``GET /health`` on the same port reports the loading
+state (always 200 while the process is up); ``GET /ready`` answers 503
+until a model can serve clients.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import time
+from http import HTTPStatus
+
+import websockets
+
+from .backends import create_backend
+from .config import INPUT_FORMATS
+from .decoders import SAMPLE_FORMATS
+from .decoding import DecodeExecutor
+from .ingest import IngestBuffer
+from .partials import PartialEmitter
+from .metrics import STTMetrics, dump_loop, serve_metrics
+from .prefork import can_fork, serve_prefork
+from .session import Session
+
+logger = logging.getLogger(__name__)
+
+class STTServer:
+    def __init__(self, config, backend=None, fallback=None):
+        # Decoding runs off the event loop; chunks stay ordered per client
+        self.executor = DecodeExecutor(config.decode_threads)
+        # Dual-pass rescoring gets its own threads so it never delays live partials
+        self.rescorer = DecodeExecutor(config.rescore_threads or max(1, (os.cpu_count() or 2) // 2))
+        if config.max_recognizers is None:
+            # Sized to the decode pool: that many sessions can decode at once
+            config = config.with_options(max_recognizers=2 * self.executor.max_workers)
+        self.config = config
+        self.backend = backend or create_backend(config)
+        if fallback is None and backend is None:
+            if hasattr(self.backend, 'fallback_backend'):
+                fallback = self.backend.fallback_backend()
+            else:
+                fallback_path = config.resolve_fallback_path()
+                if fallback_path:
+                    fallback = create_backend(config, model_path=fallback_path)
+        self.fallback = fallback
+        # loading -> ready, or degraded (fallback only) / failed
+        self.state = "loading"
+        self._model_available = None
+        self.sessions = {}
+        self.metrics = STTMetrics(sample_rate=config.sample_rate)
+
+    def load_backend(self, backend):
+        """Load one backend's model (blocking)"""
+        try:
+            logger.info(f"Loading {backend.name} model from: {backend.model_path}")
+            started = time.perf_counter()
+            backend.load()
+            logger.info(f"✅ Model loaded successfully in {time.perf_counter() - started:.1f}s")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to load model: {e}")
+            return False
+
+    def load_model(self):
+        """Load the main model before serving (blocking)"""
+        loaded = self.load_backend(self.backend)
+        self.state = "ready" if loaded else "failed"
+        return loaded
+
+    async def load_in_background(self):
+        """Load the fallback model, then the main one, without blocking the loop"""
+        loop = asyncio.get_running_loop()
+        if self.fallback is not None and not self.fallback.loaded:
+            if await loop.run_in_executor(None, self.load_backend, self.fallback):
+                logger.info("⏳ Serving the fallback model while the main model loads")
+                self._model_available.set()
+        loaded = await loop.run_in_executor(None, self.load_backend, self.backend)
+        if loaded:
+            self.state = "ready"
+        elif self.fallback is not None and self.fallback.loaded:
+            self.state = "degraded"
+        else:
+            self.state = "failed"
+        self._model_available.set()
+
+    def current_backend(self):
+        """The best loaded backend, or None while nothing is loaded"""
+        if self.backend.loaded:
+            return self.backend
+        if self.fallback is not None and self.fallback.loaded:
+            return self.fallback
+        return None
+
+    def health(self):
+        backend = self.current_backend()
+        return {
+            'status': self.state,
+            'model': os.path.basename(backend.model_path) if backend else None,
+            'fallback': backend is not None and backend is self.fallback,
+            'sessions': len(self.sessions),
+        }
+
+    def process_request(self, *args):
+        """Answer plain HTTP health probes on the WebSocket port"""
+        # websockets < 14 passes (path, headers); newer versions (connection, request)
+        legacy = isinstance(args[0], str)
+        path = (args[0] if legacy else args[1].path).split('?')[0]
+        if path not in ('/health', '/ready'):
+            return None
+
+        health = self.health()
+        status = HTTPStatus.OK
+        if path == '/ready' and health['model'] is None:
+            status = HTTPStatus.SERVICE_UNAVAILABLE
+        body = json.dumps(health)
+        if legacy:
+            return status, [('Content-Type', 'application/json')], body.encode('utf-8')
+        response = args[0].respond(status, body)
+        del response.headers['Content-Type']
+        response.headers['Content-Type'] = 'application/json'
+        return response
+
+    async def send(self, websocket, message):
+        """Send message to specific client"""
+        try:
+            await websocket.send(json.dumps(message))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception as e:
+            logger.error(f"❌ Error sending message: {e}")
+
+    async def send_messages(self, session, websocket, messages):
+        for message in messages:
+            msg_type = message['type']
+            # Empty partials/finals carry no information for the client (delta
+            # partials with an offset do: they truncate the previous text)
+            if msg_type in ('partial', 'final') and not message.get('text') and 'offset' not in message:
+                continue
+            await self.send(websocket, message)
+            session.stats.sent(msg_type)
+            if msg_type == 'final':
+                logger.info(f"📝 Final: {message['text']}")
+
+    async def decode_loop(self, session, websocket):
+        """Decode a session's queued audio in order, applying the ingest policy"""
+        ingest = session.ingest
+        slowed = False
+        while True:
+            batch = await ingest.get()
+            if batch is None:
+                return
+            chunk, received, lag = batch
+            session.stats.lagged(lag)
+            if ingest.policy == 'slow_down' and ingest.behind != slowed:
+                slowed = ingest.behind
+                if slowed:
+                    logger.warning(f"🐢 Session {session.id} is {lag:.1f}s behind")
+                    await self.send(websocket, {'type': 'slow_down', 'lag_ms': round(lag * 1000)})
+                else:
+                    await self.send(websocket, {'type': 'resume'})
+            try:
+                messages = await self.executor.run(session.id, session.process, chunk, received)
+            except Exception as e:
+                logger.error(f"❌ Error decoding audio: {e}")
+                session.stats.dropped()
+                messages = []
+            # Not when the batch already started the next utterance: its audio is in the recognizer
+            events = [m['type'] for m in messages if m['type'] in ('final', 'speech_end', 'speech_start')]
+            boundary = bool(events) and events[-1] != 'speech_start'
+            if ingest.skip_partials:
+                kept = [m for m in messages if m['type'] != 'partial']
+                session.stats.skipped(len(messages) - len(kept))
+                messages = kept
+            messages = session.partials.filter(messages)
+            await self.send_messages(session, websocket, messages)
+            self.schedule_deferred(session, websocket)
+            if boundary:
+                await self.upgrade_backend(session)
+            ingest.task_done()
+
+    async def upgrade_backend(self, session):
+        """Move a session off the fallback model between utterances
+
+        Clients that never send ``start`` again would otherwise stay on the
+        fallback for the whole connection. Deferred finals still use the old
+        recognizer, so the switch waits for a boundary with none pending.
+        """
+        backend = self.current_backend()
+        if backend is session.backend or session.backend is not self.fallback or session.pending:
+            return
+        await self.executor.run(session.id, session.switch_backend, backend)
+        logger.info(f"🔁 Session {session.id} switched to {os.path.basename(backend.model_path)}")
+
+    def schedule_deferred(self, session, websocket):
+        for job in session.take_deferred():
+            task = asyncio.create_task(self.run_deferred(session, websocket, job))
+            session.pending.add(task)
+            task.add_done_callback(session.pending.discard)
+
+    async def run_deferred(self, session, websocket, job):
+        # Ordered per session, so finals arrive in utterance order
+        try:
+            message = await self.rescorer.run(session.id, job)
+        except Exception as e:
+            logger.error(f"❌ Error rescoring utterance: {e}")
+            return
+        await self.send_messages(session, websocket, [message])
+
+    def declared_format(self, data):
+        """(input format, sample rate, channels) from a start message, or None to keep the current one"""
+        input_format = data.get('format')
+        sample_format = data.get('sample_format')
+        input_rate = data.get('sample_rate')
+        channels = data.get('channels')
+        if sample_format is not None:
+            if sample_format not in SAMPLE_FORMATS:
+                raise ValueError(
+                    f"Unsupported sample_format {sample_format}; expected one of {', '.join(SAMPLE_FORMATS)}"
+                )
+            if input_format not in (None, f"pcm_{sample_format}"):
+                raise ValueError(f"sample_format {sample_format} contradicts format {input_format}")
+            input_format = f"pcm_{sample_format}"
+        if input_format is None and input_rate is None and channels is None:
+            return None
+        if input_format is not None and input_format not in INPUT_FORMATS:
+            raise ValueError(f"Unsupported format {input_format}; expected one of {', '.join(INPUT_FORMATS)}")
+        if input_rate is not None and not (isinstance(input_rate, int) and 8000 <= input_rate <= 192000):
+            raise ValueError(f"Unsupported sample_rate {input_rate}; expected 8000-192000 Hz")
+        if channels is not None and not (isinstance(channels, int) and 1 <= channels <= 8):
+            raise ValueError(f"Unsupported channels {channels}; expected 1-8")
+        return input_format, input_rate, channels
+
+    async def handle_message(self, session, websocket, message):
+        """Handle one WebSocket frame"""
+        received = time.perf_counter()
+        # Binary frames are audio; JSON is only needed for control messages
+        if isinstance(message, bytes):
+            await session.ingest.put(message, received)
+            return
+
+        data = json.loads(message)
+        msg_type = data.get('type')
+
+        if msg_type == 'audio':
+            chunk = base64.b64decode(data.get('data') or '')
+            if chunk:
+                await session.ingest.put(chunk, received)
+
+        elif msg_type == 'start':
+            try:
+                declared = self.declared_format(data)
+            except ValueError as e:
+                await self.send(websocket, {'type': 'error', 'message': str(e)})
+                return
+            await session.ingest.drain()
+            # Sessions opened on the fallback model switch once the main one is loaded
+            await self.executor.run(session.id, session.restart, declared, self.current_backend())
+            session.ingest.set_format(session.input_format, session.input_rate, session.channels)
+            session.partials = PartialEmitter(self.config.partial_interval, delta=bool(data.get('delta')))
+            logger.info("🎤 Client started recording")
+            await self.send(websocket, {
+                'type': 'started',
+                'message': 'Recording started',
+                'format': session.input_format,
+                'sample_rate': session.input_rate,
+                'channels': session.channels,
+            })
+
+        elif msg_type == 'stop':
+            logger.info("⏹️ Client stopped recording")
+            await session.ingest.drain()
+            # Earlier utterances' finals go out before the stop answer
+            if session.pending:
+                await asyncio.gather(*session.pending, return_exceptions=True)
+            messages = await self.executor.run(session.id, session.finish)
+            messages = session.partials.filter(messages)
+            # Utterances completed by the final flush are rescored before answering
+            for job in session.take_deferred():
+                messages.insert(-1, await self.rescorer.run(session.id, job))
+            await self.send_messages(session, websocket, messages[:-1])
+            # Answer every stop, even without text, so clients can stop waiting.
+            # Flagged so clients can tell it from finals of earlier utterances
+            answer = dict(messages[-1], stop=True, decode_ms=round(session.stats.decode_seconds * 1000, 1))
+            await self.send(websocket, answer)
+            session.stats.sent('final')
+
+    async def handle_client(self, websocket):
+        """Handle WebSocket client connection"""
+        backend = self.current_backend()
+        if backend is None and self._model_available is not None:
+            # Early client: hold the connection until a model is loaded
+            try:
+                await asyncio.wait_for(self._model_available.wait(), self.config.load_timeout)
+            except asyncio.TimeoutError:
+                pass
+            backend = self.current_backend()
+        if backend is None:
+            logger.error("❌ Model not loaded, cannot register client")
+            await websocket.close()
+            return
+
+        session_id = id(websocket)
+        session = Session(
+            session_id, self.config, backend, stats=self.metrics.open_session(session_id)
+        )
+        session.ingest = IngestBuffer(session.input_format, self.config, on_drop=session.stats.dropped)
+        session.partials = PartialEmitter(self.config.partial_interval)
+        decoding = asyncio.create_task(self.decode_loop(session, websocket))
+        self.sessions[session.id] = session
+        logger.info(f"🔌 Client connected. Total clients: {len(self.sessions)}")
+        await self.send(websocket, {
+            'type': 'ready',
+            'message': 'STT server ready',
+            'model': os.path.basename(backend.model_path)
+        })
+
+        try:
+            async for message in websocket:
+                try:
+                    await self.handle_message(session, websocket, message)
+                except json.JSONDecodeError:
+                    logger.error("❌ Invalid JSON received")
+                except Exception as e:
+                    logger.error(f"❌ Error processing message: {e}")
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception as e:
+            logger.error(f"❌ Client error: {e}")
+        finally:
+            # Audio still queued has nobody left to answer
+            session.ingest.close(discard=True)
+            await decoding
+            # Queued behind any chunk still decoding for this client
+            await self.executor.run(session.id, session.close)
+            self.executor.forget(session.id)
+            self.rescorer.forget(session.id)
+            self.metrics.close_session(session.stats)
+            del self.sessions[session.id]
+            logger.info(f"🔌 Client disconnected. Total clients: {len(self.sessions)}")
+
+    async def start_metrics(self, slot=0):
+        """Start event-loop lag monitoring and the configured metrics exports"""
+        tasks = [asyncio.create_task(self.metrics.monitor_loop())]
+        if self.config.metrics_interval:
+            tasks.append(asyncio.create_task(dump_loop(self.metrics, self.config.metrics_interval)))
+        server = None
+        if self.config.metrics_port:
+            # Pre-forked workers each export their own metrics on consecutive ports
+            server = await serve_metrics(self.metrics, self.config.host, self.config.metrics_port + slot)
+        return tasks, server
+
+    async def serve(self, sock=None, slot=0):
+        """Serve until cancelled, on ``sock`` if given (pre-fork worker ``slot``)"""
+        tasks, metrics_server = await self.start_metrics(slot)
+        self._model_available = asyncio.Event()
+        if self.current_backend() is not None:
+            self._model_available.set()
+        if not self.backend.loaded:
+            tasks.append(asyncio.create_task(self.load_in_background()))
+        options = {'process_request': self.process_request}
+        if sock is not None:
+            server = websockets.serve(self.handle_client, sock=sock, **options)
+        else:
+            server = websockets.serve(self.handle_client, self.config.host, self.config.port, **options)
+        try:
+            async with server:
+                logger.info(f"✅ STT Server running on ws://{self.config.host}:{self.config.port}")
+                await asyncio.Future()  # Run forever
+        finally:
+            for task in tasks:
+                task.cancel()
+            if metrics_server is not None:
+                metrics_server.close()
+
+    def run(self):
+        """Serve, loading the model first or in the background, pre-forking if configured"""
+        prefork = self.config.workers > 1 and can_fork()
+        # Vosk reads the model into process memory (there is no mmap loader),
+        # so workers only share its pages when it is loaded before the fork
+        if prefork or not self.config.lazy_load:
+            if not self.load_model():
+                logger.error("❌ Failed to start server: Model loading failed")
+                return
+
+        if prefork:
+            # The model is already loaded, so every worker shares its pages
+            serve_prefork(
+                lambda sock, slot: asyncio.run(self.serve(sock, slot)),
+                self.config.host, self.config.port, self.config.workers
+            )
+            return
+
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            logger.info("🛑 Server stopped by user")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+One client's audio pipeline: input decoder -> VAD -> recognizer.
+
+All methods block (ffmpeg pipes, Kaldi decoding) and are meant to run on
+the decode executor, one call at a time per session. The benchmark drives
+the same class directly, so it measures exactly what the server runs.
+"""
+
+import time
+
+from .decoders import create_decoder
+from .metrics import SessionStats
+from .vad import EnergyVAD
+
+class Session:
+    def __init__(self, session_id, config, backend, input_format=None, stats=None):
+        self.id = session_id
+        self.config = config
+        self.backend = backend
+        self.input_format = input_format or config.input_format
+        # Declared by raw PCM clients; the decoder converts to config.sample_rate mono
+        self.input_rate = config.sample_rate
+        self.channels = 1
+        # Created on the first audio chunk; the WebM decoder spawns ffmpeg
+        self.decoder = None
+        self.recognizer = backend.open_session()
+        self.vad = EnergyVAD(sample_rate=config.sample_rate) if config.vad else None
+        # Decoded PCM bytes so far, before VAD
+        self.audio_bytes = 0
+        self.stats = stats or SessionStats(session_id, sample_rate=config.sample_rate)
+        # Server tasks running this session's deferred work
+        self.pending = set()
+        # Server-side IngestBuffer feeding process() and PartialEmitter for its output
+        self.ingest = None
+        self.partials = None
+
+    def _recognize(self, pcm):
+        messages = []
+        self.audio_bytes += len(pcm)
+        if self.vad is None:
+            if pcm:
+                messages.append(self.recognizer.accept(pcm))
+            return messages
+        parts = self.vad.split(pcm) if pcm else []
+        for i, part in enumerate(parts):
+            if isinstance(part, str):
+                messages.append({'type': part})
+                if part == EnergyVAD.SPEECH_END:
+                    # End of turn: flush the utterance as a final result right away.
+                    # Dual-pass backends rescore in the background instead of blocking here
+                    messages.append(self.recognizer.final(defer=True))
+                continue
+            message = self.recognizer.accept(part)
+            # A partial just before the final would only be replaced by it
+            ends = i + 1 < len(parts) and parts[i + 1] == EnergyVAD.SPEECH_END
+            if message['type'] == 'final' or not ends:
+                messages.append(message)
+        return messages
+
+    def process(self, chunk, received=None):
+        """Feed one chunk of client audio, return the messages to send
+
+        ``received`` is the perf_counter() time the chunk arrived, used to
+        measure how long it queued for the decoder.
+        """
+        started = time.perf_counter()
+        audio_before = self.audio_bytes
+        if self.decoder is None:
+            self.decoder = create_decoder(
+                self.input_format, sample_rate=self.config.sample_rate, ffmpeg=self.config.ffmpeg,
+                input_rate=self.input_rate, channels=self.channels
+            )
+        messages = self._recognize(self.decoder.decode(chunk))
+        self.stats.chunk(
+            len(chunk),
+            self.audio_bytes - audio_before,
+            started - received if received is not None else 0.0,
+            time.perf_counter() - started
+        )
+        return messages
+
+    def take_deferred(self):
+        """Work the backend handed off to run outside the decode path (dual-pass finals)"""
+        take = getattr(self.recognizer, 'take_deferred', None)
+        return take() if take is not None else []
+
+    def finish(self):
+        """End of recording: flush buffered audio and return the final result"""
+        started = time.perf_counter()
+        audio_before = self.audio_bytes
+        messages = []
+        if self.decoder is not None:
+            messages = self._recognize(self.decoder.close())
+            self.decoder = None
+        messages.append(self.recognizer.final())
+        self.stats.chunk(0, self.audio_bytes - audio_before, 0.0, time.perf_counter() - started)
+        return messages
+
+    def restart(self, declared=None, backend=None):
+        """Start a new recording, optionally in a different input format or on another backend
+
+        ``declared`` is (input format, sample rate, channels), any of them
+        None for the default; None keeps the current format.
+        """
+        if self.decoder is not None:
+            self.decoder.close()
+            self.decoder = None
+        if declared is not None:
+            input_format, input_rate, channels = declared
+            self.input_format = input_format or self.input_format
+            self.input_rate = input_rate or self.config.sample_rate
+            self.channels = channels or 1
+        if not self.switch_backend(backend):
+            self.recognizer.reset()
+        if self.vad is not None:
+            self.vad.reset()
+
+    def switch_backend(self, backend):
+        """Continue on another backend from the next utterance; the decoder and VAD carry on"""
+        if backend is None or backend is self.backend:
+            return False
+        self.recognizer.close()
+        self.backend = backend
+        self.recognizer = backend.open_session()
+        return True
+
+    def close(self):
+        if self.decoder is not None:
+            self.decoder.close()
+            self.decoder = None
+        self.recognizer.close()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Energy / zero-crossing voice activity detection for the STT servers.
+
+Candidates spend much of an interview thinking in silence. Decoding that
+silence costs as much CPU as decoding speech, so the VAD sits in front of
+the recognizer and only lets speech through, plus a little padding on
+either side so word onsets are not clipped and Kaldi still sees some
+trailing silence. Frame classification is vectorized with NumPy; only the
+small per-frame state machine runs in Python.
+"""
+
+from collections import deque
+
+import numpy as np
+
+class EnergyVAD:
+    SPEECH_START = 'speech_start'
+    SPEECH_END = 'speech_end'
+
+    def __init__(
+        self,
+        sample_rate=16000,
+        frame_ms=30,
+        min_threshold=300.0,
+        noise_ratio=3.0,
+        max_zcr=0.35,
+        start_ms=90,
+        hangover_ms=600,
+        preroll_ms=300
+    ):
+        self.sample_rate = sample_rate
+        self.frame_len = int(sample_rate * frame_ms / 1000)
+        # RMS (int16 scale) below which nothing counts as speech
+        self.min_threshold = min_threshold
+        # Speech must be this many times louder than the tracked noise floor
+        self.noise_ratio = noise_ratio
+        # Quiet frames above this zero-crossing rate look like hiss, not voice
+        self.max_zcr = max_zcr
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+
+        self.noise_floor = min_threshold / noise_ratio
+        self.in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+        self._preroll = deque(maxlen=max(self.start_frames, preroll_ms // frame_ms))
+        self._remainder = np.zeros(0, dtype=np.int16)
+
+    def classify(self, frames):
+        """Return a boolean speech mask for an (n_frames, frame_len) int16 array"""
+        samples = frames.astype(np.float32)
+        rms = np.sqrt(np.mean(samples * samples, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_len - 1)
+
+        threshold = max(self.min_threshold, self.noise_floor * self.noise_ratio)
+        # Loud frames are always speech; moderately loud ones only if they look voiced
+        speech = (rms > 2 * threshold) | ((rms > threshold) & (zcr < self.max_zcr))
+
+        quiet = rms[~speech]
+        if quiet.size:
+            # Track the background level slowly so the threshold adapts to the room
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * float(np.mean(quiet))
+        return speech
+
+    def process(self, pcm):
+        """Filter 16-bit mono PCM.
+
+        Returns ``(speech_pcm, events)`` where ``speech_pcm`` contains only
+        the audio the recognizer should see and ``events`` lists
+        ``speech_start`` / ``speech_end`` transitions in order.
+        """
+        parts = self.split(pcm)
+        speech = b"".join(part for part in parts if isinstance(part, bytes))
+        return speech, [part for part in parts if isinstance(part, str)]
+
+    def split(self, pcm):
+        """Like process(), but with the events in place.
+
+        Returns speech audio (bytes) and events (str) in stream order, so
+        audio after a ``speech_end`` can go to the next utterance.
+        """
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        if self._remainder.size:
+            samples = np.concatenate((self._remainder, samples))
+        n_frames = samples.size // self.frame_len
+        self._remainder = samples[n_frames * self.frame_len:].copy()
+        if n_frames == 0:
+            return []
+
+        frames = samples[:n_frames * self.frame_len].reshape(n_frames, self.frame_len)
+        mask = self.classify(frames)
+
+        parts = []
+        out = []
+
+        def event(name):
+            if out:
+                parts.append(b"".join(frame.tobytes() for frame in out))
+                out.clear()
+            parts.append(name)
+
+        for frame, is_speech in zip(frames, mask):
+            if self.in_speech:
+                out.append(frame)
+                if is_speech:
+                    self._silence_run = 0
+                    continue
+                self._silence_run += 1
+                if self._silence_run >= self.hangover_frames:
+                    self.in_speech = False
+                    self._speech_run = 0
+                    event(self.SPEECH_END)
+                continue
+
+            self._preroll.append(frame)
+            self._speech_run = self._speech_run + 1 if is_speech else 0
+            if self._speech_run >= self.start_frames:
+                self.in_speech = True
+                self._silence_run = 0
+                event(self.SPEECH_START)
+                # Include the lead-in so the first phoneme is not clipped
+                out.extend(self._preroll)
+                self._preroll.clear()
+
+        if out:
+            parts.append(b"".join(frame.tobytes() for frame in out))
+        return parts
+
+    def reset(self):
+        self.in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+        self._preroll.clear()
+        self._remainder = np.zeros(0, dtype=np.int16)
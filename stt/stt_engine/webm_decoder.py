@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Streaming WebM/Opus to PCM decoder for the STT servers.
+
+MediaRecorder produces one continuous WebM stream split into chunks; only
+the first chunk carries the container header, so chunks cannot be decoded
+independently. This keeps a single ffmpeg process per session, feeds it
+the chunks through stdin and collects 16 kHz mono s16le PCM from stdout as
+ffmpeg produces it - one process spawn per session and no temporary files.
+"""
+
+import os
+import queue
+import subprocess
+import threading
+
+class StreamingWebMDecoder:
+    def __init__(self, sample_rate=16000, ffmpeg="ffmpeg", input_format="webm"):
+        self.sample_rate = sample_rate
+        cmd = [
+            ffmpeg, "-loglevel", "quiet",
+            # Start decoding as soon as possible instead of probing the stream
+            "-fflags", "nobuffer", "-flags", "low_delay",
+            "-probesize", "32", "-analyzeduration", "0",
+            "-f", input_format, "-i", "pipe:0",
+            "-ar", str(sample_rate), "-ac", "1",
+            "-f", "s16le", "pipe:1"
+        ]
+        self.process = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0
+        )
+        self._pcm = queue.Queue()
+        self._reader = threading.Thread(target=self._read_stdout, daemon=True)
+        self._reader.start()
+        self.closed = False
+
+    def _read_stdout(self):
+        """Move PCM from ffmpeg's stdout into the queue as soon as it appears"""
+        fd = self.process.stdout.fileno()
+        while True:
+            try:
+                data = os.read(fd, 65536)
+            except OSError:
+                break
+            if not data:
+                break
+            self._pcm.put(data)
+        self._pcm.put(None)
+
+    def feed(self, chunk):
+        """Write one WebM chunk to the decoder"""
+        if self.closed:
+            return
+        try:
+            self.process.stdin.write(chunk)
+        except (BrokenPipeError, OSError):
+            self.closed = True
+
+    def read(self):
+        """Return all PCM decoded so far (possibly empty) without blocking"""
+        parts = []
+        while True:
+            try:
+                data = self._pcm.get_nowait()
+            except queue.Empty:
+                break
+            if data is None:
+                # Keep the end marker for close()
+                self._pcm.put(None)
+                break
+            parts.append(data)
+        return b"".join(parts)
+
+    def close(self, timeout=5.0):
+        """Flush the decoder and return the remaining PCM"""
+        if not self.closed:
+            self.closed = True
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+        self._reader.join(timeout)
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+
+        parts = []
+        while True:
+            try:
+                data = self._pcm.get_nowait()
+            except queue.Empty:
+                break
+            if data is not None:
+                parts.append(data)
+        return b"".join(parts)
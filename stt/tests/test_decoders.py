@@ -0,0 +1,98 @@
+import unittest
+
+import numpy as np
+
+from stt_engine.decoders import PcmDecoder, PcmS16Decoder, create_decoder
+
+def tone(frequency, rate, seconds=1.0, amplitude=0.5):
+    t = np.arange(int(rate * seconds)) / float(rate)
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+def decode_all(decoder, data, chunk_size=None):
+    if chunk_size is None:
+        chunks = [data]
+    else:
+        chunks = [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+    out = b"".join(decoder.decode(chunk) for chunk in chunks) + decoder.close()
+    return np.frombuffer(out, dtype=np.int16).astype(np.float64) / 32768.0
+
+def peak_frequency(samples, rate):
+    spectrum = np.abs(np.fft.rfft(samples * np.hanning(len(samples))))
+    return np.argmax(spectrum) * rate / float(len(samples))
+
+class CreateDecoderTest(unittest.TestCase):
+    def test_engine_format_is_passed_through(self):
+        decoder = create_decoder("pcm_s16le", sample_rate=16000)
+        self.assertIsInstance(decoder, PcmS16Decoder)
+        chunk = b"\x01\x02" * 10
+        self.assertIs(decoder.decode(chunk), chunk)
+
+    def test_other_pcm_is_converted(self):
+        self.assertIsInstance(create_decoder("pcm_f32le"), PcmDecoder)
+        self.assertIsInstance(create_decoder("pcm_s16le", input_rate=48000), PcmDecoder)
+        self.assertIsInstance(create_decoder("pcm_s16le", channels=2), PcmDecoder)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            create_decoder("flac")
+
+class PcmDecoderTest(unittest.TestCase):
+    def test_f32_at_engine_rate_is_quantized(self):
+        samples = tone(440, 16000)
+        out = decode_all(PcmDecoder("f32le", 16000, 1, 16000), samples.tobytes())
+        self.assertEqual(len(out), len(samples))
+        np.testing.assert_allclose(out, samples, atol=2 / 32768.0)
+
+    def test_decimates_48k_to_16k(self):
+        samples = tone(440, 48000)
+        out = decode_all(PcmDecoder("f32le", 48000, 1, 16000), samples.tobytes())
+        self.assertAlmostEqual(len(out), 16000, delta=1)
+        self.assertAlmostEqual(peak_frequency(out, 16000), 440, delta=2)
+        # Pass band keeps its level (skip the filter's start-up)
+        self.assertAlmostEqual(np.abs(out[1000:]).max(), 0.5, delta=0.02)
+
+    def test_interpolates_44k1_to_16k(self):
+        samples = tone(1000, 44100)
+        out = decode_all(PcmDecoder("f32le", 44100, 1, 16000), samples.tobytes())
+        self.assertAlmostEqual(len(out), 16000, delta=1)
+        self.assertAlmostEqual(peak_frequency(out, 16000), 1000, delta=2)
+
+    def test_upsamples_8k_to_16k(self):
+        samples = (tone(300, 8000) * 32767).astype("<i2")
+        out = decode_all(PcmDecoder("s16le", 8000, 1, 16000), samples.tobytes())
+        self.assertAlmostEqual(len(out), 16000, delta=2)
+        self.assertAlmostEqual(peak_frequency(out, 16000), 300, delta=2)
+
+    def test_removes_tones_above_output_nyquist(self):
+        # 12 kHz would alias to 4 kHz at 16 kHz without the low-pass
+        samples = tone(12000, 48000)
+        out = decode_all(PcmDecoder("f32le", 48000, 1, 16000), samples.tobytes())
+        self.assertLess(np.abs(out[1000:]).max(), 0.01)
+
+    def test_downmixes_channels(self):
+        left = tone(440, 16000)
+        stereo = np.stack([left, -left], axis=1).astype(np.float32)
+        out = decode_all(PcmDecoder("f32le", 16000, 2, 16000), stereo.tobytes())
+        self.assertEqual(len(out), 16000)
+        self.assertLess(np.abs(out).max(), 1 / 32768.0 + 1e-9)
+
+        same = np.stack([left, left], axis=1).astype(np.float32)
+        out = decode_all(PcmDecoder("f32le", 16000, 2, 16000), same.tobytes())
+        np.testing.assert_allclose(out, left, atol=2 / 32768.0)
+
+    def test_chunk_boundaries_do_not_matter(self):
+        stereo = np.stack([tone(440, 44100), tone(880, 44100)], axis=1).astype(np.float32)
+        data = stereo.tobytes()
+        whole = decode_all(PcmDecoder("f32le", 44100, 2, 16000), data)
+        # Odd sizes split samples and frames across chunks
+        split = decode_all(PcmDecoder("f32le", 44100, 2, 16000), data, chunk_size=1237)
+        self.assertEqual(len(whole), len(split))
+        np.testing.assert_allclose(whole, split, atol=2 / 32768.0)
+
+    def test_clips_out_of_range_samples(self):
+        samples = np.array([2.0, -2.0, 0.0], dtype=np.float32)
+        out = np.frombuffer(PcmDecoder("f32le", 16000, 1, 16000).decode(samples.tobytes()), dtype=np.int16)
+        self.assertEqual(list(out), [32767, -32768, 0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import json
+import unittest
+
+from stt_engine.backends import DualPassBackend, VoskSession
+
+class FakeRecognizer:
+    """Stands in for KaldiRecognizer: hears ``text`` and endpoints once ``endpoint`` bytes are fed"""
+
+    def __init__(self, text, endpoint=None, words=None):
+        self.text = text
+        self.endpoint = endpoint
+        self.words = words
+        self.fed = 0
+        self.ended = False
+
+    def _result(self, text):
+        result = {"text": text}
+        if self.words and text:
+            result["result"] = [{"word": word} for word in text.split()]
+        return json.dumps(result)
+
+    def AcceptWaveform(self, pcm):
+        self.fed += len(pcm)
+        if self.endpoint is not None and not self.ended and self.fed >= self.endpoint:
+            self.ended = True
+            return True
+        return False
+
+    def Result(self):
+        return self._result(self.text)
+
+    def PartialResult(self):
+        return json.dumps({"partial": "" if self.ended else self.text})
+
+    def FinalResult(self):
+        # Like Vosk, whatever an endpoint already returned is not repeated
+        return self._result("" if self.ended else self.text)
+
+    def Reset(self):
+        self.fed = 0
+        self.ended = False
+
+class FakePool:
+    def __init__(self, factory):
+        self.factory = factory
+
+    def acquire(self):
+        return self.factory()
+
+    def release(self, recognizer):
+        pass
+
+class FakeBackend:
+    sample_rate = 16000
+    model_path = "fake"
+    loaded = True
+
+    def __init__(self, factory):
+        self.recognizers = FakePool(factory)
+
+    def open_session(self):
+        return VoskSession(self)
+
+def dual_pass(fast, accurate, **options):
+    return DualPassBackend(FakeBackend(fast), FakeBackend(accurate), **options)
+
+# 100 ms of 16 kHz s16le
+CHUNK = b"\x00" * 3200
+
+class RescoreTest(unittest.TestCase):
+    def test_endpoint_inside_accept_keeps_the_text(self):
+        backend = dual_pass(None, lambda: FakeRecognizer("tell me about yourself", endpoint=1))
+        message = backend.rescore(CHUNK * 5, "tell me a bout yourself", 1)
+        self.assertEqual(message["type"], "final")
+        self.assertEqual(message["text"], "tell me about yourself")
+        self.assertEqual(message["fast_text"], "tell me a bout yourself")
+        self.assertEqual(message["utterance"], 1)
+
+    def test_text_after_the_endpoint_is_joined(self):
+        class Split(FakeRecognizer):
+            def FinalResult(self):
+                return self._result("and why")
+
+        backend = dual_pass(None, lambda: Split("what went wrong", endpoint=1, words=True))
+        message = backend.rescore(CHUNK, "what went wrong and why", 1)
+        self.assertEqual(message["text"], "what went wrong and why")
+        self.assertEqual([w["word"] for w in message["result"]], ["what", "went", "wrong", "and", "why"])
+
+    def test_no_endpoint_uses_the_final_result(self):
+        backend = dual_pass(None, lambda: FakeRecognizer("hello there"))
+        self.assertEqual(backend.rescore(CHUNK, "hello their", 3)["text"], "hello there")
+
+class DualPassSessionTest(unittest.TestCase):
+    def test_fast_endpoint_defers_the_rescore(self):
+        backend = dual_pass(
+            lambda: FakeRecognizer("hallo", endpoint=3 * len(CHUNK)),
+            lambda: FakeRecognizer("hello", endpoint=1)
+        )
+        session = backend.open_session()
+        self.assertEqual(session.accept(CHUNK)["type"], "partial")
+        session.accept(CHUNK)
+        placeholder = session.accept(CHUNK)
+        # The fast text stays on screen while the accurate model works
+        self.assertEqual(placeholder, {"type": "partial", "text": "hallo", "utterance": 1})
+        (job,) = session.take_deferred()
+        self.assertEqual(session.take_deferred(), [])
+        message = job()
+        self.assertEqual((message["type"], message["text"], message["utterance"]), ("final", "hello", 1))
+        self.assertEqual(len(session.utterance), 0)
+
+    def test_silence_is_not_rescored(self):
+        backend = dual_pass(lambda: FakeRecognizer(""), lambda: FakeRecognizer("should not run"))
+        session = backend.open_session()
+        session.accept(CHUNK)
+        self.assertEqual(session.final(), {"type": "final", "text": ""})
+        self.assertEqual(session.take_deferred(), [])
+
+    def test_final_without_defer_rescores_inline(self):
+        backend = dual_pass(lambda: FakeRecognizer("hi"), lambda: FakeRecognizer("high", endpoint=1))
+        session = backend.open_session()
+        session.accept(CHUNK)
+        self.assertEqual(session.final()["text"], "high")
+        self.assertEqual(session.take_deferred(), [])
+
+    def test_long_utterances_are_cut(self):
+        backend = dual_pass(
+            lambda: FakeRecognizer("go on"), lambda: FakeRecognizer("go on"), max_utterance_seconds=0.25
+        )
+        session = backend.open_session()
+        messages = [session.accept(CHUNK) for _ in range(3)]
+        self.assertEqual(messages[-1].get("utterance"), 1)
+        self.assertEqual(len(session.take_deferred()), 1)
+
+if __name__ == "__main__":
+    unittest.main()
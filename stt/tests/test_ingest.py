@@ -0,0 +1,108 @@
+import asyncio
+import time
+import unittest
+
+from stt_engine.config import STTConfig
+from stt_engine.ingest import IngestBuffer
+
+# 100 ms of 16 kHz s16le
+FRAME = 3200
+
+def make_buffer(input_format="pcm_s16le", on_drop=None, **options):
+    config = STTConfig(**options)
+    return IngestBuffer(input_format, config, on_drop=on_drop)
+
+class IngestBufferTest(unittest.IsolatedAsyncioTestCase):
+    async def test_coalesces_small_frames(self):
+        ingest = make_buffer()
+        old = time.perf_counter() - 0.5
+        for _ in range(4):
+            await ingest.put(b"\x01" * (FRAME // 2), old)
+        chunk, _, _ = await ingest.get()
+        self.assertEqual(len(chunk), FRAME)
+        chunk, _, _ = await ingest.get()
+        self.assertEqual(len(chunk), FRAME)
+
+    async def test_short_frame_released_after_frame_time(self):
+        ingest = make_buffer()
+        await ingest.put(b"\x01" * 320)
+        started = time.perf_counter()
+        chunk, _, _ = await ingest.get()
+        self.assertEqual(len(chunk), 320)
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+    async def test_frame_size_follows_declared_format(self):
+        ingest = make_buffer()
+        ingest.set_format("pcm_f32le", input_rate=48000, channels=2)
+        # 100 ms of 48 kHz stereo float32
+        self.assertEqual(ingest.frame_bytes, 48000 * 8 // 10)
+
+    async def test_skip_partials_when_behind(self):
+        ingest = make_buffer(ingest_policy="skip_partials", max_lag=1.0)
+        old = time.perf_counter() - 3.0
+        for _ in range(5):
+            await ingest.put(b"\x01" * FRAME, old)
+        chunk, _, lag = await ingest.get()
+        # Behind: the whole backlog in one batch, partials held back
+        self.assertEqual(len(chunk), 5 * FRAME)
+        self.assertGreater(lag, 1.0)
+        self.assertTrue(ingest.skip_partials)
+
+    async def test_drop_oldest_keeps_recent_audio(self):
+        dropped = []
+        ingest = make_buffer(ingest_policy="drop_oldest", max_lag=1.0, on_drop=dropped.append)
+        now = time.perf_counter()
+        for age in (4.0, 3.0, 2.0, 0.2, 0.1):
+            await ingest.put(b"\x01" * FRAME, now - age)
+        chunk, _, _ = await ingest.get()
+        self.assertEqual(dropped, [3])
+        self.assertEqual(len(chunk), 2 * FRAME)
+        self.assertFalse(ingest.skip_partials)
+
+    async def test_drop_oldest_falls_back_for_webm(self):
+        dropped = []
+        ingest = make_buffer("webm", ingest_policy="drop_oldest", max_lag=1.0, on_drop=dropped.append)
+        old = time.perf_counter() - 3.0
+        for _ in range(3):
+            await ingest.put(b"\x1a" * 500, old)
+        chunk, _, _ = await ingest.get()
+        # Container bytes cannot be dropped
+        self.assertEqual(dropped, [])
+        self.assertEqual(len(chunk), 1500)
+        self.assertTrue(ingest.skip_partials)
+
+    async def test_put_waits_while_full(self):
+        ingest = make_buffer(max_buffer_seconds=0.2)
+        await ingest.put(b"\x01" * FRAME)
+        await ingest.put(b"\x01" * FRAME)
+        blocked = asyncio.ensure_future(ingest.put(b"\x01" * FRAME))
+        await asyncio.sleep(0.05)
+        self.assertFalse(blocked.done())
+        await ingest.get()
+        await asyncio.wait_for(blocked, 1.0)
+
+    async def test_drain_waits_for_task_done(self):
+        ingest = make_buffer()
+        await ingest.put(b"\x01" * FRAME, time.perf_counter() - 0.5)
+        drained = asyncio.ensure_future(ingest.drain())
+        await ingest.get()
+        await asyncio.sleep(0.01)
+        self.assertFalse(drained.done())
+        ingest.task_done()
+        await asyncio.wait_for(drained, 1.0)
+
+    async def test_close_with_discard(self):
+        ingest = make_buffer()
+        await ingest.put(b"\x01" * FRAME)
+        ingest.close(discard=True)
+        self.assertIsNone(await ingest.get())
+        # Frames after close are ignored
+        await ingest.put(b"\x01" * FRAME)
+        self.assertIsNone(await ingest.get())
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            make_buffer(ingest_policy="nope")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import time
+import unittest
+
+from stt_engine.partials import PartialEmitter
+
+def partial(text):
+    return {"type": "partial", "text": text}
+
+def final(text):
+    return {"type": "final", "text": text}
+
+def apply(previous, message):
+    """What a delta client reconstructs from one partial"""
+    return previous[:message["offset"]] + message["text"]
+
+class PartialEmitterTest(unittest.TestCase):
+    def test_repeated_partials_are_dropped(self):
+        emitter = PartialEmitter()
+        sent = emitter.filter([partial("hello"), partial("hello"), partial("hello world")])
+        self.assertEqual([m["text"] for m in sent], ["hello", "hello world"])
+
+    def test_finals_and_events_always_pass(self):
+        emitter = PartialEmitter(interval=10.0)
+        messages = [partial("a"), {"type": "speech_end"}, final("a b"), final("a b")]
+        self.assertEqual(emitter.filter(messages), messages)
+
+    def test_rate_limit_holds_back_until_interval(self):
+        emitter = PartialEmitter(interval=0.05)
+        self.assertEqual(len(emitter.filter([partial("one")])), 1)
+        self.assertEqual(emitter.filter([partial("one two")]), [])
+        time.sleep(0.06)
+        # The newest text goes out once the interval has passed
+        self.assertEqual(emitter.filter([partial("one two three")]), [partial("one two three")])
+
+    def test_final_resets_the_utterance(self):
+        emitter = PartialEmitter()
+        emitter.filter([partial("same"), final("same")])
+        # The same words starting the next utterance are news again
+        self.assertEqual(emitter.filter([partial("same")]), [partial("same")])
+
+    def test_dual_pass_placeholder_resets_the_utterance(self):
+        emitter = PartialEmitter()
+        emitter.filter([partial("hi")])
+        placeholder = {"type": "final", "text": "hi", "utterance": 1}
+        self.assertEqual(emitter.filter([placeholder]), [placeholder])
+        self.assertEqual(emitter.filter([partial("hi")]), [partial("hi")])
+
+    def test_delta_offsets_rebuild_the_text(self):
+        emitter = PartialEmitter(delta=True)
+        texts = ["what", "what is", "what is your", "what is yours", "what's yours", ""]
+        shown = ""
+        for text in texts:
+            (message,) = emitter.filter([partial(text)])
+            self.assertIn("offset", message)
+            shown = apply(shown, message)
+            self.assertEqual(shown, text)
+
+    def test_delta_sends_only_the_suffix(self):
+        emitter = PartialEmitter(delta=True)
+        emitter.filter([partial("tell me")])
+        (message,) = emitter.filter([partial("tell me about")])
+        self.assertEqual(message, {"type": "partial", "offset": 7, "text": " about"})
+
+    def test_delta_restarts_after_final(self):
+        emitter = PartialEmitter(delta=True)
+        emitter.filter([partial("first"), final("first")])
+        (message,) = emitter.filter([partial("fir")])
+        self.assertEqual(message["offset"], 0)
+        self.assertEqual(message["text"], "fir")
+
+if __name__ == "__main__":
+    unittest.main()
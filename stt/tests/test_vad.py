@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+
+from stt_engine.config import STTConfig
+from stt_engine.session import Session
+from stt_engine.vad import EnergyVAD
+
+RATE = 16000
+
+def speech(seconds):
+    t = np.arange(int(RATE * seconds)) / float(RATE)
+    return (8000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16).tobytes()
+
+def silence(seconds):
+    return b"\x00\x00" * int(RATE * seconds)
+
+class EnergyVADTest(unittest.TestCase):
+    def test_silence_is_dropped(self):
+        vad = EnergyVAD(sample_rate=RATE)
+        self.assertEqual(vad.process(silence(2.0)), (b"", []))
+        self.assertFalse(vad.in_speech)
+
+    def test_speech_starts_with_the_lead_in(self):
+        vad = EnergyVAD(sample_rate=RATE)
+        audio, events = vad.process(silence(1.0) + speech(0.5))
+        self.assertEqual(events, [EnergyVAD.SPEECH_START])
+        # 0.5 s of speech plus up to 300 ms of the silence before it
+        self.assertGreaterEqual(len(audio), len(speech(0.5)) - 2 * vad.frame_len)
+        self.assertLessEqual(len(audio), len(speech(0.5) + silence(0.3)))
+
+    def test_speech_ends_after_the_hangover(self):
+        vad = EnergyVAD(sample_rate=RATE)
+        vad.process(speech(0.5))
+        self.assertEqual(vad.process(silence(0.3))[1], [])
+        self.assertEqual(vad.process(silence(0.4))[1], [EnergyVAD.SPEECH_END])
+
+    def test_chunking_does_not_change_the_result(self):
+        signal = silence(0.5) + speech(0.7) + silence(1.0) + speech(0.4)
+        whole = EnergyVAD(sample_rate=RATE).process(signal)
+        vad = EnergyVAD(sample_rate=RATE)
+        pieces = [vad.process(signal[i:i + 1000]) for i in range(0, len(signal), 1000)]
+        self.assertEqual(b"".join(p[0] for p in pieces), whole[0])
+        self.assertEqual([e for p in pieces for e in p[1]], whole[1])
+
+    def test_split_keeps_audio_on_its_side_of_the_events(self):
+        vad = EnergyVAD(sample_rate=RATE)
+        # Whole 30 ms frames, so no speech is carried over into the next call
+        vad.process(speech(0.48))
+        parts = vad.split(silence(0.7) + speech(0.5))
+        self.assertEqual([type(p) for p in parts], [bytes, str, str, bytes])
+        self.assertEqual(parts[1:3], [EnergyVAD.SPEECH_END, EnergyVAD.SPEECH_START])
+        # Before the end only trailing silence, after the start the new speech
+        self.assertFalse(np.frombuffer(parts[0], dtype=np.int16).any())
+        self.assertGreater(np.abs(np.frombuffer(parts[3], dtype=np.int16)).max(), 4000)
+
+class RecordingRecognizer:
+    def __init__(self):
+        self.calls = []
+
+    def accept(self, pcm):
+        loud = bool(np.abs(np.frombuffer(pcm, dtype=np.int16)).max() > 4000)
+        self.calls.append(("accept", loud))
+        return {"type": "partial", "text": "speech" if loud else ""}
+
+    def final(self, defer=False):
+        self.calls.append(("final",))
+        return {"type": "final", "text": "done"}
+
+    def close(self):
+        pass
+
+class RecordingBackend:
+    def open_session(self):
+        return RecordingRecognizer()
+
+class SessionVADTest(unittest.TestCase):
+    def test_new_utterance_in_the_same_chunk_goes_to_the_next_utterance(self):
+        session = Session("s", STTConfig(vad=True), RecordingBackend())
+        session._recognize(speech(0.48))
+        recognizer = session.recognizer
+        recognizer.calls = []
+        messages = session._recognize(silence(0.7) + speech(0.5))
+        # Trailing silence finishes the first utterance, the new speech starts the next
+        self.assertEqual(recognizer.calls, [("accept", False), ("final",), ("accept", True)])
+        self.assertEqual([m["type"] for m in messages], ["speech_end", "final", "speech_start", "partial"])
+
+if __name__ == "__main__":
+    unittest.main()
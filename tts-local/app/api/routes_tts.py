@@ -1,35 +1,575 @@
-from fastapi import APIRouter, Response, HTTPException
+import asyncio
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, List, Literal, Optional
+from fastapi import APIRouter, Request, Response, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from app.core.audio_cache import AudioCache, cache_key
+from app.core.encoding import AVAILABLE, StreamEncoder, encode_wav, media_type, negotiate
+from app.core.limiter import Overloaded, SynthesisLimiter, SynthesisTimeout
+from app.core.metrics import MeteredEngine, Registry
+from app.core.streaming import stream_sentences
 from app.core.tts_engine import TTSEngine
+from app.core.voice_pool import PiperVoicePool
+from app.core.voices import UnknownVoice, Voice, VoiceRegistry
+from app.core.wav import pcm_from_wav, wav_header
 
 router = APIRouter()
 
-# EDIT these to match your system:
+# EDIT this to match your system:
 PIPER_EXE = r"C:\Users\Acer\Desktop\Interview ai\interview-ace-pro\tts-local\piper\piper.exe"
-MODEL_PATH = r"C:\Users\Acer\Desktop\Interview ai\interview-ace-pro\tts-local\piper\en_US-amy-low.onnx"
-CONFIG_PATH = r"C:\Users\Acer\Desktop\Interview ai\interview-ace-pro\tts-local\piper\en_US-amy-low.onnx.json"
+# Every <name>.onnx with a <name>.onnx.json next to it is a selectable voice
+VOICES_DIR = os.environ.get(
+    "TTS_VOICES_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "piper")
+)
+DEFAULT_VOICE = os.environ.get("TTS_DEFAULT_VOICE", "en_US-amy-low")
+
+# "subprocess" spawns piper.exe per request; "pool" keeps warm in-process voices
+ENGINE_MODE = os.environ.get("TTS_ENGINE_MODE", "subprocess")
+POOL_SIZE = int(os.environ.get("TTS_POOL_SIZE", "2"))
+# "raw" reads PCM from piper's stdout; "file" round-trips through a temp WAV
+OUTPUT_MODE = os.environ.get("TTS_OUTPUT_MODE", "raw")
+# Admission control: concurrent syntheses, waiting requests, and per-request timeout
+MAX_CONCURRENCY = int(os.environ.get(
+    "TTS_MAX_CONCURRENCY", POOL_SIZE if ENGINE_MODE == "pool" else os.cpu_count() or 2
+))
+MAX_QUEUE = int(os.environ.get("TTS_MAX_QUEUE", "16"))
+TIMEOUT = float(os.environ.get("TTS_TIMEOUT", "30"))
+# Batch pre-rendering never uses more than this many slots, leaving room for live requests
+BATCH_CONCURRENCY = int(os.environ.get("TTS_BATCH_CONCURRENCY", max(1, MAX_CONCURRENCY // 2)))
+MAX_BATCH_ITEMS = 64
+# Pre-renders pending at once across all batches; further batches get 503
+MAX_INFLIGHT = int(os.environ.get("TTS_MAX_INFLIGHT", "256"))
+# Memory for resident voices in pool mode; least recently used voices beyond it are unloaded
+VOICE_MEMORY_MB = int(os.environ.get("TTS_VOICE_MEMORY_MB", "512"))
 
-engine = TTSEngine(
-    model_path=MODEL_PATH,
-    config_path=CONFIG_PATH,
-    piper_exe=PIPER_EXE
+# Prometheus metrics, served from /metrics
+metrics = Registry()
+requests_total = metrics.counter("tts_requests_total", "HTTP requests by route, method and status")
+request_seconds = metrics.histogram(
+    "tts_request_duration_seconds", "Time until the response started (first chunk for streams), by route"
 )
+synthesis_seconds = metrics.histogram("tts_synthesis_duration_seconds", "Duration of one engine synthesis call")
+characters_total = metrics.counter("tts_characters_total", "Characters synthesized")
+audio_seconds_total = metrics.counter("tts_audio_seconds_total", "Seconds of audio synthesized")
+errors_total = metrics.counter("tts_errors_total", "Failed requests and renders by cause")
+
+def _load_voice(voice: Voice):
+    if ENGINE_MODE == "pool":
+        voice_engine = PiperVoicePool(
+            model_path=voice.model_path,
+            config_path=voice.config_path,
+            size=POOL_SIZE
+        )
+    else:
+        voice_engine = TTSEngine(
+            model_path=voice.model_path,
+            config_path=voice.config_path,
+            piper_exe=PIPER_EXE,
+            output_mode=OUTPUT_MODE,
+            timeout=TIMEOUT
+        )
+    return MeteredEngine(voice_engine, synthesis_seconds, characters_total, audio_seconds_total)
+
+def _voice_cost(voice: Voice) -> int:
+    # Pool mode keeps one onnxruntime session per worker; piper.exe exits after each request
+    return voice.size_bytes * POOL_SIZE if ENGINE_MODE == "pool" else 0
+
+voices = VoiceRegistry(
+    VOICES_DIR,
+    factory=_load_voice,
+    cost=_voice_cost,
+    memory_bytes=VOICE_MEMORY_MB * 1024 * 1024,
+    default=DEFAULT_VOICE
+)
+# Load the default voice now, so a broken setup fails at startup rather than on the first request
+voices.loaded(voices.voice())
+# Cache keys include each voice's model hash; hashing a model on a request
+# would stall the event loop, so every voice is fingerprinted up front
+for entry in voices.voices.values():
+    entry.model_hash
+
+limiter = SynthesisLimiter(
+    max_concurrency=MAX_CONCURRENCY,
+    max_queue=MAX_QUEUE,
+    timeout=TIMEOUT
+)
+
+# Synthesized audio is cached by content; set TTS_CACHE_DIR="" to keep it in memory only
+CACHE_DIR = os.environ.get("TTS_CACHE_DIR", "cache")
+CACHE_MEMORY_MB = int(os.environ.get("TTS_CACHE_MEMORY_MB", "64"))
+CACHE_DISK_MB = int(os.environ.get("TTS_CACHE_DISK_MB", "1024"))
+CACHE_MAX_AGE = 86400
+
+cache = AudioCache(
+    memory_bytes=CACHE_MEMORY_MB * 1024 * 1024,
+    disk_dir=CACHE_DIR or None,
+    disk_bytes=CACHE_DISK_MB * 1024 * 1024
+)
+def _engine_stat(name: str):
+    return lambda: voices.stats().get(name)
+
+def _workers_active():
+    # Subprocess mode reports running piper processes, pool mode busy voices
+    stats = voices.stats()
+    return stats.get("processes", stats.get("busy"))
+
+# The disk tier reads, writes and evicts files, so it is used off the event loop
+async def _cache_get(key: str, record_miss: bool = True) -> Optional[bytes]:
+    return await run_in_threadpool(cache.get, key, record_miss)
+
+async def _cache_put(key: str, data: bytes):
+    await run_in_threadpool(cache.put, key, data)
+
+async def _cache_contains(key: str) -> bool:
+    return await run_in_threadpool(cache.__contains__, key)
+
+def _cache_stat(*names: str):
+    return lambda: sum(cache.stats()[name] for name in names)
+
+metrics.callback("tts_queue_depth", "Requests waiting for a synthesis slot", lambda: limiter.waiting)
+metrics.callback("tts_active_syntheses", "Synthesis slots in use", lambda: limiter.active)
+metrics.callback("tts_max_concurrency", "Synthesis slots available", lambda: limiter.max_concurrency)
+metrics.callback("tts_max_queue", "Requests allowed to wait before 503", lambda: limiter.max_queue)
+metrics.callback("tts_piper_workers_active", "Piper processes running or pooled voices busy", _workers_active)
+metrics.callback("tts_piper_pool_size", "Warm voices in pool mode", _engine_stat("size"))
+metrics.callback("tts_piper_spawned_total", "Piper processes or voices started", _engine_stat("spawned"), "counter")
+metrics.callback("tts_cache_hits_total", "Audio cache hits", _cache_stat("hits_memory", "hits_disk"), "counter")
+metrics.callback("tts_cache_misses_total", "Audio cache misses", _cache_stat("misses"), "counter")
+metrics.callback("tts_cache_hit_ratio", "Audio cache hits / lookups", _cache_stat("hit_ratio"))
+metrics.callback("tts_cache_memory_bytes", "Audio held in the memory cache tier", _cache_stat("memory_bytes"))
+metrics.callback("tts_cache_disk_bytes", "Audio held in the disk cache tier", _cache_stat("disk_bytes"))
+metrics.callback("tts_voices_loaded", "Voices currently loaded", lambda: len(voices.stats()["loaded_voices"]))
+metrics.callback("tts_voice_resident_bytes", "Estimated memory held by loaded voices", _engine_stat("resident_bytes"))
+metrics.callback("tts_voice_loads_total", "Voice loads, including reloads after eviction", _engine_stat("loads"), "counter")
+metrics.callback("tts_voice_evictions_total", "Voices unloaded to stay within the memory budget", _engine_stat("evictions"), "counter")
+metrics.callback("tts_batch_renders_inflight", "Batch pre-renders not finished yet", lambda: len(_inflight))
+
+def _error_cause(e: Exception) -> str:
+    if isinstance(e, Overloaded):
+        return "overloaded"
+    if isinstance(e, (SynthesisTimeout, TimeoutError)):
+        return "timeout"
+    return "synthesis"
+
+def record_request(route: str, method: str, status: int, seconds: float):
+    # Called by the HTTP middleware in app.main
+    requests_total.inc(route=route, method=method, status=str(status))
+    request_seconds.observe(seconds, route=route)
 
 class TTSIn(BaseModel):
     text: str
+    # Name of a voice from /tts/voices; the default voice if omitted
+    voice: Optional[str] = None
     length_scale: float = 1.0
     noise_scale: float = 0.667
     noise_w: float = 0.8
+    # Output format; negotiated from the Accept header if omitted
+    format: Optional[Literal["wav", "ogg", "mp3"]] = None
+
+class TTSBatchIn(BaseModel):
+    texts: List[str]
+    voice: Optional[str] = None
+    length_scale: float = 1.0
+    noise_scale: float = 0.667
+    noise_w: float = 0.8
+
+class TTSStreamIn(TTSIn):
+    # "wav" prefixes the stream with a WAV header of unknown length,
+    # "pcm" sends bare 16-bit mono samples at X-Sample-Rate,
+    # "ogg" (Opus) and "mp3" are encoded sentence by sentence
+    format: Optional[Literal["wav", "pcm", "ogg", "mp3"]] = None
+
+AUDIO_ID = re.compile(r"^[0-9a-f]{64}$")
+
+def _voice(name: Optional[str]) -> Voice:
+    try:
+        return voices.voice(name)
+    except UnknownVoice:
+        raise HTTPException(status_code=404, detail=f"Unknown voice: {name}")
+
+def _key(inp: TTSIn) -> str:
+    # Per-voice model hash: the same text in another voice is different audio
+    model_hash = _voice(inp.voice).model_hash
+    return cache_key(inp.text, model_hash, inp.length_scale, inp.noise_scale, inp.noise_w)
+
+def _output_format(requested: Optional[str], request: Request) -> str:
+    # An explicit format wins over the Accept header
+    fmt = requested or negotiate(request.headers.get("accept"))
+    if fmt not in AVAILABLE and fmt != "pcm":
+        raise HTTPException(
+            status_code=406,
+            detail=f"Unsupported output format; available: {', '.join(AVAILABLE)}"
+        )
+    return fmt
+
+def _variant_key(key: str, fmt: str) -> str:
+    # Compressed renders are cached next to the WAV as <key>.<format>
+    return key if fmt == "wav" else f"{key}.{fmt}"
+
+def _cache_headers(key: str) -> dict:
+    # Keys are content hashes, so a given URL+body always maps to the same audio
+    return {
+        "ETag": f'"{key}"',
+        "Cache-Control": f"public, max-age={CACHE_MAX_AGE}, immutable",
+        "Vary": "Accept",
+    }
+
+def _etag_matches(request: Request, key: str) -> bool:
+    if_none_match = request.headers.get("if-none-match", "")
+    return f'"{key}"' in if_none_match or if_none_match.strip() == "*"
+
+# Renders started by /tts/batch that have not landed in the cache yet, by cache key
+_inflight: Dict[str, asyncio.Task] = {}
+# Why the most recent failed renders failed, so /tts/audio/{id} can say so
+_failed: Dict[str, Exception] = OrderedDict()
+_batch_semaphore = None
+
+async def _render(key: str, inp: TTSIn) -> bytes:
+    global _batch_semaphore
+    if _batch_semaphore is None:
+        _batch_semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async with _batch_semaphore:
+        while True:
+            try:
+                audio_bytes = await limiter.run(
+                    voices.engine(inp.voice).synthesize,
+                    inp.text,
+                    length_scale=inp.length_scale,
+                    noise_scale=inp.noise_scale,
+                    noise_w=inp.noise_w
+                )
+                break
+            except Overloaded as e:
+                # Background work backs off instead of failing
+                await asyncio.sleep(e.retry_after)
+            except Exception as e:
+                errors_total.inc(cause=_error_cause(e), source="batch")
+                raise
+    await _cache_put(key, audio_bytes)
+    return audio_bytes
+
+def _schedule(key: str, inp: TTSIn) -> asyncio.Task:
+    task = _inflight.get(key)
+    if task is None:
+        _failed.pop(key, None)
+        task = asyncio.create_task(_render(key, inp))
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _rendered(key, done))
+    return task
+
+def _rendered(key: str, task: asyncio.Task):
+    _inflight.pop(key, None)
+    if task.cancelled():
+        return
+    # Reading the exception also keeps asyncio from logging it as never retrieved
+    error = task.exception()
+    if error is not None:
+        _failed[key] = error
+        while len(_failed) > MAX_INFLIGHT:
+            _failed.popitem(last=False)
+
+def _overloaded(e: Overloaded) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+def _render_failed(e: Exception) -> HTTPException:
+    status_code = 504 if isinstance(e, SynthesisTimeout) else 500
+    return HTTPException(status_code=status_code, detail=f"Rendering failed: {e}")
+
+async def _synthesize_encoded(inp: TTSIn, fmt: str) -> bytes:
+    # Sentence by sentence, so each sentence is encoded while the next ones synthesize
+    loop = asyncio.get_running_loop()
+    engine = voices.engine(inp.voice)
+    encoder = StreamEncoder(fmt, engine.sample_rate)
+    parts = []
+    async for pcm in stream_sentences(
+        limiter,
+        engine,
+        inp.text,
+        length_scale=inp.length_scale,
+        noise_scale=inp.noise_scale,
+        noise_w=inp.noise_w
+    ):
+        parts.append(await loop.run_in_executor(None, encoder.encode, pcm))
+    parts.append(await loop.run_in_executor(None, encoder.finish))
+    return b"".join(parts)
+
+async def _encoded(key: str, inp: TTSIn, fmt: str) -> bytes:
+    """Compressed audio for ``key``, re-encoding the WAV if that is already rendered."""
+    audio_bytes = await _cache_get(_variant_key(key, fmt), record_miss=False)
+    if audio_bytes is not None:
+        return audio_bytes
+    wav_bytes = await _cache_get(key)
+    if wav_bytes is None and key in _inflight:
+        wav_bytes = await asyncio.shield(_inflight[key])
+    if wav_bytes is not None:
+        loop = asyncio.get_running_loop()
+        audio_bytes = await loop.run_in_executor(None, encode_wav, wav_bytes, fmt)
+    else:
+        audio_bytes = await _synthesize_encoded(inp, fmt)
+    await _cache_put(_variant_key(key, fmt), audio_bytes)
+    return audio_bytes
 
 @router.post("/tts")
-def tts(inp: TTSIn):
+async def tts(inp: TTSIn, request: Request):
+    fmt = _output_format(inp.format, request)
+    key = _key(inp)
+    variant = _variant_key(key, fmt)
+    headers = _cache_headers(variant)
+    if _etag_matches(request, variant):
+        return Response(status_code=304, headers=headers)
+
     try:
-        audio_bytes = engine.synthesize(
-            inp.text,
+        if fmt != "wav":
+            audio_bytes = await _encoded(key, inp, fmt)
+            return Response(content=audio_bytes, media_type=media_type(fmt), headers=headers)
+        audio_bytes = await _cache_get(key)
+        if audio_bytes is None and key in _inflight:
+            # Already being pre-rendered by a batch: wait for it instead of rendering twice
+            audio_bytes = await asyncio.shield(_inflight[key])
+        if audio_bytes is None:
+            audio_bytes = await limiter.run(
+                voices.engine(inp.voice).synthesize,
+                inp.text,
+                length_scale=inp.length_scale,
+                noise_scale=inp.noise_scale,
+                noise_w=inp.noise_w
+            )
+            await _cache_put(key, audio_bytes)
+        return Response(content=audio_bytes, media_type="audio/wav", headers=headers)
+    except Overloaded as e:
+        errors_total.inc(cause="overloaded", source="tts")
+        raise _overloaded(e)
+    except SynthesisTimeout as e:
+        errors_total.inc(cause="timeout", source="tts")
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        errors_total.inc(cause=_error_cause(e), source="tts")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Browsers only reuse cached responses for GET, so expose the same synthesis
+# with query parameters for clients that want HTTP caching
+@router.get("/tts")
+async def tts_get(
+    request: Request,
+    text: str,
+    voice: Optional[str] = None,
+    length_scale: float = 1.0,
+    noise_scale: float = 0.667,
+    noise_w: float = 0.8,
+    format: Optional[Literal["wav", "ogg", "mp3"]] = None
+):
+    inp = TTSIn(
+        text=text,
+        voice=voice,
+        length_scale=length_scale,
+        noise_scale=noise_scale,
+        noise_w=noise_w,
+        format=format
+    )
+    return await tts(inp, request)
+
+@router.post("/tts/batch")
+async def tts_batch(inp: TTSBatchIn):
+    if len(inp.texts) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_ITEMS} texts per batch")
+
+    # Returns immediately; each id can be fetched from /tts/audio/{id} (or the same
+    # text re-requested from /tts) and is served from the cache once rendered
+    items = []
+    renders = {}
+    for text in inp.texts:
+        item = TTSIn(
+            text=text,
+            voice=inp.voice,
             length_scale=inp.length_scale,
             noise_scale=inp.noise_scale,
             noise_w=inp.noise_w
         )
-        return Response(content=audio_bytes, media_type="audio/wav")
+        key = _key(item)
+        if await _cache_contains(key):
+            status = "ready"
+        else:
+            if key not in _inflight:
+                renders[key] = item
+            status = "pending"
+        items.append({"id": key, "status": status})
+
+    # All or nothing, so a client retrying after 503 does not get half a batch
+    if len(_inflight) + len(renders) > MAX_INFLIGHT:
+        errors_total.inc(cause="overloaded", source="batch")
+        raise HTTPException(
+            status_code=503,
+            detail="Too many pre-renders pending",
+            headers={"Retry-After": str(limiter.retry_after)}
+        )
+    for key, item in renders.items():
+        _schedule(key, item)
+    return {"items": items}
+
+@router.get("/tts/audio/{audio_id}")
+async def tts_audio(audio_id: str, request: Request, format: Optional[Literal["wav", "ogg", "mp3"]] = None):
+    if not AUDIO_ID.match(audio_id):
+        raise HTTPException(status_code=404, detail="Unknown audio id")
+    fmt = _output_format(format, request)
+    variant = _variant_key(audio_id, fmt)
+    headers = _cache_headers(variant)
+    if _etag_matches(request, variant):
+        return Response(status_code=304, headers=headers)
+
+    encoded = await _cache_get(variant, record_miss=False) if fmt != "wav" else None
+    if encoded is not None:
+        return Response(content=encoded, media_type=media_type(fmt), headers=headers)
+    audio_bytes = await _cache_get(audio_id)
+    if audio_bytes is None and audio_id in _inflight:
+        try:
+            audio_bytes = await asyncio.wait_for(asyncio.shield(_inflight[audio_id]), TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Audio is still being rendered")
+        except Exception as e:
+            raise _render_failed(e)
+    if audio_bytes is None and audio_id in _failed:
+        raise _render_failed(_failed[audio_id])
+    if audio_bytes is None:
+        raise HTTPException(status_code=404, detail="Unknown audio id")
+    if fmt != "wav":
+        loop = asyncio.get_running_loop()
+        audio_bytes = await loop.run_in_executor(None, encode_wav, audio_bytes, fmt)
+        await _cache_put(variant, audio_bytes)
+    return Response(content=audio_bytes, media_type=media_type(fmt), headers=headers)
+
+@router.get("/tts/voices")
+def tts_voices():
+    loaded = set(voices.stats()["loaded_voices"])
+    return {
+        "default": voices.default,
+        "voices": [
+            dict(voice.info(), loaded=voice.name in loaded)
+            for _, voice in sorted(voices.voices.items())
+        ],
+    }
+
+@router.get("/tts/cache")
+def tts_cache_stats():
+    return cache.stats()
+
+@router.get("/tts/stats")
+def tts_stats():
+    # Point-in-time view of the synthesis backend, polled by bench/loadtest.py
+    return {
+        "engine_mode": ENGINE_MODE,
+        "engine": voices.stats(),
+        "limiter": limiter.stats(),
+        "cache": cache.stats(),
+    }
+
+@router.post("/tts/stream")
+async def tts_stream(inp: TTSStreamIn, request: Request):
+    engine = voices.engine(_voice(inp.voice).name)
+    fmt = _output_format(inp.format, request)
+    content_type = "application/octet-stream" if fmt == "pcm" else media_type(fmt)
+    # Compressed formats carry their own rate, and Opus is resampled anyway
+    headers = {"X-Sample-Rate": str(engine.sample_rate)} if fmt in ("wav", "pcm") else {}
+    loop = asyncio.get_running_loop()
+
+    # Already rendered in full: skip the pipeline and send it in one go
+    key = _key(inp)
+    if fmt in ("ogg", "mp3"):
+        encoded = await _cache_get(_variant_key(key, fmt), record_miss=False)
+        if encoded is not None:
+            return Response(content=encoded, media_type=content_type, headers=headers)
+    cached = await _cache_get(key)
+    if cached is not None:
+        if fmt == "wav":
+            return Response(content=cached, media_type=content_type, headers=headers)
+        if fmt == "pcm":
+            pcm, _ = pcm_from_wav(cached)
+            return Response(content=pcm, media_type=content_type, headers=headers)
+        encoded = await loop.run_in_executor(None, encode_wav, cached, fmt)
+        await _cache_put(_variant_key(key, fmt), encoded)
+        return Response(content=encoded, media_type=content_type, headers=headers)
+
+    # Each sentence takes its own slot, released when its synthesis finishes,
+    # so a stream never holds a slot across the response. Only the first
+    # sentence can be shed; the rest wait for a slot
+    chunks = stream_sentences(
+        limiter,
+        engine,
+        inp.text,
+        length_scale=inp.length_scale,
+        noise_scale=inp.noise_scale,
+        noise_w=inp.noise_w
+    )
+    encoder = StreamEncoder(fmt, engine.sample_rate) if fmt in ("ogg", "mp3") else None
+
+    async def next_chunk() -> Optional[bytes]:
+        try:
+            pcm = await chunks.__anext__()
+        except StopAsyncIteration:
+            pcm = None
+        if encoder is None or encoder.closed:
+            return pcm
+        # Encoded off the loop while the next sentences synthesize
+        if pcm is None:
+            return await loop.run_in_executor(None, encoder.finish)
+        return await loop.run_in_executor(None, encoder.encode, pcm)
+
+    # Synthesize the first sentence before committing to a 200 so failures
+    # still surface as a proper error response
+    try:
+        first = await next_chunk() or b""
+    except Overloaded as e:
+        await chunks.aclose()
+        errors_total.inc(cause="overloaded", source="stream")
+        raise _overloaded(e)
+    except SynthesisTimeout as e:
+        await chunks.aclose()
+        errors_total.inc(cause="timeout", source="stream")
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
+        await chunks.aclose()
+        errors_total.inc(cause=_error_cause(e), source="stream")
         raise HTTPException(status_code=500, detail=str(e))
+
+    async def body():
+        try:
+            if fmt == "wav":
+                yield wav_header(engine.sample_rate)
+            yield first
+            while True:
+                chunk = await next_chunk()
+                if chunk is None:
+                    break
+                # Ogg holds back audio until a page fills
+                if chunk:
+                    yield chunk
+        except Exception as e:
+            # Too late for an error status; the client sees a truncated stream
+            errors_total.inc(cause=_error_cause(e), source="stream")
+            raise
+        finally:
+            await chunks.aclose()
+
+    # Also runs if the client is gone before body() starts; a second aclose() is a no-op
+    return StreamingResponse(body(), media_type=content_type, headers=headers, background=BackgroundTask(chunks.aclose))
+
+@router.get("/health")
+def health():
+    # Liveness for the Next.js server manager; saturation is reported, not failed
+    stats = limiter.stats()
+    saturated = stats["active"] >= stats["max_concurrency"] and stats["waiting"] >= stats["max_queue"]
+    return {
+        "status": "saturated" if saturated else "ok",
+        "engine_mode": ENGINE_MODE,
+        "active": stats["active"],
+        "waiting": stats["waiting"],
+    }
+
+@router.get("/metrics")
+def prometheus_metrics():
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.text import normalize_text
+
+def model_fingerprint(model_path: str) -> str:
+    """Short content hash of a voice model, so swapping the .onnx file invalidates the cache."""
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+def cache_key(
+    text: str,
+    model_hash: str,
+    length_scale: float,
+    noise_scale: float,
+    noise_w: float
+) -> str:
+    payload = json.dumps(
+        [normalize_text(text), model_hash, float(length_scale), float(noise_scale), float(noise_w)],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class AudioCache:
+    """Two-tier audio cache: a size-bounded in-memory LRU in front of a disk store.
+
+    Entries are content addressed (see ``cache_key``) and never change once
+    written, which makes them safe to share between processes through the
+    disk tier and to hand out with a strong ETag. A key with its own
+    extension (``<key>.ogg``) is a variant of ``<key>`` and is stored under
+    that name, next to it.
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int = 64 * 1024 * 1024,
+        disk_dir: Optional[str] = None,
+        disk_bytes: int = 1024 * 1024 * 1024,
+        suffix: str = ".wav"
+    ):
+        self.memory_bytes = memory_bytes
+        self.disk_dir = os.path.abspath(disk_dir) if disk_dir else None
+        self.disk_bytes = disk_bytes
+        self.suffix = suffix
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._memory_used = 0
+        self._disk_used = 0
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_used = sum(size for _, _, size in self._disk_entries())
+
+    def _path(self, key: str) -> str:
+        name = key if "." in key else key + self.suffix
+        return os.path.join(self.disk_dir, key[:2], name)
+
+    def _disk_entries(self):
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                # Files still being written by put()
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_mtime, st.st_size
+
+    def _remember(self, key: str, data: bytes):
+        # Caller holds the lock
+        if len(data) > self.memory_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_used -= len(old)
+        self._memory[key] = data
+        self._memory_used += len(data)
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted)
+
+    def get(self, key: str, record_miss: bool = True) -> Optional[bytes]:
+        """Cached data for ``key``, or None.
+
+        Pass ``record_miss=False`` for a lookup that falls back to another
+        key on a miss (a variant before its WAV), so each request counts
+        as one lookup in the hit ratio.
+        """
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                return data
+
+        if self.disk_dir:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                # Refresh mtime so disk eviction is approximately LRU as well
+                os.utime(path)
+            except OSError:
+                data = None
+            if data is not None:
+                with self._lock:
+                    self.hits_disk += 1
+                    self._remember(key, data)
+                return data
+
+        if record_miss:
+            with self._lock:
+                self.misses += 1
+        return None
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._memory:
+                return True
+        return bool(self.disk_dir) and os.path.isfile(self._path(key))
+
+    def put(self, key: str, data: bytes):
+        with self._lock:
+            self._remember(key, data)
+
+        if not self.disk_dir:
+            return
+
+        path = self._path(key)
+        if os.path.isfile(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never observe a partial file
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+
+        with self._lock:
+            self._disk_used += len(data)
+            over_budget = self._disk_used > self.disk_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        # Trim to 90% of the budget so eviction does not run on every put
+        target = int(self.disk_bytes * 0.9)
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_used = total
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits_memory + self.hits_disk + self.misses
+            hits = self.hits_memory + self.hits_disk
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_used,
+                "disk_bytes": self._disk_used,
+            }
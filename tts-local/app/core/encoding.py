@@ -0,0 +1,220 @@
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from app.core.wav import pcm_from_wav
+
+# Compressed output goes through libsndfile. Without it (or with a build that
+# lacks Opus/MP3) only WAV is offered.
+try:
+    import soundfile
+except (ImportError, OSError):
+    soundfile = None
+
+# Output format -> (media type, libsndfile container, subtype)
+FORMATS = {
+    "wav": ("audio/wav", None, None),
+    "ogg": ("audio/ogg; codecs=opus", "OGG", "OPUS"),
+    "mp3": ("audio/mpeg", "MP3", "MPEG_LAYER_III"),
+}
+# Accept header media types understood for each format
+ACCEPT_TYPES = {
+    "audio/wav": "wav", "audio/wave": "wav", "audio/x-wav": "wav",
+    "audio/ogg": "ogg", "audio/opus": "ogg",
+    "audio/mpeg": "mp3", "audio/mp3": "mp3",
+}
+# Constant bitrate, so decoders get the length right without the Xing frame
+# that a stream cannot patch (0.75 is roughly 50 kbps, plenty for speech)
+MP3_OPTIONS = {"bitrate_mode": "CONSTANT", "compression_level": 0.75}
+# Sample rates Opus can encode; Piper's 22050 Hz voices are resampled up to the next one
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+
+def media_type(fmt: str) -> str:
+    return FORMATS[fmt][0]
+
+def negotiate(accept: Optional[str], default: str = "wav") -> str:
+    """Pick the output format for an Accept header.
+
+    Falls back to ``default`` when the header names no available audio
+    type, like servers usually do rather than answering 406.
+    """
+    if not accept:
+        return default
+    best, best_q = None, 0.0
+    for part in accept.split(","):
+        fields = part.strip().split(";")
+        media = fields[0].strip().lower()
+        q = 1.0
+        for param in fields[1:]:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media in ("*/*", "audio/*"):
+            fmt = default
+        else:
+            fmt = ACCEPT_TYPES.get(media)
+        # Equal q: the earlier entry wins
+        if fmt in AVAILABLE and q > best_q:
+            best, best_q = fmt, q
+    return best or default
+
+class _Sink:
+    """Write-only file object that hands out what the encoder produced so far.
+
+    libsndfile asks to seek back at the end to patch headers; that is not
+    possible once bytes have been sent, so seeks are ignored.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        return b""
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+class _Upsampler:
+    """Linear interpolation to a higher rate, continuous across chunks."""
+
+    def __init__(self, input_rate: int, output_rate: int):
+        self.step = input_rate / float(output_rate)
+        self._last = 0.0
+        self._position = 1.0
+
+    def __call__(self, samples: np.ndarray) -> np.ndarray:
+        count = len(samples)
+        if not count:
+            return samples
+        signal = np.empty(count + 1, dtype=np.float32)
+        signal[0] = self._last
+        signal[1:] = samples
+        self._last = float(signal[-1])
+        if self._position > count:
+            self._position -= count
+            return np.empty(0, dtype=np.int16)
+        n = int((count - self._position) // self.step) + 1
+        positions = self._position + np.arange(n) * self.step
+        self._position += n * self.step - count
+        return np.rint(np.interp(positions, np.arange(count + 1), signal)).astype(np.int16)
+
+def _strip_mp3_info_frame(data: bytes) -> bytes:
+    """Drop the Xing/Info frame the encoder puts first.
+
+    The encoder writes it zeroed and fills in the frame count by seeking
+    back when the file is closed. A streamed response cannot be patched,
+    and decoders that read the blank frame stop early.
+    """
+    if len(data) < 4 or data[0] != 0xFF or (data[1] & 0xE0) != 0xE0:
+        return data
+    version = (data[1] >> 3) & 0x3  # 3: MPEG-1, 2: MPEG-2, 0: MPEG-2.5
+    bitrate_index = data[2] >> 4
+    rate_index = (data[2] >> 2) & 0x3
+    padding = (data[2] >> 1) & 0x1
+    if bitrate_index in (0, 15) or rate_index == 3 or version == 1:
+        return data
+    if version == 3:
+        bitrate = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)[bitrate_index]
+        sample_rate = (44100, 48000, 32000)[rate_index]
+        size = 144 * bitrate * 1000 // sample_rate + padding
+    else:
+        bitrate = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)[bitrate_index]
+        sample_rate = (22050, 24000, 16000)[rate_index] // (2 if version == 0 else 1)
+        size = 72 * bitrate * 1000 // sample_rate + padding
+    frame = data[4:size]
+    if b"Xing" in frame or b"Info" in frame or not frame.strip(b"\0"):
+        return data[size:]
+    return data
+
+class StreamEncoder:
+    """Encodes 16-bit mono PCM chunk by chunk; each call returns the bytes ready so far."""
+
+    def __init__(self, fmt: str, sample_rate: int, check: bool = True):
+        _, container, subtype = FORMATS[fmt]
+        if container is None or (check and fmt not in AVAILABLE):
+            raise ValueError(f"Cannot encode {fmt}")
+        self.format = fmt
+        self._resample = None
+        if fmt == "ogg" and sample_rate not in OPUS_RATES:
+            target = next(rate for rate in OPUS_RATES if rate >= sample_rate)
+            self._resample = _Upsampler(sample_rate, target)
+            sample_rate = target
+        options = MP3_OPTIONS if fmt == "mp3" else {}
+        self._sink = _Sink()
+        self._file = soundfile.SoundFile(
+            self._sink, "w", samplerate=sample_rate, channels=1, format=container, subtype=subtype, **options
+        )
+        self._started = False
+
+    def _output(self) -> bytes:
+        data = self._sink.take()
+        if self.format == "mp3" and not self._started and data:
+            data = _strip_mp3_info_frame(data)
+        self._started = self._started or bool(data)
+        return data
+
+    def encode(self, pcm: bytes) -> bytes:
+        samples = np.frombuffer(pcm, dtype="<i2", count=len(pcm) // 2)
+        if self._resample is not None:
+            samples = self._resample(samples)
+        if len(samples):
+            self._file.write(samples)
+        return self._output()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def finish(self) -> bytes:
+        self._file.close()
+        return self._output()
+
+def _supported(fmt: str) -> bool:
+    """Whether ``fmt`` can really be encoded here, tried with a short test encode.
+
+    libsndfile may list a format whose encoder is missing, and older
+    soundfile releases reject the MP3 options; either way the format is
+    left out rather than failing every request that negotiates it.
+    """
+    if FORMATS[fmt][1] is None:
+        return True
+    if soundfile is None:
+        return False
+    try:
+        encoder = StreamEncoder(fmt, 16000, check=False)
+        encoder.encode(b"\x00\x00" * 1600)
+        encoder.finish()
+    except Exception:
+        return False
+    return True
+
+AVAILABLE = [fmt for fmt in FORMATS if _supported(fmt)]
+
+def encode_pcm(chunks: Iterable[bytes], fmt: str, sample_rate: int) -> bytes:
+    """Encode a whole PCM stream, consuming ``chunks`` as they are produced."""
+    encoder = StreamEncoder(fmt, sample_rate)
+    parts = [encoder.encode(chunk) for chunk in chunks]
+    parts.append(encoder.finish())
+    return b"".join(parts)
+
+def encode_wav(wav_bytes: bytes, fmt: str) -> bytes:
+    """Re-encode a cached WAV as ``fmt``."""
+    pcm, sample_rate = pcm_from_wav(wav_bytes)
+    return encode_pcm([pcm], fmt, sample_rate)
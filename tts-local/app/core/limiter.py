@@ -0,0 +1,137 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted; maps to 503 + Retry-After."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class SynthesisTimeout(Exception):
+    """Raised when admitted work does not finish within the request timeout."""
+
+class SynthesisLimiter:
+    """Admission control for synthesis work.
+
+    At most ``max_concurrency`` syntheses run at once on a dedicated thread
+    pool, at most ``max_queue`` requests wait for a slot, and everything
+    beyond that is rejected immediately so latency degrades gracefully
+    instead of every request slowing down together.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 2,
+        max_queue: int = 16,
+        timeout: float = 30.0,
+        retry_after: int = 2
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="tts-synth"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the server's running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def acquire(self, timeout: Optional[float] = None, admitted: bool = False):
+        """Wait for a slot.
+
+        ``admitted`` work belongs to a request whose response has already
+        started (the rest of a stream). It is never shed: it waits as long
+        as it takes, since failing it now would only truncate the response.
+        """
+        semaphore = self._get_semaphore()
+        # Counted synchronously, so a burst arriving in one loop tick is still capped
+        if not admitted and self.active + self.waiting >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            raise Overloaded("TTS queue is full", self.retry_after)
+
+        self.waiting += 1
+        # Shielded, so a timeout cannot cancel an acquire that just succeeded
+        # (wait_for loses the slot in that race before Python 3.12)
+        acquiring = asyncio.ensure_future(semaphore.acquire())
+        try:
+            await asyncio.wait_for(asyncio.shield(acquiring), None if admitted else timeout or self.timeout)
+        except BaseException as e:
+            # Timed out or the caller was cancelled: stop waiting, and give the
+            # slot back if it was granted anyway
+            acquiring.add_done_callback(self._abandoned)
+            acquiring.cancel()
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected += 1
+                raise Overloaded("Timed out waiting for a TTS worker", self.retry_after)
+            raise
+        finally:
+            self.waiting -= 1
+        self.active += 1
+
+    def _abandoned(self, acquiring: asyncio.Future):
+        if not acquiring.cancelled() and acquiring.exception() is None:
+            self._get_semaphore().release()
+
+    def release(self):
+        self.active -= 1
+        self._get_semaphore().release()
+
+    async def run(self, func, *args, **kwargs):
+        """Run ``func`` on the synthesis pool once a slot is free."""
+        # Waiting for a slot is bounded by acquire(); the synthesis gets the
+        # full timeout from the moment it starts, so a request that queued
+        # for a while is not started only to be abandoned straight away
+        await self.acquire()
+        return await self._execute(partial(func, *args, **kwargs))
+
+    async def run_admitted(self, func, *args, **kwargs):
+        """Like run(), for the rest of a request that was already admitted; never Overloaded."""
+        await self.acquire(admitted=True)
+        return await self._execute(partial(func, *args, **kwargs))
+
+    async def _execute(self, job):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, job)
+        # The slot is only returned once the worker thread is really done,
+        # even if the caller gave up waiting on it
+        future.add_done_callback(self._on_done)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise SynthesisTimeout(f"Synthesis exceeded {self.timeout}s")
+
+    def _on_done(self, future: asyncio.Future):
+        self.release()
+        if not future.cancelled():
+            # Mark late failures as retrieved; the caller already got SynthesisTimeout
+            future.exception()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+    def close(self):
+        try:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        except TypeError:
+            # Python < 3.9: queued syntheses still run, but nothing waits for them
+            self.executor.shutdown(wait=False)
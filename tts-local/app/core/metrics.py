@@ -0,0 +1,156 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from app.core.tts_engine import WAV_HEADER_SIZE
+
+# Seconds; covers a cached short prompt up to a long paragraph on a slow CPU
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[Tuple[str, tuple, float]]:
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name, labels, value
+
+class Histogram:
+    """Cumulative histogram in the Prometheus bucket layout."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._lock = threading.Lock()
+        # labels -> (per-bucket counts, sum, count)
+        self._series: Dict[Tuple[Tuple[str, str], ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def samples(self) -> Iterable[Tuple[str, tuple, float]]:
+        with self._lock:
+            items = [(labels, (list(counts), total, count)) for labels, (counts, total, count) in self._series.items()]
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                yield f"{self.name}_bucket", labels + (("le", _format_value(bound)),), cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, count
+
+class Callback:
+    """Value read from the application at scrape time (queue depth, cache stats, ...)."""
+
+    def __init__(self, name: str, help: str, func: Callable[[], Optional[float]], kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.func = func
+        self.kind = kind
+
+    def samples(self) -> Iterable[Tuple[str, tuple, float]]:
+        value = self.func()
+        if value is not None:
+            yield self.name, (), value
+
+class Registry:
+    """A set of metrics rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._add(Counter(name, help))
+
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, buckets))
+
+    def callback(self, name: str, help: str, func: Callable[[], Optional[float]], kind: str = "gauge") -> Callback:
+        return self._add(Callback(name, help, func, kind))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+class MeteredEngine:
+    """Wraps a TTSEngine or PiperVoicePool and records every synthesis.
+
+    Everything else (sample_rate, stats, close, ...) is passed through, so
+    the wrapper can stand in for the engine anywhere.
+    """
+
+    def __init__(self, engine, seconds: Histogram, characters: Counter, audio_seconds: Counter):
+        self._engine = engine
+        self._seconds = seconds
+        self._characters = characters
+        self._audio_seconds = audio_seconds
+
+    def __getattr__(self, name):
+        return getattr(self._engine, name)
+
+    def _record(self, kind: str, text: str, started: float, pcm_bytes: int):
+        self._seconds.observe(time.perf_counter() - started, kind=kind)
+        self._characters.inc(len(text))
+        self._audio_seconds.inc(max(0, pcm_bytes) / (2.0 * self._engine.sample_rate))
+
+    def synthesize(self, text: str, **kwargs) -> bytes:
+        started = time.perf_counter()
+        audio = self._engine.synthesize(text, **kwargs)
+        self._record("wav", text, started, len(audio) - WAV_HEADER_SIZE)
+        return audio
+
+    def synthesize_raw(self, text: str, **kwargs) -> bytes:
+        started = time.perf_counter()
+        pcm = self._engine.synthesize_raw(text, **kwargs)
+        self._record("pcm", text, started, len(pcm))
+        return pcm
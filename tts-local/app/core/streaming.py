@@ -0,0 +1,60 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator
+
+from app.core.limiter import SynthesisLimiter
+from app.core.text import split_sentences
+
+async def stream_sentences(
+    limiter: SynthesisLimiter,
+    engine,
+    text: str,
+    length_scale: float = 1.0,
+    noise_scale: float = 0.667,
+    noise_w: float = 0.8,
+    lookahead: int = 2,
+    sentence_silence: float = 0.2
+) -> AsyncIterator[bytes]:
+    """Yield raw PCM for ``text`` one sentence at a time, in order.
+
+    Every sentence is synthesized through ``limiter``, so each one takes its
+    own slot and the concurrency cap holds for streams too. Only the first
+    sentence can be shed with ``Overloaded``; once it is admitted the rest
+    wait for slots, so a response that has started is not cut short. Up to
+    ``lookahead`` sentences are submitted ahead, so the next sentence is
+    usually ready by the time the previous one has been sent.
+    """
+    sentences = split_sentences(text) or [text]
+    silence = b"\x00\x00" * int(engine.sample_rate * sentence_silence)
+
+    pending = deque()
+    remaining = iter(sentences)
+
+    def submit_next(run):
+        sentence = next(remaining, None)
+        if sentence is not None:
+            pending.append(asyncio.ensure_future(run(
+                engine.synthesize_raw,
+                sentence,
+                length_scale=length_scale,
+                noise_scale=noise_scale,
+                noise_w=noise_w
+            )))
+
+    try:
+        submit_next(limiter.run)
+        for _ in range(max(1, lookahead) - 1):
+            submit_next(limiter.run_admitted)
+        first = True
+        while pending:
+            pcm = await pending.popleft()
+            submit_next(limiter.run_admitted)
+            if not first and silence:
+                yield silence
+            first = False
+            yield pcm
+    finally:
+        # Client went away or synthesis failed: drop sentences not yet started.
+        # Ones already running keep their slot until the thread finishes
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,38 @@
+import re
+from typing import List
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+")
+
+def split_sentences(text: str, min_chars: int = 20) -> List[str]:
+    """Split text into sentences for pipelined synthesis.
+
+    Fragments shorter than ``min_chars`` are merged into the following
+    sentence so very short clauses ("Great!") do not become separate,
+    choppy utterances.
+    """
+    sentences = []
+    pending = ""
+    for part in _SENTENCE_END.split(text.strip()):
+        part = part.strip()
+        if not part:
+            continue
+        pending = f"{pending} {part}" if pending else part
+        if len(pending) >= min_chars:
+            sentences.append(pending)
+            pending = ""
+    if pending:
+        if sentences and len(pending) < min_chars:
+            sentences[-1] = f"{sentences[-1]} {pending}"
+        else:
+            sentences.append(pending)
+    return sentences
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: str) -> str:
+    """Canonical form of ``text`` used for cache keys.
+
+    Only whitespace is collapsed; case and punctuation change Piper's
+    prosody and are therefore significant.
+    """
+    return _WHITESPACE.sub(" ", text).strip()
@@ -1,9 +1,20 @@
+import json
 import os
 import shutil
 import subprocess
 import tempfile
+import threading
 from typing import Optional
 
+from app.core.wav import pcm_from_wav, wav_header
+
+DEFAULT_TEXT = "Hello, this is a local Piper TTS test."
+
+WAV_HEADER_SIZE = 44
+# Rough speaking rate used to size the PCM buffer up front; it grows if short
+CHARS_PER_SECOND = 12.0
+READ_CHUNK = 64 * 1024
+
 def _abs(p: str) -> str:
     return os.path.abspath(os.path.expanduser(p))
 
@@ -12,8 +23,17 @@ class TTSEngine:
         self,
         model_path: str,
         config_path: str,
-        piper_exe: Optional[str] = None
+        piper_exe: Optional[str] = None,
+        output_mode: str = "raw",
+        timeout: Optional[float] = None
     ):
+        # "raw" streams PCM over stdout; "file" lets piper write a temp WAV
+        if output_mode not in ("raw", "file"):
+            raise ValueError(f"Unknown output_mode: {output_mode}")
+        self.output_mode = output_mode
+        # Piper processes running longer than this are killed
+        self.timeout = timeout
+
         # Resolve absolute paths
         self.model_path = _abs(model_path)
         self.config_path = _abs(config_path)
@@ -44,6 +64,120 @@ class TTSEngine:
         if not os.path.isfile(self.config_path):
             raise FileNotFoundError(f"Config file not found: {self.config_path}")
 
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            self.sample_rate = int(json.load(f)["audio"]["sample_rate"])
+
+        # Piper processes currently running / started since launch
+        self._lock = threading.Lock()
+        self.processes = 0
+        self.spawned = 0
+
+    def _command(self, length_scale: float, noise_scale: float, noise_w: float) -> list:
+        return [
+            self.piper_exe,
+            "--model", self.model_path,
+            "--config", self.config_path,
+            "--length_scale", str(length_scale),
+            "--noise_scale", str(noise_scale),
+            "--noise_w", str(noise_w)
+        ]
+
+    def _spawn(self, cmd: list) -> subprocess.Popen:
+        proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=False
+        )
+        with self._lock:
+            self.processes += 1
+            self.spawned += 1
+        return proc
+
+    def _reaped(self):
+        with self._lock:
+            self.processes -= 1
+
+    def _capture_raw(
+        self,
+        text: str,
+        length_scale: float,
+        noise_scale: float,
+        noise_w: float,
+        header_room: int = 0
+    ) -> bytearray:
+        """Run piper with --output_raw and collect its stdout.
+
+        Returns a buffer holding ``header_room`` reserved bytes followed by
+        the 16-bit mono PCM, so a WAV header can be written in place.
+        """
+        cmd = self._command(length_scale, noise_scale, noise_w) + ["--output_raw"]
+        proc = self._spawn(cmd)
+
+        # Drain stderr concurrently so piper's logging can never fill the pipe and stall stdout
+        stderr_chunks = []
+        stderr_reader = threading.Thread(
+            target=lambda: stderr_chunks.append(proc.stderr.read()), daemon=True
+        )
+        stderr_reader.start()
+
+        # Feed stdin concurrently too: piper speaks line by line and writes audio
+        # as it goes, so long multi-line text would fill both pipes and deadlock
+        def feed_stdin():
+            try:
+                with proc.stdin:
+                    proc.stdin.write(text.encode("utf-8"))
+            except OSError:
+                # Piper exited early; its exit code and stderr say why
+                pass
+
+        stdin_writer = threading.Thread(target=feed_stdin, daemon=True)
+        stdin_writer.start()
+
+        timed_out = threading.Event()
+
+        def kill_on_timeout():
+            timed_out.set()
+            proc.kill()
+
+        killer = None
+        if self.timeout:
+            killer = threading.Timer(self.timeout, kill_on_timeout)
+            killer.start()
+
+        try:
+            estimate = int(len(text) / CHARS_PER_SECOND * length_scale * self.sample_rate) * 2
+            buffer = bytearray(header_room + max(estimate, READ_CHUNK))
+            filled = header_room
+            while True:
+                if len(buffer) - filled < READ_CHUNK:
+                    buffer.extend(bytes(len(buffer)))
+                with memoryview(buffer) as view:
+                    n = proc.stdout.readinto(view[filled:filled + READ_CHUNK])
+                if not n:
+                    break
+                filled += n
+            proc.wait()
+        finally:
+            if killer is not None:
+                killer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            self._reaped()
+            stdin_writer.join()
+            stderr_reader.join()
+            proc.stdout.close()
+            proc.stderr.close()
+
+        if timed_out.is_set():
+            raise TimeoutError(f"Piper did not finish within {self.timeout}s")
+        if proc.returncode != 0:
+            stderr = b"".join(stderr_chunks)
+            raise RuntimeError(
+                f"Piper failed (exit {proc.returncode}). Cmd: {cmd}\nError: {stderr.decode('utf-8', errors='ignore')}"
+            )
+
+        del buffer[filled:]
+        return buffer
+
     def synthesize(
         self,
         text: str,
@@ -52,26 +186,39 @@ class TTSEngine:
         noise_w: float = 0.8
     ) -> bytes:
         if not text or not text.strip():
-            text = "Hello, this is a local Piper TTS test."
-        
+            text = DEFAULT_TEXT
+
+        if self.output_mode == "file":
+            return self._synthesize_file(text, length_scale, noise_scale, noise_w)
+
+        buffer = self._capture_raw(
+            text, length_scale, noise_scale, noise_w, header_room=WAV_HEADER_SIZE
+        )
+        buffer[:WAV_HEADER_SIZE] = wav_header(self.sample_rate, len(buffer) - WAV_HEADER_SIZE)
+        return bytes(buffer)
+
+    def _synthesize_file(
+        self,
+        text: str,
+        length_scale: float,
+        noise_scale: float,
+        noise_w: float
+    ) -> bytes:
         # Create a temporary file for output
         with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
             temp_path = temp_file.name
         
         try:
-            cmd = [
-                self.piper_exe,
-                "--model", self.model_path,
-                "--config", self.config_path,
-                "--length_scale", str(length_scale),
-                "--noise_scale", str(noise_scale),
-                "--noise_w", str(noise_w),
-                "--output_file", temp_path
-            ]
-            proc = subprocess.Popen(
-                cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=False
-            )
-            stdout, stderr = proc.communicate(input=text.encode("utf-8"))
+            cmd = self._command(length_scale, noise_scale, noise_w) + ["--output_file", temp_path]
+            proc = self._spawn(cmd)
+            try:
+                stdout, stderr = proc.communicate(input=text.encode("utf-8"), timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise TimeoutError(f"Piper did not finish within {self.timeout}s")
+            finally:
+                self._reaped()
             
             if proc.returncode != 0:
                 raise RuntimeError(
@@ -88,3 +235,31 @@ class TTSEngine:
             # Clean up temporary file
             if os.path.exists(temp_path):
                 os.unlink(temp_path)
+
+    def synthesize_raw(
+        self,
+        text: str,
+        length_scale: float = 1.0,
+        noise_scale: float = 0.667,
+        noise_w: float = 0.8
+    ) -> bytes:
+        """Synthesize ``text`` to headerless 16-bit mono PCM at ``sample_rate``."""
+        if self.output_mode == "raw":
+            if not text or not text.strip():
+                text = DEFAULT_TEXT
+            return bytes(self._capture_raw(text, length_scale, noise_scale, noise_w))
+
+        wav_bytes = self.synthesize(
+            text,
+            length_scale=length_scale,
+            noise_scale=noise_scale,
+            noise_w=noise_w
+        )
+        pcm, _ = pcm_from_wav(wav_bytes)
+        return pcm
+
+    def stats(self) -> dict:
+        return {
+            "processes": self.processes,
+            "spawned": self.spawned,
+        }
@@ -0,0 +1,235 @@
+import io
+import json
+import os
+import queue
+import threading
+import time
+import wave
+from contextlib import contextmanager
+from typing import Optional
+
+from app.core.tts_engine import DEFAULT_TEXT, _abs
+from app.core.voices import EngineClosed
+
+# piper-tts runs the voice in-process through onnxruntime. It is optional:
+# without it the service falls back to the piper executable (TTSEngine).
+try:
+    from piper.voice import PiperVoice
+except ImportError:
+    PiperVoice = None
+
+PROBE_TEXT = "Ready."
+# Put in the idle queue by close() to wake requests waiting for a worker
+_CLOSED = object()
+
+
+class _Worker:
+    def __init__(self, voice):
+        self.voice = voice
+        self.uses = 0
+        self.created_at = time.monotonic()
+        self.checked_at = self.created_at
+
+
+class PiperVoicePool:
+    """Bounded pool of warm, in-process Piper voices.
+
+    Each worker owns its own onnxruntime session, so the model is loaded once
+    per worker instead of once per request. Workers are health checked before
+    use when they have been idle for ``health_interval`` seconds and are
+    recycled after ``max_uses`` syntheses or ``max_age`` seconds.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        config_path: str,
+        size: int = 2,
+        max_uses: int = 1000,
+        max_age: float = 3600.0,
+        health_interval: float = 60.0,
+        acquire_timeout: float = 30.0
+    ):
+        if PiperVoice is None:
+            raise RuntimeError(
+                "piper-tts is not installed. Run `pip install -r requirements-pool.txt` "
+                "or set TTS_ENGINE_MODE=subprocess."
+            )
+
+        self.model_path = _abs(model_path)
+        self.config_path = _abs(config_path)
+        if not os.path.isfile(self.model_path):
+            raise FileNotFoundError(f"Model file not found: {self.model_path}")
+        if not os.path.isfile(self.config_path):
+            raise FileNotFoundError(f"Config file not found: {self.config_path}")
+
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            self.sample_rate = int(json.load(f)["audio"]["sample_rate"])
+
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.health_interval = health_interval
+        self.acquire_timeout = acquire_timeout
+
+        # Idle slots hold either a warm worker or None (slot free, spawn lazily).
+        # LIFO hands out the most recently used worker, whose caches are hottest.
+        self._idle = queue.LifoQueue(maxsize=self.size)
+        self._lock = threading.Lock()
+        self._busy = 0
+        self._spawned = 0
+        self._recycled = 0
+        self._closed = False
+
+        # Pre-warm every slot so the first requests only pay inference time
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        voice = PiperVoice.load(self.model_path, config_path=self.config_path)
+        worker = _Worker(voice)
+        # The first onnxruntime run allocates buffers; do it off the request path
+        self._probe(worker)
+        with self._lock:
+            self._spawned += 1
+        return worker
+
+    def _probe(self, worker: _Worker) -> bool:
+        audio = b"".join(worker.voice.synthesize_stream_raw(PROBE_TEXT))
+        worker.checked_at = time.monotonic()
+        return len(audio) > 0
+
+    def _expired(self, worker: _Worker) -> bool:
+        age = time.monotonic() - worker.created_at
+        return worker.uses >= self.max_uses or age >= self.max_age
+
+    def _checkout(self) -> _Worker:
+        if self._closed:
+            raise EngineClosed("Piper voice pool is closed")
+        try:
+            worker = self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No Piper worker became free within {self.acquire_timeout}s"
+            )
+        if worker is _CLOSED or self._closed:
+            # Pass the wake-up on to the next waiter
+            self._give_back(_CLOSED)
+            raise EngineClosed("Piper voice pool is closed")
+
+        try:
+            if worker is not None and time.monotonic() - worker.checked_at >= self.health_interval:
+                try:
+                    healthy = self._probe(worker)
+                except Exception:
+                    healthy = False
+                if not healthy:
+                    worker = None
+                    with self._lock:
+                        self._recycled += 1
+            if worker is None:
+                worker = self._spawn()
+        except Exception:
+            # Give the slot back so a failed spawn does not shrink the pool
+            self._give_back(None)
+            raise
+
+        with self._lock:
+            self._busy += 1
+        return worker
+
+    def _checkin(self, worker: Optional[_Worker]):
+        with self._lock:
+            self._busy -= 1
+            if worker is not None and (self._closed or self._expired(worker)):
+                worker = None
+                self._recycled += 1
+        self._give_back(worker)
+
+    def _give_back(self, worker):
+        if self._closed:
+            # Workers of a closed pool are dropped; the slot wakes a waiter instead
+            worker = _CLOSED
+        try:
+            self._idle.put_nowait(worker)
+        except queue.Full:
+            pass
+
+    @contextmanager
+    def worker(self):
+        worker = self._checkout()
+        try:
+            yield worker.voice
+        except Exception:
+            # A failing session may be in a bad state; replace it
+            self._checkin(None)
+            raise
+        else:
+            worker.uses += 1
+            self._checkin(worker)
+
+    def synthesize(
+        self,
+        text: str,
+        length_scale: float = 1.0,
+        noise_scale: float = 0.667,
+        noise_w: float = 0.8
+    ) -> bytes:
+        if not text or not text.strip():
+            text = DEFAULT_TEXT
+
+        buffer = io.BytesIO()
+        with self.worker() as voice:
+            with wave.open(buffer, "wb") as wav_file:
+                voice.synthesize(
+                    text,
+                    wav_file,
+                    length_scale=length_scale,
+                    noise_scale=noise_scale,
+                    noise_w=noise_w
+                )
+        return buffer.getvalue()
+
+    def synthesize_raw(
+        self,
+        text: str,
+        length_scale: float = 1.0,
+        noise_scale: float = 0.667,
+        noise_w: float = 0.8
+    ) -> bytes:
+        """Synthesize ``text`` to headerless 16-bit mono PCM at ``sample_rate``."""
+        if not text or not text.strip():
+            text = DEFAULT_TEXT
+
+        with self.worker() as voice:
+            return b"".join(voice.synthesize_stream_raw(
+                text,
+                length_scale=length_scale,
+                noise_scale=noise_scale,
+                noise_w=noise_w
+            ))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.size,
+                "busy": self._busy,
+                "idle": self.size - self._busy,
+                "spawned": self._spawned,
+                "recycled": self._recycled,
+            }
+
+    def close(self):
+        """Drop idle workers now and busy ones when they are checked in.
+
+        Requests still waiting for a worker fail at once with EngineClosed
+        rather than waiting out ``acquire_timeout``.
+        """
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        self._give_back(_CLOSED)
@@ -0,0 +1,204 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from app.core.audio_cache import model_fingerprint
+
+class UnknownVoice(KeyError):
+    pass
+
+class EngineClosed(RuntimeError):
+    """Raised by an engine asked to synthesize after the registry unloaded it."""
+
+class Voice:
+    """A discovered ``<name>.onnx`` + ``<name>.onnx.json`` pair."""
+
+    def __init__(self, model_path: str, config_path: str):
+        self.model_path = model_path
+        self.config_path = config_path
+        self.name = os.path.basename(model_path)[:-len(".onnx")]
+        self.size_bytes = os.path.getsize(model_path)
+        with open(config_path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        self.sample_rate = int(config["audio"]["sample_rate"])
+        self.language = config.get("language", {}).get("code")
+        self._hash = None
+        self._hash_lock = threading.Lock()
+
+    @property
+    def model_hash(self) -> str:
+        # Hashing a large model takes a while, so it is computed once and kept
+        with self._hash_lock:
+            if self._hash is None:
+                self._hash = model_fingerprint(self.model_path)
+            return self._hash
+
+    def info(self) -> dict:
+        return {
+            "name": self.name,
+            "sample_rate": self.sample_rate,
+            "language": self.language,
+            "size_bytes": self.size_bytes,
+        }
+
+def discover_voices(directory: str) -> Dict[str, Voice]:
+    voices = {}
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if not name.endswith(".onnx"):
+                continue
+            model_path = os.path.join(root, name)
+            config_path = model_path + ".json"
+            if os.path.isfile(config_path):
+                voice = Voice(model_path, config_path)
+                voices.setdefault(voice.name, voice)
+    return voices
+
+class _VoiceHandle:
+    """Engine-shaped view of one voice; the model is loaded on first synthesis."""
+
+    def __init__(self, registry: "VoiceRegistry", voice: Voice):
+        self._registry = registry
+        self.voice = voice
+        self.sample_rate = voice.sample_rate
+
+    def synthesize(self, text: str, **kwargs) -> bytes:
+        return self._run("synthesize", text, **kwargs)
+
+    def synthesize_raw(self, text: str, **kwargs) -> bytes:
+        return self._run("synthesize_raw", text, **kwargs)
+
+    def _run(self, method: str, text: str, **kwargs) -> bytes:
+        engine = self._registry.loaded(self.voice)
+        try:
+            return getattr(engine, method)(text, **kwargs)
+        except EngineClosed:
+            # Evicted between lookup and use: load the voice again, once
+            return getattr(self._registry.loaded(self.voice), method)(text, **kwargs)
+
+class VoiceRegistry:
+    """Voices found under a directory, with the most recently used ones kept loaded.
+
+    ``factory`` builds an engine (TTSEngine, PiperVoicePool, ...) for a voice
+    and ``cost`` estimates the memory it keeps resident. Loaded engines are
+    kept in LRU order; when their total cost exceeds ``memory_bytes`` the
+    least recently used ones are closed and loaded again on their next use.
+    The voice being loaded is never evicted, even if it alone is over budget.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        factory: Callable[[Voice], object],
+        cost: Callable[[Voice], int],
+        memory_bytes: int,
+        default: Optional[str] = None
+    ):
+        self.directory = os.path.abspath(directory)
+        self.voices = discover_voices(self.directory)
+        if not self.voices:
+            raise FileNotFoundError(f"No .onnx voices with a .onnx.json config under {self.directory}")
+        if default is not None and default not in self.voices:
+            raise UnknownVoice(f"Default voice not found: {default}")
+        self.default = default or sorted(self.voices)[0]
+        self.memory_bytes = memory_bytes
+        self._factory = factory
+        self._cost = cost
+
+        self._lock = threading.Lock()
+        self._loaded = OrderedDict()
+        self._resident = 0
+        # One lock per voice so a slow load does not block other voices
+        self._load_locks = {name: threading.Lock() for name in self.voices}
+        self.loads = 0
+        self.evictions = 0
+        # Counters of engines already evicted, so totals never go backwards
+        self._retired_spawned = 0
+
+    def voice(self, name: Optional[str] = None) -> Voice:
+        voice = self.voices.get(name or self.default)
+        if voice is None:
+            raise UnknownVoice(f"Unknown voice: {name}")
+        return voice
+
+    def engine(self, name: Optional[str] = None) -> _VoiceHandle:
+        """Cheap handle for ``name`` (default voice if None); loading waits for first use."""
+        return _VoiceHandle(self, self.voice(name))
+
+    def _touch(self, name: str):
+        # Caller holds the lock
+        engine = self._loaded.get(name)
+        if engine is not None:
+            self._loaded.move_to_end(name)
+        return engine
+
+    def loaded(self, voice: Voice):
+        """The voice's engine, loading it (and evicting others) if needed. Blocks."""
+        with self._lock:
+            engine = self._touch(voice.name)
+        if engine is not None:
+            return engine
+
+        with self._load_locks[voice.name]:
+            with self._lock:
+                engine = self._touch(voice.name)
+            if engine is not None:
+                return engine
+            engine = self._factory(voice)
+            with self._lock:
+                self._loaded[voice.name] = engine
+                self._resident += self._cost(voice)
+                self.loads += 1
+                evicted = self._evict(keep=voice.name)
+        for old in evicted:
+            self._close(old)
+        return engine
+
+    def _evict(self, keep: str) -> list:
+        # Caller holds the lock
+        evicted = []
+        while self._resident > self.memory_bytes:
+            name = next((n for n in self._loaded if n != keep), None)
+            if name is None:
+                break
+            engine = self._loaded.pop(name)
+            self._resident -= self._cost(self.voices[name])
+            self._retired_spawned += engine.stats().get("spawned", 0)
+            self.evictions += 1
+            evicted.append(engine)
+        return evicted
+
+    @staticmethod
+    def _close(engine):
+        # Pools drop idle voices now and busy ones when their synthesis finishes
+        if hasattr(engine, "close"):
+            engine.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            engines = list(self._loaded.values())
+            totals = {"spawned": self._retired_spawned}
+            summary = {
+                "voices": len(self.voices),
+                "loaded_voices": list(self._loaded),
+                "resident_bytes": self._resident,
+                "budget_bytes": self.memory_bytes,
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
+        # Summed over loaded voices, in the shape of a single engine's stats
+        for engine in engines:
+            for key, value in engine.stats().items():
+                totals[key] = totals.get(key, 0) + value
+        totals.update(summary)
+        return totals
+
+    def close(self):
+        with self._lock:
+            engines = list(self._loaded.values())
+            self._loaded.clear()
+            self._resident = 0
+        for engine in engines:
+            self._close(engine)
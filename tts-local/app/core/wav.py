@@ -0,0 +1,33 @@
+import io
+import struct
+import wave
+from typing import Optional, Tuple
+
+# Size used for RIFF/data chunks when the total length is not known yet
+# (streamed responses). Browsers and most decoders treat it as "until EOF".
+UNKNOWN_SIZE = 0xFFFFFFFF
+
+def wav_header(
+    sample_rate: int,
+    data_size: Optional[int] = None,
+    channels: int = 1,
+    sample_width: int = 2
+) -> bytes:
+    """Build a 44-byte PCM WAV header for ``data_size`` bytes of audio."""
+    byte_rate = sample_rate * channels * sample_width
+    block_align = channels * sample_width
+    if data_size is None:
+        riff_size = data_size = UNKNOWN_SIZE
+    else:
+        riff_size = 36 + data_size
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", riff_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, byte_rate, block_align, sample_width * 8,
+        b"data", data_size
+    )
+
+def pcm_from_wav(wav_bytes: bytes) -> Tuple[bytes, int]:
+    """Return the raw PCM frames and sample rate of a WAV file."""
+    with wave.open(io.BytesIO(wav_bytes), "rb") as wav_file:
+        return wav_file.readframes(wav_file.getnframes()), wav_file.getframerate()
@@ -1,8 +1,14 @@
 import os
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes_tts import router as tts_router
+from app.api.routes_tts import (
+    router as tts_router,
+    voices as tts_voices,
+    limiter as tts_limiter,
+    record_request
+)
 
 app = FastAPI(title="Piper TTS Service (Local)")
 
@@ -17,5 +23,20 @@ app.add_middleware(
 
 app.include_router(tts_router)
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    # API routes only; static files and /metrics scrapes are not counted
+    if route is not None and route.path.startswith("/tts"):
+        record_request(route.path, request.method, response.status_code, time.perf_counter() - started)
+    return response
+
+@app.on_event("shutdown")
+def close_tts_engine():
+    tts_limiter.close()
+    tts_voices.close()
+
 # Serve the web tester from / (http://localhost:8000)
 app.mount("/", StaticFiles(directory="static", html=True), name="static")
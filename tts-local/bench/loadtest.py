@@ -0,0 +1,290 @@
+"""Load test for the TTS service.
+
+Drives /tts and /tts/stream with a sweep of concurrency levels and a mix of
+short, medium and long interviewer prompts (bench/prompts.txt), and writes
+machine-readable results so runs can be diffed between builds:
+
+    cd tts-local
+    python -m bench.loadtest --endpoint tts --endpoint stream --concurrency 1,4,8 --json run.json
+
+For every endpoint and concurrency level it reports time to first byte and
+total latency percentiles, requests and audio seconds per wall second, and
+the server's peak limiter/engine state polled from /tts/stats (running
+piper processes or busy pool voices).
+
+Requests bypass the audio cache by default (each one uses a distinct,
+inaudibly different length_scale); pass --cached to measure cache hits.
+Only the standard library is used.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+PROMPTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts.txt")
+ENDPOINTS = {"tts": "/tts", "stream": "/tts/stream"}
+WAV_HEADER_SIZE = 44
+# Upper bounds (characters) of the prompt length buckets
+BUCKETS = (("short", 80), ("medium", 200), ("long", None))
+
+def load_prompts(path: str) -> Dict[str, List[str]]:
+    buckets: Dict[str, List[str]] = {name: [] for name, _ in BUCKETS}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            for name, limit in BUCKETS:
+                if limit is None or len(line) < limit:
+                    buckets[name].append(line)
+                    break
+    return buckets
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """'short=1,medium=2,long=1' -> relative weights per bucket"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in dict(BUCKETS):
+            raise ValueError(f"Unknown prompt bucket: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+def pick_texts(buckets: Dict[str, List[str]], weights: Dict[str, float], count: int, rng: random.Random) -> List[str]:
+    names = [name for name, weight in weights.items() if weight > 0 and buckets.get(name)]
+    if not names:
+        raise ValueError("No prompts match the requested mix")
+    chosen = rng.choices(names, weights=[weights[name] for name in names], k=count)
+    return [rng.choice(buckets[name]) for name in chosen]
+
+def percentiles(values: List[float]) -> dict:
+    if not values:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+    ordered = sorted(values)
+
+    def at(pct):
+        return round(ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))] * 1000, 1)
+
+    return {"p50": at(50), "p90": at(90), "p99": at(99), "max": round(ordered[-1] * 1000, 1)}
+
+def request_audio(url: str, path: str, text: str, length_scale: float, timeout: float) -> dict:
+    """POST one synthesis request and time the first byte and the full body"""
+    target = urlparse(url)
+    conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=timeout)
+    body = json.dumps({"text": text, "length_scale": length_scale})
+    started = time.perf_counter()
+    try:
+        conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        first = resp.read(1)
+        ttfb = time.perf_counter() - started
+        data = first + resp.read()
+        latency = time.perf_counter() - started
+        if resp.status != 200:
+            return {"status": resp.status, "ttfb": ttfb, "latency": latency, "audio_seconds": 0.0}
+
+        sample_rate = resp.getheader("X-Sample-Rate")
+        if sample_rate is None and len(data) >= WAV_HEADER_SIZE:
+            sample_rate = int.from_bytes(data[24:28], "little")
+        audio_seconds = max(0, len(data) - WAV_HEADER_SIZE) / (2.0 * int(sample_rate or 22050))
+        return {"status": 200, "ttfb": ttfb, "latency": latency, "audio_seconds": audio_seconds}
+    except Exception as e:
+        return {
+            "status": f"error:{type(e).__name__}",
+            "ttfb": None,
+            "latency": time.perf_counter() - started,
+            "audio_seconds": 0.0,
+        }
+    finally:
+        conn.close()
+
+def get_stats(url: str, timeout: float = 5.0) -> Optional[dict]:
+    target = urlparse(url)
+    conn = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=timeout)
+    try:
+        conn.request("GET", "/tts/stats")
+        resp = conn.getresponse()
+        payload = resp.read()
+        return json.loads(payload) if resp.status == 200 else None
+    except Exception:
+        return None
+    finally:
+        conn.close()
+
+class StatsPoller:
+    """Polls /tts/stats in the background and keeps the peaks seen"""
+
+    def __init__(self, url: str, interval: float = 0.25):
+        self.url = url
+        self.interval = interval
+        self.first = get_stats(url)
+        self.last = self.first
+        self.peaks: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _observe(self, stats: dict):
+        limiter = stats.get("limiter", {})
+        engine = stats.get("engine", {})
+        observed = {
+            "active": limiter.get("active", 0),
+            "waiting": limiter.get("waiting", 0),
+            # Piper processes (subprocess mode) or busy voices (pool mode)
+            "engine_busy": engine.get("processes", engine.get("busy", 0)),
+        }
+        for name, value in observed.items():
+            self.peaks[name] = max(self.peaks.get(name, 0), value)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            stats = get_stats(self.url)
+            if stats is not None:
+                self.last = stats
+                self._observe(stats)
+
+    def __enter__(self):
+        if self.first is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        stats = get_stats(self.url)
+        if stats is not None:
+            self.last = stats
+
+    def summary(self) -> Optional[dict]:
+        if self.first is None:
+            return None
+
+        def delta(section, name):
+            return self.last.get(section, {}).get(name, 0) - self.first.get(section, {}).get(name, 0)
+
+        return {
+            "engine_mode": self.last.get("engine_mode"),
+            "peak_active": self.peaks.get("active", 0),
+            "peak_waiting": self.peaks.get("waiting", 0),
+            "peak_engine_busy": self.peaks.get("engine_busy", 0),
+            "pool_size": self.last.get("engine", {}).get("size"),
+            "processes_spawned": delta("engine", "spawned"),
+            "rejected": delta("limiter", "rejected"),
+            "timed_out": delta("limiter", "timed_out"),
+        }
+
+def run_level(args, endpoint: str, concurrency: int, texts: List[str], seq_start: int) -> dict:
+    path = ENDPOINTS[endpoint]
+
+    def one(i):
+        # A distinct length_scale per request keeps the audio cache out of the measurement
+        length_scale = 1.0 if args.cached else 1.0 + (seq_start + i + 1) * 1e-9
+        result = request_audio(args.url, path, texts[i], length_scale, args.timeout)
+        result["chars"] = len(texts[i])
+        return result
+
+    with StatsPoller(args.url) as poller:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one, range(len(texts))))
+        wall = time.perf_counter() - started
+
+    ok = [r for r in results if r["status"] == 200]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if r["status"] != 200:
+            errors[str(r["status"])] = errors.get(str(r["status"]), 0) + 1
+    audio = sum(r["audio_seconds"] for r in ok)
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(results),
+        "ok": len(ok),
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "requests_per_s": round(len(ok) / wall, 3) if wall else None,
+        "audio_s": round(audio, 3),
+        "audio_s_per_wall_s": round(audio / wall, 3) if wall else None,
+        "chars_per_s": round(sum(r["chars"] for r in ok) / wall, 1) if wall else None,
+        "ttfb_ms": percentiles([r["ttfb"] for r in ok]),
+        "latency_ms": percentiles([r["latency"] for r in ok]),
+        "server": poller.summary(),
+    }
+
+def print_table(runs: List[dict]):
+    header = (
+        f"{'endpoint':<9}{'conc':>5}{'ok':>6}{'err':>5}{'ttfb p50':>10}{'ttfb p99':>10}"
+        f"{'lat p50':>9}{'lat p99':>9}{'audio/s':>9}{'busy':>6}"
+    )
+    print(header)
+    print("-" * len(header))
+    for run in runs:
+        server = run["server"] or {}
+        print(
+            f"{run['endpoint']:<9}{run['concurrency']:>5}{run['ok']:>6}{sum(run['errors'].values()):>5}"
+            f"{run['ttfb_ms']['p50'] or 0:>10.1f}{run['ttfb_ms']['p99'] or 0:>10.1f}"
+            f"{run['latency_ms']['p50'] or 0:>9.1f}{run['latency_ms']['p99'] or 0:>9.1f}"
+            f"{run['audio_s_per_wall_s'] or 0:>9.2f}{server.get('peak_engine_busy', '-'):>6}"
+        )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the TTS service")
+    parser.add_argument("--url", default="http://localhost:8000", help="TTS service base URL")
+    parser.add_argument(
+        "--endpoint", action="append", choices=sorted(ENDPOINTS), dest="endpoints",
+        help="endpoint to test (repeatable, default: tts)")
+    parser.add_argument(
+        "--concurrency", default="1,2,4", help="comma-separated concurrency levels to sweep")
+    parser.add_argument("--requests", type=int, default=20, help="requests per endpoint and level")
+    parser.add_argument(
+        "--mix", default="short=1,medium=2,long=1", help="relative weights of prompt length buckets")
+    parser.add_argument("--prompts", default=PROMPTS_PATH, help="prompt file, one line per prompt")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for prompt selection")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-request timeout in seconds")
+    parser.add_argument("--cached", action="store_true", help="let requests hit the audio cache")
+    parser.add_argument("--json", dest="json_path", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    endpoints = args.endpoints or ["tts"]
+    levels = [int(level) for level in args.concurrency.split(",")]
+    buckets = load_prompts(args.prompts)
+    rng = random.Random(args.seed)
+
+    started = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    runs = []
+    # Random start so repeated invocations do not hit each other's cache entries
+    seq = random.SystemRandom().randrange(10 ** 6)
+    for endpoint in endpoints:
+        for concurrency in levels:
+            texts = pick_texts(buckets, parse_mix(args.mix), args.requests, rng)
+            runs.append(run_level(args, endpoint, concurrency, texts, seq))
+            seq += len(texts)
+
+    print_table(runs)
+    if args.json_path:
+        result = {
+            "meta": {
+                "url": args.url,
+                "endpoints": endpoints,
+                "concurrency": levels,
+                "requests": args.requests,
+                "mix": parse_mix(args.mix),
+                "prompt_counts": {name: len(texts) for name, texts in buckets.items()},
+                "seed": args.seed,
+                "cached": args.cached,
+                "started": started,
+            },
+            "runs": runs,
+        }
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import time
+import unittest
+
+from app.core.audio_cache import AudioCache, cache_key
+
+class CacheKeyTest(unittest.TestCase):
+    def test_depends_on_every_input(self):
+        base = cache_key("Hello there.", "abc", 1.0, 0.667, 0.8)
+        self.assertEqual(base, cache_key("Hello there.", "abc", 1, 0.667, 0.8))
+        for changed in (
+            cache_key("Hello there!", "abc", 1.0, 0.667, 0.8),
+            cache_key("Hello there.", "abd", 1.0, 0.667, 0.8),
+            cache_key("Hello there.", "abc", 1.1, 0.667, 0.8),
+            cache_key("Hello there.", "abc", 1.0, 0.5, 0.8),
+            cache_key("Hello there.", "abc", 1.0, 0.667, 0.5),
+        ):
+            self.assertNotEqual(base, changed)
+
+class MemoryTierTest(unittest.TestCase):
+    def test_least_recently_used_is_evicted(self):
+        cache = AudioCache(memory_bytes=30)
+        cache.put("a", b"x" * 10)
+        cache.put("b", b"x" * 10)
+        cache.put("c", b"x" * 10)
+        # Touch "a" so "b" is the oldest
+        self.assertIsNotNone(cache.get("a"))
+        cache.put("d", b"x" * 10)
+        self.assertIsNone(cache.get("b"))
+        for key in ("a", "c", "d"):
+            self.assertIsNotNone(cache.get(key))
+        self.assertEqual(cache.stats()["memory_bytes"], 30)
+
+    def test_oversized_entries_are_not_kept_in_memory(self):
+        cache = AudioCache(memory_bytes=10)
+        cache.put("big", b"x" * 11)
+        self.assertIsNone(cache.get("big"))
+        self.assertEqual(cache.stats()["memory_entries"], 0)
+
+    def test_replacing_a_key_keeps_accounting_right(self):
+        cache = AudioCache(memory_bytes=100)
+        cache.put("a", b"x" * 40)
+        cache.put("a", b"y" * 20)
+        self.assertEqual(cache.get("a"), b"y" * 20)
+        self.assertEqual(cache.stats()["memory_bytes"], 20)
+
+    def test_hit_ratio(self):
+        cache = AudioCache()
+        cache.put("a", b"data")
+        cache.get("a")
+        cache.get("missing")
+        stats = cache.stats()
+        self.assertEqual((stats["hits_memory"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_ratio"], 0.5)
+
+    def test_fallback_lookups_only_count_hits(self):
+        cache = AudioCache()
+        self.assertIsNone(cache.get("a.ogg", record_miss=False))
+        self.assertEqual(cache.stats()["misses"], 0)
+        cache.put("a.ogg", b"data")
+        cache.get("a.ogg", record_miss=False)
+        self.assertEqual(cache.stats()["hits_memory"], 1)
+
+class DiskTierTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.dir = self._dir.name
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_survives_a_new_instance(self):
+        AudioCache(memory_bytes=0, disk_dir=self.dir).put("abcdef", b"audio")
+        cache = AudioCache(memory_bytes=1024, disk_dir=self.dir)
+        self.assertIn("abcdef", cache)
+        self.assertEqual(cache.get("abcdef"), b"audio")
+        self.assertEqual(cache.stats()["hits_disk"], 1)
+        self.assertEqual(cache.stats()["disk_bytes"], 5)
+        # Promoted to memory by the disk hit
+        cache.get("abcdef")
+        self.assertEqual(cache.stats()["hits_memory"], 1)
+
+    def test_variants_are_stored_next_to_the_wav(self):
+        cache = AudioCache(memory_bytes=0, disk_dir=self.dir)
+        cache.put("abcdef", b"wav")
+        cache.put("abcdef.ogg", b"ogg")
+        self.assertEqual(sorted(os.listdir(os.path.join(self.dir, "ab"))), ["abcdef.ogg", "abcdef.wav"])
+        self.assertEqual(cache.get("abcdef.ogg"), b"ogg")
+        # Both count towards the disk budget after a restart
+        self.assertEqual(AudioCache(memory_bytes=0, disk_dir=self.dir).stats()["disk_bytes"], 6)
+
+    def test_oldest_files_are_evicted_over_budget(self):
+        cache = AudioCache(memory_bytes=0, disk_dir=self.dir, disk_bytes=100)
+        for index, key in enumerate(("k1", "k2", "k3", "k4")):
+            cache.put(key, b"x" * 30)
+            # Distinct mtimes, oldest first
+            path = os.path.join(self.dir, key[:2], key + ".wav")
+            os.utime(path, (time.time() - 100 + index, time.time() - 100 + index))
+        cache.put("k5", b"x" * 30)
+        # Trimmed to 90% of the budget, least recently used first
+        self.assertNotIn("k1", cache)
+        self.assertNotIn("k2", cache)
+        for key in ("k3", "k4", "k5"):
+            self.assertIn(key, cache)
+        self.assertEqual(cache.stats()["disk_bytes"], 90)
+
+    def test_unfinished_writes_are_ignored(self):
+        os.makedirs(os.path.join(self.dir, "ab"))
+        with open(os.path.join(self.dir, "ab", "abcdef.wav.1.2.tmp"), "wb") as f:
+            f.write(b"partial")
+        cache = AudioCache(disk_dir=self.dir)
+        self.assertEqual(cache.stats()["disk_bytes"], 0)
+        self.assertNotIn("abcdef", cache)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import io
+import unittest
+
+import numpy as np
+
+from app.core import encoding
+from app.core.encoding import AVAILABLE, StreamEncoder, _Upsampler, negotiate
+
+class NegotiateTest(unittest.TestCase):
+    def test_defaults_to_wav(self):
+        self.assertEqual(negotiate(None), "wav")
+        self.assertEqual(negotiate("*/*"), "wav")
+        self.assertEqual(negotiate("application/json"), "wav")
+
+    @unittest.skipUnless("ogg" in AVAILABLE and "mp3" in AVAILABLE, "libsndfile without Opus/MP3")
+    def test_highest_quality_wins(self):
+        self.assertEqual(negotiate("audio/mpeg"), "mp3")
+        self.assertEqual(negotiate("audio/ogg, audio/mpeg;q=0.5"), "ogg")
+        self.assertEqual(negotiate("audio/wav;q=0.1, audio/opus"), "ogg")
+        # Equal quality: the first listed
+        self.assertEqual(negotiate("audio/mpeg, audio/ogg"), "mp3")
+        self.assertEqual(negotiate("audio/ogg;q=0, audio/mpeg;q=0.2"), "mp3")
+
+class UpsamplerTest(unittest.TestCase):
+    def test_chunk_boundaries_do_not_matter(self):
+        t = np.arange(22050) / 22050.0
+        samples = (np.sin(2 * np.pi * 300 * t) * 10000).astype(np.int16)
+        whole = _Upsampler(22050, 24000)(samples)
+        upsampler = _Upsampler(22050, 24000)
+        split = np.concatenate([upsampler(samples[i:i + 997]) for i in range(0, len(samples), 997)])
+        self.assertAlmostEqual(len(whole), 24000, delta=1)
+        np.testing.assert_array_equal(whole, split)
+
+@unittest.skipUnless(encoding.soundfile is not None, "soundfile is not installed")
+class StreamEncoderTest(unittest.TestCase):
+    def roundtrip(self, fmt, rate):
+        t = np.arange(rate * 2) / float(rate)
+        pcm = (np.sin(2 * np.pi * 440 * t) * 8000).astype("<i2").tobytes()
+        encoder = StreamEncoder(fmt, rate)
+        step = rate // 5 * 2
+        parts = [encoder.encode(pcm[i:i + step]) for i in range(0, len(pcm), step)]
+        parts.append(encoder.finish())
+        data, decoded_rate = encoding.soundfile.read(io.BytesIO(b"".join(parts)))
+        return parts, len(data) / float(decoded_rate)
+
+    @unittest.skipUnless("ogg" in AVAILABLE, "libsndfile without Opus")
+    def test_opus_at_piper_rates(self):
+        for rate in (16000, 22050):
+            _, seconds = self.roundtrip("ogg", rate)
+            self.assertAlmostEqual(seconds, 2.0, delta=0.05)
+
+    @unittest.skipUnless("mp3" in AVAILABLE, "libsndfile without MP3")
+    def test_mp3_streams_and_decodes_in_full(self):
+        parts, seconds = self.roundtrip("mp3", 22050)
+        # Bytes come out while encoding, not only at the end
+        self.assertTrue(all(parts[:-1]))
+        # Without the Xing frame a decoder still finds every frame
+        self.assertAlmostEqual(seconds, 2.0, delta=0.1)
+
+    def test_wav_is_not_a_stream_format(self):
+        with self.assertRaises(ValueError):
+            StreamEncoder("wav", 16000)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from app.core.limiter import Overloaded, SynthesisLimiter, SynthesisTimeout
+
+class SynthesisLimiterTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.limiter = SynthesisLimiter(max_concurrency=1, max_queue=1, timeout=1.0, retry_after=1)
+
+    def tearDown(self):
+        self.limiter.close()
+
+    async def assert_slot_free(self):
+        await asyncio.wait_for(self.limiter.acquire(), 0.5)
+        self.limiter.release()
+
+    async def test_concurrency_is_capped(self):
+        running = []
+        peak = []
+
+        def work():
+            running.append(1)
+            peak.append(len(running))
+            time.sleep(0.02)
+            running.pop()
+
+        await asyncio.gather(*(self.limiter.run(work) for _ in range(2)))
+        self.assertEqual(max(peak), 1)
+        self.assertEqual(self.limiter.active, 0)
+
+    async def test_full_queue_is_rejected(self):
+        await self.limiter.acquire()
+        waiter = asyncio.ensure_future(self.limiter.acquire())
+        await asyncio.sleep(0)
+        with self.assertRaises(Overloaded):
+            await self.limiter.acquire()
+        self.assertEqual(self.limiter.rejected, 1)
+        self.limiter.release()
+        await waiter
+        self.limiter.release()
+
+    async def test_wait_timeout_returns_no_slot(self):
+        await self.limiter.acquire()
+        with self.assertRaises(Overloaded):
+            await self.limiter.acquire(timeout=0.01)
+        self.limiter.release()
+        await self.assert_slot_free()
+        self.assertEqual(self.limiter.waiting, 0)
+
+    async def test_slot_granted_to_a_cancelled_waiter_is_not_lost(self):
+        await self.limiter.acquire()
+        waiter = asyncio.ensure_future(self.limiter.acquire())
+        await asyncio.sleep(0)
+        # The slot is handed to the waiter, which is cancelled before it resumes
+        self.limiter.release()
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+        else:
+            # The grant won the race; the caller owns the slot
+            self.limiter.release()
+        await asyncio.sleep(0)
+        await self.assert_slot_free()
+
+    async def test_synthesis_timeout_keeps_the_slot_until_the_thread_ends(self):
+        self.limiter.timeout = 0.05
+        done = threading.Event()
+        with self.assertRaises(SynthesisTimeout):
+            await self.limiter.run(done.wait, 1.0)
+        self.assertEqual(self.limiter.active, 1)
+        done.set()
+        for _ in range(100):
+            if not self.limiter.active:
+                break
+            await asyncio.sleep(0.01)
+        self.assertEqual(self.limiter.active, 0)
+        self.limiter.timeout = 1.0
+        await self.assert_slot_free()
+
+if __name__ == "__main__":
+    unittest.main()
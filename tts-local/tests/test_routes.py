@@ -0,0 +1,180 @@
+import asyncio
+import importlib
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core import tts_engine
+from app.core.audio_cache import AudioCache
+from app.core.encoding import AVAILABLE
+from app.core.limiter import Overloaded, SynthesisLimiter
+from app.core.wav import wav_header
+
+VOICE = "en_US-test-low"
+RATE = 22050
+TEXT = "This is the first sentence here. And this is the second one. Finally, the third sentence."
+
+class FakeEngine:
+    """Stands in for piper.exe: one sample per character, ``delay`` seconds per call"""
+
+    delay = 0.0
+
+    def __init__(self, model_path, config_path, **kwargs):
+        with open(config_path, "r", encoding="utf-8") as f:
+            self.sample_rate = int(json.load(f)["audio"]["sample_rate"])
+
+    def synthesize_raw(self, text, **kwargs):
+        time.sleep(self.delay)
+        if "fail" in text:
+            raise RuntimeError("piper crashed")
+        return b"\x10\x00" * len(text)
+
+    def synthesize(self, text, **kwargs):
+        pcm = self.synthesize_raw(text, **kwargs)
+        return wav_header(self.sample_rate, len(pcm)) + pcm
+
+    def stats(self):
+        return {"processes": 0, "spawned": 0}
+
+    def close(self):
+        pass
+
+_voices_dir = tempfile.TemporaryDirectory()
+routes = None
+
+def setUpModule():
+    global routes
+    with open(os.path.join(_voices_dir.name, VOICE + ".onnx"), "wb") as f:
+        f.write(b"model")
+    with open(os.path.join(_voices_dir.name, VOICE + ".onnx.json"), "w") as f:
+        json.dump({"audio": {"sample_rate": RATE}}, f)
+    env = {
+        "TTS_VOICES_DIR": _voices_dir.name,
+        "TTS_DEFAULT_VOICE": VOICE,
+        "TTS_ENGINE_MODE": "subprocess",
+        "TTS_CACHE_DIR": "",
+    }
+    # The routes module loads its default voice on import
+    with mock.patch.dict(os.environ, env), mock.patch.object(tts_engine, "TTSEngine", FakeEngine):
+        routes = importlib.import_module("app.api.routes_tts")
+
+def tearDownModule():
+    _voices_dir.cleanup()
+
+def request(path, accept=None):
+    headers = [(b"accept", accept.encode())] if accept else []
+    return Request({"type": "http", "method": "POST", "path": path, "headers": headers, "query_string": b""})
+
+class RouteTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        # Fresh per test: asyncio primitives are bound to the test's event loop
+        self.limiter = SynthesisLimiter(max_concurrency=1, max_queue=0, timeout=5.0, retry_after=1)
+        self.cache = AudioCache(memory_bytes=1 << 20)
+        patches = [
+            mock.patch.object(routes, "limiter", self.limiter),
+            mock.patch.object(routes, "cache", self.cache),
+            mock.patch.object(routes, "_batch_semaphore", None),
+            mock.patch.object(routes, "BATCH_CONCURRENCY", 1),
+            mock.patch.dict(routes._inflight, clear=True),
+            mock.patch.dict(routes._failed, clear=True),
+            mock.patch.object(FakeEngine, "delay", 0.0),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.limiter.close)
+
+class StreamRouteTest(RouteTest):
+    async def test_stream_survives_a_full_queue(self):
+        FakeEngine.delay = 0.02
+        response = await routes.tts_stream(routes.TTSStreamIn(text=TEXT, format="pcm"), request("/tts/stream"))
+        body = response.body_iterator
+        chunks = [await body.__anext__()]
+        # The stream's next sentences fill the only slot and the queue
+        with self.assertRaises(Overloaded):
+            await self.limiter.acquire()
+        chunks += [chunk async for chunk in body]
+        await response.background()
+        silence = int(RATE * 0.2) * 2 * 2
+        self.assertEqual(len(b"".join(chunks)), (len(TEXT) - 2) * 2 + silence)
+
+    async def test_overloaded_first_sentence_is_503(self):
+        await self.limiter.acquire()
+        with self.assertRaises(HTTPException) as raised:
+            await routes.tts_stream(routes.TTSStreamIn(text=TEXT), request("/tts/stream"))
+        self.assertEqual(raised.exception.status_code, 503)
+        self.limiter.release()
+
+class BatchRouteTest(RouteTest):
+    async def batch(self, *texts):
+        return [item["id"] for item in (await routes.tts_batch(routes.TTSBatchIn(texts=list(texts))))["items"]]
+
+    async def test_rendered_audio_is_served_by_id(self):
+        (audio_id,) = await self.batch("Tell me about yourself.")
+        response = await routes.tts_audio(audio_id, request("/tts/audio"))
+        self.assertEqual(response.media_type, "audio/wav")
+        self.assertEqual(len(response.body), 44 + 2 * len("Tell me about yourself."))
+        self.assertEqual(await self.batch("Tell me about yourself."), [audio_id])
+        self.assertEqual(routes._inflight, {})
+
+    async def test_pending_renders_are_capped(self):
+        with mock.patch.object(routes, "MAX_INFLIGHT", 2):
+            FakeEngine.delay = 0.05
+            await self.batch("First question?", "Second question?")
+            with self.assertRaises(HTTPException) as raised:
+                await self.batch("Third question?")
+            self.assertEqual(raised.exception.status_code, 503)
+            self.assertIn("Retry-After", raised.exception.headers)
+            self.assertEqual(len(routes._inflight), 2)
+            # Texts already pending take no new room
+            await self.batch("First question?")
+            await asyncio.gather(*routes._inflight.values())
+
+    async def test_failed_render_is_reported(self):
+        (audio_id,) = await self.batch("This one will fail.")
+        with self.assertRaises(HTTPException) as raised:
+            await routes.tts_audio(audio_id, request("/tts/audio"))
+        self.assertEqual(raised.exception.status_code, 500)
+        self.assertIn("piper crashed", raised.exception.detail)
+        # Still reported once the render is no longer in flight
+        self.assertNotIn(audio_id, routes._inflight)
+        with self.assertRaises(HTTPException) as raised:
+            await routes.tts_audio(audio_id, request("/tts/audio"))
+        self.assertEqual(raised.exception.status_code, 500)
+
+    async def test_unknown_id_is_404(self):
+        with self.assertRaises(HTTPException) as raised:
+            await routes.tts_audio("0" * 64, request("/tts/audio"))
+        self.assertEqual(raised.exception.status_code, 404)
+
+class FormatRouteTest(RouteTest):
+    async def test_sample_rate_header_only_for_raw_formats(self):
+        for fmt in ("wav", "pcm", "ogg", "mp3"):
+            if fmt not in AVAILABLE and fmt != "pcm":
+                continue
+            inp = routes.TTSStreamIn(text=f"Tell me about yourself, in {fmt}.", format=fmt)
+            response = await routes.tts_stream(inp, request("/tts/stream"))
+            async for _ in response.body_iterator:
+                pass
+            await response.background()
+            expected = str(RATE) if fmt in ("wav", "pcm") else None
+            self.assertEqual(response.headers.get("x-sample-rate"), expected, fmt)
+
+    @unittest.skipUnless("ogg" in AVAILABLE, "libsndfile without Opus")
+    async def test_first_encode_counts_one_miss(self):
+        inp = routes.TTSIn(text="Why do you want this role?", format="ogg")
+        first = await routes.tts(inp, request("/tts"))
+        self.assertEqual(first.media_type, "audio/ogg; codecs=opus")
+        self.assertEqual((self.cache.misses, self.cache.hits_memory), (1, 0))
+        second = await routes.tts(inp, request("/tts"))
+        self.assertEqual(second.body, first.body)
+        self.assertEqual((self.cache.misses, self.cache.hits_memory), (1, 1))
+
+if __name__ == "__main__":
+    unittest.main()
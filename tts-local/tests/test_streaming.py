@@ -0,0 +1,91 @@
+import asyncio
+import time
+import unittest
+
+from app.core.limiter import Overloaded, SynthesisLimiter
+from app.core.streaming import stream_sentences
+
+TEXT = "This is the first sentence here. And this is the second one. Finally, the third sentence."
+
+class FakeEngine:
+    sample_rate = 100
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+
+    def synthesize_raw(self, text, **kwargs):
+        time.sleep(self.delay)
+        return text.encode()
+
+class StreamSentencesTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.limiter = SynthesisLimiter(max_concurrency=2, max_queue=4, timeout=5.0)
+
+    def tearDown(self):
+        self.limiter.close()
+
+    async def test_sentences_arrive_in_order_with_silence_between(self):
+        class Uneven(FakeEngine):
+            def synthesize_raw(self, text, **kwargs):
+                # Earlier sentences finish last; the order must not follow
+                time.sleep(0.03 if text.startswith("This") else 0.0)
+                return text.encode()
+
+        chunks = [pcm async for pcm in stream_sentences(self.limiter, Uneven(), TEXT, sentence_silence=0.1)]
+        silence = b"\x00\x00" * 10
+        self.assertEqual(chunks, [
+            b"This is the first sentence here.", silence,
+            b"And this is the second one.", silence,
+            b"Finally, the third sentence."
+        ])
+
+    async def test_text_without_sentences_is_synthesized_whole(self):
+        chunks = [pcm async for pcm in stream_sentences(self.limiter, FakeEngine(), "  ")]
+        self.assertEqual(chunks, [b"  "])
+
+    async def test_failure_stops_the_stream(self):
+        class Failing(FakeEngine):
+            def synthesize_raw(self, text, **kwargs):
+                if text.startswith("And"):
+                    raise RuntimeError("piper crashed")
+                return text.encode()
+
+        received = []
+        with self.assertRaises(RuntimeError):
+            async for pcm in stream_sentences(self.limiter, Failing(), TEXT, sentence_silence=0):
+                received.append(pcm)
+        self.assertEqual(received, [b"This is the first sentence here."])
+
+class StreamAdmissionTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.limiter = SynthesisLimiter(max_concurrency=1, max_queue=0, timeout=5.0, retry_after=1)
+
+    def tearDown(self):
+        self.limiter.close()
+
+    async def test_full_queue_mid_stream_does_not_truncate(self):
+        chunks = stream_sentences(self.limiter, FakeEngine(delay=0.01), TEXT, lookahead=1, sentence_silence=0)
+        received = [await chunks.__anext__()]
+        # Another request takes the only slot; nothing else is admitted now
+        await self.limiter.acquire()
+        with self.assertRaises(Overloaded):
+            await self.limiter.acquire()
+        asyncio.get_running_loop().call_later(0.05, self.limiter.release)
+        async for pcm in chunks:
+            received.append(pcm)
+        self.assertEqual(b" ".join(received).decode(), TEXT)
+        self.assertEqual((self.limiter.active, self.limiter.waiting), (0, 0))
+
+    async def test_first_sentence_is_shed_when_full(self):
+        await self.limiter.acquire()
+        chunks = stream_sentences(self.limiter, FakeEngine(), TEXT, sentence_silence=0)
+        with self.assertRaises(Overloaded):
+            await chunks.__anext__()
+        await chunks.aclose()
+        await asyncio.sleep(0)
+        # Sentences submitted ahead stopped waiting
+        self.assertEqual(self.limiter.waiting, 0)
+        self.limiter.release()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from app.core.text import split_sentences
+
+class SplitSentencesTest(unittest.TestCase):
+    def test_splits_on_sentence_ends(self):
+        text = "Tell me about yourself. What are your strengths? Why do you want this role!"
+        self.assertEqual(split_sentences(text), [
+            "Tell me about yourself.", "What are your strengths?", "Why do you want this role!"
+        ])
+
+    def test_short_fragments_join_the_next_sentence(self):
+        self.assertEqual(
+            split_sentences("Great! Thanks. Now tell me about a hard problem you solved."),
+            ["Great! Thanks. Now tell me about a hard problem you solved."]
+        )
+
+    def test_short_tail_joins_the_previous_sentence(self):
+        self.assertEqual(
+            split_sentences("Describe your last project in detail. Thanks!"),
+            ["Describe your last project in detail. Thanks!"]
+        )
+
+    def test_text_without_punctuation_is_one_sentence(self):
+        self.assertEqual(split_sentences("  just keep talking  "), ["just keep talking"])
+
+    def test_blank_text_has_no_sentences(self):
+        self.assertEqual(split_sentences("   "), [])
+
+if __name__ == "__main__":
+    unittest.main()
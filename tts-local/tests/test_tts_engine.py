@@ -0,0 +1,49 @@
+import json
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+from app.core.tts_engine import TTSEngine
+
+# Behaves like piper --output_raw: reads text line by line and writes each
+# line's audio before reading the next one
+FAKE_PIPER = """#!{python}
+import sys
+for line in sys.stdin.buffer:
+    sys.stdout.buffer.write(b"\\x01\\x00" * 100 * len(line.strip()))
+    sys.stdout.buffer.flush()
+"""
+
+@unittest.skipUnless(os.name == "posix", "fake piper is a script")
+class TTSEngineTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+        self.piper = os.path.join(self._dir.name, "piper")
+        with open(self.piper, "w") as f:
+            f.write(FAKE_PIPER.format(python=sys.executable))
+        os.chmod(self.piper, os.stat(self.piper).st_mode | stat.S_IXUSR)
+        self.model = os.path.join(self._dir.name, "voice.onnx")
+        with open(self.model, "wb") as f:
+            f.write(b"model")
+        with open(self.model + ".json", "w") as f:
+            json.dump({"audio": {"sample_rate": 16000}}, f)
+
+    def engine(self):
+        return TTSEngine(self.model, self.model + ".json", piper_exe=self.piper, timeout=10)
+
+    def test_raw_output_has_a_wav_header(self):
+        wav = self.engine().synthesize("Hello there.")
+        self.assertEqual(wav[:4], b"RIFF")
+        self.assertEqual(len(wav), 44 + 2 * 100 * len("Hello there."))
+
+    def test_long_multi_line_text_does_not_deadlock(self):
+        # Far more than a pipe buffer in each direction
+        lines = ["Tell me about a project you are proud of. " * 20] * 200
+        pcm = self.engine().synthesize_raw("\n".join(lines))
+        self.assertEqual(len(pcm), 2 * 100 * sum(len(line.strip()) for line in lines))
+
+if __name__ == "__main__":
+    unittest.main()
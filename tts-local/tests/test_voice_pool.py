@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from app.core import voice_pool
+from app.core.voices import EngineClosed
+
+class FakeVoice:
+    """Stands in for piper's PiperVoice; synthesis blocks while ``gate`` is clear"""
+
+    gate = None
+
+    @classmethod
+    def load(cls, model_path, config_path=None):
+        return cls()
+
+    def synthesize_stream_raw(self, text, **kwargs):
+        if FakeVoice.gate is not None and text != voice_pool.PROBE_TEXT:
+            FakeVoice.gate.wait(5)
+        yield text.encode()
+
+class PiperVoicePoolTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.model_path = os.path.join(self._dir.name, "voice.onnx")
+        with open(self.model_path, "wb") as f:
+            f.write(b"model")
+        with open(self.model_path + ".json", "w") as f:
+            json.dump({"audio": {"sample_rate": 16000}}, f)
+        patch = mock.patch.object(voice_pool, "PiperVoice", FakeVoice)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.addCleanup(self._dir.cleanup)
+        FakeVoice.gate = None
+
+    def pool(self, size=1):
+        return voice_pool.PiperVoicePool(self.model_path, self.model_path + ".json", size=size, acquire_timeout=10)
+
+    def test_synthesizes_on_warm_workers(self):
+        pool = self.pool(size=2)
+        self.assertEqual(pool.synthesize_raw("hello"), b"hello")
+        self.assertEqual(pool.stats()["spawned"], 2)
+        self.assertEqual(pool.stats()["busy"], 0)
+
+    def test_close_wakes_waiting_requests(self):
+        pool = self.pool()
+        FakeVoice.gate = threading.Event()
+        results = {}
+
+        def run(name):
+            try:
+                results[name] = pool.synthesize_raw(name)
+            except Exception as e:
+                results[name] = e
+
+        busy = threading.Thread(target=run, args=("busy",))
+        busy.start()
+        while not pool.stats()["busy"]:
+            time.sleep(0.001)
+        waiting = threading.Thread(target=run, args=("waiting",))
+        waiting.start()
+        time.sleep(0.05)
+
+        started = time.monotonic()
+        pool.close()
+        waiting.join(5)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertIsInstance(results["waiting"], EngineClosed)
+
+        # The request that already had a worker finishes normally
+        FakeVoice.gate.set()
+        busy.join(5)
+        self.assertEqual(results["busy"], b"busy")
+        self.assertEqual(pool.stats()["busy"], 0)
+        with self.assertRaises(EngineClosed):
+            pool.synthesize_raw("after")
+
+if __name__ == "__main__":
+    unittest.main()
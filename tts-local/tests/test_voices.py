@@ -0,0 +1,149 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from app.core.voices import EngineClosed, UnknownVoice, VoiceRegistry, discover_voices
+
+class FakeEngine:
+    def __init__(self, voice):
+        self.voice = voice
+        self.sample_rate = voice.sample_rate
+        self.closed = False
+
+    def synthesize_raw(self, text, **kwargs):
+        if self.closed:
+            raise EngineClosed("closed")
+        return self.voice.name.encode()
+
+    def stats(self):
+        return {"spawned": 1}
+
+    def close(self):
+        self.closed = True
+
+class VoiceRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.dir = self._dir.name
+        for name, rate in (("en_US-amy-low", 16000), ("en_GB-alan-low", 22050), ("de_DE-eva-low", 16000)):
+            self.add_voice(name, rate)
+        self.engines = []
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def add_voice(self, name, rate, subdir=""):
+        directory = os.path.join(self.dir, subdir)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, name + ".onnx"), "wb") as f:
+            f.write(name.encode() * 10)
+        with open(os.path.join(directory, name + ".onnx.json"), "w") as f:
+            json.dump({"audio": {"sample_rate": rate}, "language": {"code": name[:5]}}, f)
+
+    def factory(self, voice):
+        engine = FakeEngine(voice)
+        self.engines.append(engine)
+        return engine
+
+    def registry(self, memory_bytes=250, default="en_US-amy-low"):
+        return VoiceRegistry(self.dir, factory=self.factory, cost=lambda voice: 100,
+                             memory_bytes=memory_bytes, default=default)
+
+    def test_discovery_needs_a_config(self):
+        with open(os.path.join(self.dir, "orphan.onnx"), "wb") as f:
+            f.write(b"x")
+        self.add_voice("nested", 16000, subdir="more")
+        voices = discover_voices(self.dir)
+        self.assertEqual(sorted(voices), ["de_DE-eva-low", "en_GB-alan-low", "en_US-amy-low", "nested"])
+        self.assertEqual(voices["en_GB-alan-low"].sample_rate, 22050)
+        self.assertEqual(voices["en_GB-alan-low"].language, "en_GB")
+
+    def test_unknown_voices(self):
+        registry = self.registry()
+        with self.assertRaises(UnknownVoice):
+            registry.voice("nope")
+        with self.assertRaises(UnknownVoice):
+            self.registry(default="nope")
+
+    def test_model_hash_differs_per_voice(self):
+        registry = self.registry()
+        hashes = {voice.model_hash for voice in registry.voices.values()}
+        self.assertEqual(len(hashes), 3)
+
+    def test_handles_load_on_first_use(self):
+        registry = self.registry()
+        engine = registry.engine("en_GB-alan-low")
+        self.assertEqual(engine.sample_rate, 22050)
+        self.assertEqual(self.engines, [])
+        self.assertEqual(engine.synthesize_raw("hi"), b"en_GB-alan-low")
+        self.assertEqual(registry.stats()["loaded_voices"], ["en_GB-alan-low"])
+        # Loaded once, then reused
+        registry.engine("en_GB-alan-low").synthesize_raw("again")
+        self.assertEqual(registry.loads, 1)
+
+    def test_least_recently_used_voice_is_evicted(self):
+        registry = self.registry(memory_bytes=250)
+        amy = registry.loaded(registry.voice("en_US-amy-low"))
+        alan = registry.loaded(registry.voice("en_GB-alan-low"))
+        # Touch amy so alan is the oldest
+        registry.loaded(registry.voice("en_US-amy-low"))
+        registry.loaded(registry.voice("de_DE-eva-low"))
+        stats = registry.stats()
+        self.assertEqual(stats["loaded_voices"], ["en_US-amy-low", "de_DE-eva-low"])
+        self.assertEqual(stats["resident_bytes"], 200)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertTrue(alan.closed)
+        self.assertFalse(amy.closed)
+        # Spawn counts of evicted engines are kept
+        self.assertEqual(stats["spawned"], 3)
+
+        # An evicted voice loads again on its next use
+        registry.engine("en_GB-alan-low").synthesize_raw("back")
+        self.assertEqual(registry.loads, 4)
+
+    def test_voice_evicted_mid_request_is_loaded_again(self):
+        registry = self.registry(memory_bytes=150)
+        handle = registry.engine("en_US-amy-low")
+        amy = registry.loaded(handle.voice)
+        synthesize_raw = FakeEngine.synthesize_raw
+
+        def evicted_first(engine, text, **kwargs):
+            # Another request loads a voice between the lookup and the synthesis
+            if engine is amy:
+                registry.loaded(registry.voice("en_GB-alan-low"))
+            return synthesize_raw(engine, text, **kwargs)
+
+        with mock.patch.object(FakeEngine, "synthesize_raw", evicted_first):
+            self.assertEqual(handle.synthesize_raw("hi"), b"en_US-amy-low")
+        self.assertTrue(amy.closed)
+        self.assertEqual(registry.loads, 3)
+
+    def test_voice_over_budget_on_its_own_is_kept(self):
+        registry = self.registry(memory_bytes=50)
+        registry.loaded(registry.voice("en_US-amy-low"))
+        self.assertEqual(registry.stats()["loaded_voices"], ["en_US-amy-low"])
+        registry.loaded(registry.voice("en_GB-alan-low"))
+        self.assertEqual(registry.stats()["loaded_voices"], ["en_GB-alan-low"])
+
+    def test_concurrent_first_use_loads_once(self):
+        registry = self.registry()
+        voice = registry.voice("de_DE-eva-low")
+        threads = [threading.Thread(target=registry.loaded, args=(voice,)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(registry.loads, 1)
+
+    def test_close_closes_loaded_engines(self):
+        registry = self.registry()
+        registry.loaded(registry.voice())
+        registry.close()
+        self.assertTrue(all(engine.closed for engine in self.engines))
+        self.assertEqual(registry.stats()["loaded_voices"], [])
+
+if __name__ == "__main__":
+    unittest.main()